@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+from fastapi import Request, Response
+
+from app.data.codec import ColumnFrame
+from app.models.schemas import BacktestResponse, MeanVarianceResponse, RiskMetricsResponse
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+def wants_arrow(request: Request) -> bool:
+    return ARROW_STREAM in request.headers.get("accept", "")
+
+
+def arrow_bytes(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_response(table: pa.Table) -> Response:
+    return Response(content=arrow_bytes(table), media_type=ARROW_STREAM)
+
+
+def _with_metadata(table: pa.Table, metadata: dict) -> pa.Table:
+    # Scalars ride along as JSON-encoded schema metadata, e.g. json.loads(table.schema.metadata[b"symbols"]).
+    return table.replace_schema_metadata({key: json.dumps(value) for key, value in metadata.items()})
+
+
+def _timestamps(values: np.ndarray) -> pa.Array:
+    return pa.array(np.asarray(values, dtype="datetime64[ns]"), type=pa.timestamp("ns", tz="UTC"))
+
+
+def series_table(frame: ColumnFrame) -> pa.Table:
+    """One row per observation: ``timestamp``, ``value`` and, for bar series, ``open``/``high``/``low``/``volume``."""
+    header = frame.header
+    columns = {"timestamp": _timestamps(frame.columns["timestamp"]), "value": pa.array(frame.columns["value"])}
+    for key in header["metadata_keys"]:
+        if key not in header["timestamp_keys"]:
+            columns[key] = pa.array(frame.columns[f"metadata.{key}"])
+    return _with_metadata(
+        pa.table(columns),
+        {key: header[key] for key in ("ticker_or_series_id", "source", "frequency", "unit", "last_updated")},
+    )
+
+
+def mean_variance_table(result: MeanVarianceResponse) -> pa.Table:
+    """Efficient frontier rows, with the optimal portfolio and its weights in the schema metadata."""
+    frontier = result.efficient_frontier
+    table = pa.table(
+        {
+            "expected_return": pa.array([point.expected_return for point in frontier], type=pa.float64()),
+            "volatility": pa.array([point.volatility for point in frontier], type=pa.float64()),
+            "sharpe_ratio": pa.array([point.sharpe_ratio for point in frontier], type=pa.float64()),
+        }
+    )
+    return _with_metadata(
+        table,
+        {
+            "symbols": result.symbols,
+            "expected_annual_return": result.expected_annual_return,
+            "annual_volatility": result.annual_volatility,
+            "sharpe_ratio": result.sharpe_ratio,
+            "weights": {weight.symbol: weight.weight for weight in result.weights},
+        },
+    )
+
+
+def risk_metrics_table(result: RiskMetricsResponse) -> pa.Table:
+    """Correlation matrix in long form (``row``, ``col``, ``value``), with the VaR figures in the schema metadata."""
+    cells = result.correlation_matrix
+    table = pa.table(
+        {
+            "row": pa.array([cell.row for cell in cells], type=pa.string()),
+            "col": pa.array([cell.col for cell in cells], type=pa.string()),
+            "value": pa.array([cell.value for cell in cells], type=pa.float64()),
+        }
+    )
+    return _with_metadata(table, result.model_dump(mode="json", exclude={"correlation_matrix"}))
+
+
+def backtest_table(result: BacktestResponse) -> pa.Table:
+    """Equity curve rows (``timestamp``, ``equity``); tear sheet and trades travel in the schema metadata."""
+    curve = result.equity_curve
+    table = pa.table(
+        {
+            "timestamp": pa.array([point.timestamp for point in curve], type=pa.timestamp("ns", tz="UTC")),
+            "equity": pa.array([point.equity for point in curve], type=pa.float64()),
+        }
+    )
+    return _with_metadata(table, result.model_dump(mode="json", exclude={"equity_curve"}))
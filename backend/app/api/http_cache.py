@@ -0,0 +1,76 @@
+import gzip
+import hashlib
+from collections.abc import Awaitable, Callable
+
+import brotli
+from fastapi import Request, Response
+
+from app.core.cache import cache_get_decoded, cache_set
+from app.core.config import settings
+
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    "br": lambda body: brotli.compress(body, quality=5),
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+}
+
+
+def representation_etag(digest: str, variant: str) -> str:
+    """Weak ETag for one representation (format, indicator set, ...) of content with ``digest``."""
+    tag = hashlib.blake2b(f"{digest}|{variant}".encode(), digest_size=16).hexdigest()
+    return f'W/"{tag}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides.
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def negotiate_encoding(request: Request) -> str | None:
+    accepted: dict[str, float] = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ENCODERS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+async def conditional_response(
+    request: Request, digest: str, variant: str, media_type: str, render: Callable[[], Awaitable[bytes]]
+) -> Response:
+    """Serve one representation with an ETag: 304 when the client has it, else stored compressed bytes.
+
+    Compressed bodies are cached under their ETag, so repeated polls of unchanged data skip both
+    serialization and compression. Bodies under ``response_compress_min_bytes`` are sent as rendered.
+    ``render`` is a coroutine function, so building the body may read further cache entries.
+    """
+    etag = representation_etag(digest, variant)
+    headers = {"ETag": etag, "Vary": "Accept, Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(request)
+    if encoding is not None:
+        key = f"body:{etag[3:-1]}:{encoding}"
+        entry = await cache_get_decoded(key, bytes)
+        if entry is not None:
+            return Response(entry.payload, media_type=media_type, headers={**headers, "Content-Encoding": encoding})
+
+    body = await render()
+    if encoding is None or len(body) < settings.response_compress_min_bytes:
+        return Response(body, media_type=media_type, headers=headers)
+
+    compressed = ENCODERS[encoding](body)
+    await cache_set(key, compressed, soft_ttl=settings.response_body_cache_ttl_seconds, value=compressed)
+    return Response(compressed, media_type=media_type, headers={**headers, "Content-Encoding": encoding})
@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.core.cache import cache_mget_decoded, cache_set_many
+from app.core.config import settings
+from app.data.bars import OhlcvArrays
+from app.data.codec import ColumnFrame, decode_frame, encode_frame
+from app.engine.indicator_registry import IndicatorPlan, plan_indicators
+
+
+def indicator_cache_key(symbol: str, interval: str, digest: str, indicator: str) -> str:
+    """Key of one indicator's outputs over the bars with content ``digest`` (which pins the window and data version)."""
+    return f"analysis:indicator:{symbol.upper()}:{interval}:{digest}:{indicator}"
+
+
+async def cached_indicator_outputs(
+    symbol: str, interval: str, digest: str, bars: OhlcvArrays, plan: IndicatorPlan
+) -> list[tuple[str, np.ndarray]]:
+    """The outputs of ``plan`` over ``bars``, each indicator read from its own cache entry when present.
+
+    Only the indicators missing from the cache are planned and computed (sharing intermediates among
+    themselves), then written back, so any combination of indicators reuses every part cached before.
+    """
+    names = list(plan.requests)
+    keys = [indicator_cache_key(symbol, interval, digest, name) for name in names]
+    entries = await cache_mget_decoded(keys, decode_frame)
+    columns = {name: entry.payload.columns for name, entry in zip(names, entries) if entry is not None}
+
+    missing = [name for name in names if name not in columns]
+    if missing:
+        values = dict(plan_indicators(missing).evaluate(bars))
+        frames = [ColumnFrame(columns={output: values[output] for output in plan.requests[name]}) for name in missing]
+        ttl = settings.indicator_cache_ttl_seconds
+        keys = [indicator_cache_key(symbol, interval, digest, name) for name in missing]
+        await cache_set_many([(key, encode_frame(frame), ttl) for key, frame in zip(keys, frames)], values=frames)
+        columns.update((name, frame.columns) for name, frame in zip(missing, frames))
+
+    return [(output, columns[name][output]) for name, outputs in plan.requests.items() for output in outputs]
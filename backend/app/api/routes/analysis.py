@@ -1,31 +1,143 @@
 import json
+from datetime import UTC
+from typing import Literal
 
-from fastapi import APIRouter, Query
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 
-from app.core.cache import redis_client
-from app.data.fetchers.yahoo import YahooFetcher
-from app.engine.indicators import compute_indicators
-from app.models.schemas import TechnicalAnalysisResponse
+from app.api.http_cache import conditional_response
+from app.api.indicator_cache import cached_indicator_outputs
+from app.core.cache import cache_get_decoded, cache_set
+from app.core.config import settings
+from app.data.bars import OhlcvArrays
+from app.data.codec import bars_to_frame, frame_digest
+from app.data.series import load_bars, load_intraday, load_universe_bars
+from app.engine.indicator_registry import IndicatorPlan, plan_indicators
+from app.engine.indicator_stream import IndicatorStream
+from app.engine.indicators import compute_indicators, indicator_columns, technical_columns
+from app.engine.screener import plan_screen, run_screen
+from app.models.schemas import ScreenRequest, ScreenResponse, TechnicalAnalysisResponse
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 
+def _plan(indicator_list: list[str]) -> IndicatorPlan:
+    try:
+        return plan_indicators(indicator_list)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+async def _load(symbol: str, start: str, end: str, interval: str) -> OhlcvArrays:
+    if interval == "1d":
+        # Bars come from the shared month chunks, so overlapping windows reuse one cached copy.
+        bars, _ = await load_bars("yahoo", symbol, start, end)
+        return bars
+    return await load_intraday("yahoo", symbol, start, end, interval)
+
+
 @router.get("/technical/{symbol}", response_model=TechnicalAnalysisResponse)
 async def get_technical_analysis(
     symbol: str,
+    request: Request,
     start: str = Query(..., description="YYYY-MM-DD"),
     end: str = Query(..., description="YYYY-MM-DD"),
-    indicators: str = Query("SMA_20,EMA_20", description="Comma-separated indicators"),
-) -> TechnicalAnalysisResponse:
+    indicators: str = Query("SMA_20,EMA_20", description="Comma-separated indicators such as SMA_50,RSI_7,ATR_14,VWAP"),
+    response_format: Literal["json", "columnar"] = Query("json", alias="format"),
+    max_points: int | None = Query(default=None, ge=3, le=100_000, description="Downsample to at most this many bars"),
+    interval: str = Query("1d", description="1d, or an intraday bar size such as 1m, 5m, 30m or 1h"),
+) -> Response:
     indicator_list = [value.strip().upper() for value in indicators.split(",") if value.strip()]
-    cache_key = f"analysis:technical:{symbol}:{start}:{end}:{','.join(indicator_list)}"
+    plan = _plan(indicator_list)
+    bars = await _load(symbol, start, end, interval)
+    frequency = "daily" if interval == "1d" else interval
+
+    digest = frame_digest(bars_to_frame(bars))
+
+    async def render() -> bytes:
+        options = {
+            "bars": bars,
+            "indicators": indicator_list,
+            "symbol": symbol,
+            "max_points": max_points,
+            "frequency": frequency,
+            # Each indicator is cached on its own, so only those never requested over these bars are computed.
+            "outputs": await cached_indicator_outputs(symbol, interval, digest, bars, plan),
+        }
+        if response_format == "columnar":
+            return json.dumps(technical_columns(**options), allow_nan=False).encode()
+        return compute_indicators(**options).model_dump_json().encode()
+
+    # Indicators are a pure function of the bars, so the bar digest plus the request shape identifies the body.
+    variant = f"technical:{symbol.upper()}:{interval}:{response_format}:{max_points or 'all'}:{','.join(indicator_list)}"
+    return await conditional_response(request, digest, variant, "application/json", render)
+
+
+@router.get("/technical/{symbol}/updates")
+async def get_technical_updates(
+    symbol: str,
+    start: str = Query(..., description="YYYY-MM-DD; the same history start as the full request"),
+    end: str = Query(..., description="YYYY-MM-DD"),
+    since: str = Query(..., description="ISO timestamp; bars at or after it are returned"),
+    indicators: str = Query("SMA_20,EMA_20", description="Comma-separated indicators"),
+    interval: str = Query("1d", description="1d, or an intraday bar size such as 1m, 5m, 30m or 1h"),
+) -> Response:
+    """Columnar bars and indicator values from ``since`` on, advanced from a cached checkpoint of the indicator state.
+
+    The checkpoint holds each indicator's running state after every bar but the last (which may still be
+    forming), so a poll folds in only the bars completed since the previous one. A missing or stale
+    checkpoint, or a ``since`` before it, is rebuilt with one vectorized pass over the history.
+    """
+    try:
+        since_at = pd.Timestamp(since)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid since timestamp {since!r}") from exc
+    since_ns = (since_at.tz_localize(UTC) if since_at.tz is None else since_at).value
+    plan = _plan([value.strip().upper() for value in indicators.split(",") if value.strip()])
+    bars = await _load(symbol, start, end, interval)
+    frequency = "daily" if interval == "1d" else interval
+
+    first = int(np.searchsorted(bars.timestamps, since_ns))
+    last = len(bars) - 1
+    # The window end is part of the key: pollers with different ends would otherwise overwrite one checkpoint.
+    key = f"analysis:indicator-state:{symbol.upper()}:{interval}:{start}:{end}:{','.join(plan.requests)}"
+    entry = await cache_get_decoded(key, json.loads)
+    stream = None
+    if entry is not None:
+        try:
+            stream = IndicatorStream.from_dict(plan, entry.payload)
+        except (KeyError, TypeError, ValueError):
+            stream = None
+
+    if stream is not None and stream.resumes(bars) and first >= stream.count:
+        folded = stream.count
+        rows = []
+        for index in range(stream.count, last):
+            values = stream.step(bars, index)
+            if index >= first:
+                rows.append(values)
+        checkpoint = stream.to_dict() if stream.count > folded else None
+        if last >= first:
+            rows.append(stream.step(bars, last))
+        outputs = [(name, np.array([row[node] for row in rows], dtype=np.float64)) for name, node in plan.outputs]
+    else:
+        stream, values = IndicatorStream.seed(plan, bars, max(last, 0))
+        checkpoint = stream.to_dict()
+        outputs = [(name, values[node][first:]) for name, node in plan.outputs]
 
-    cached = await redis_client.get(cache_key)
-    if cached:
-        return TechnicalAnalysisResponse.model_validate_json(cached)
+    if checkpoint is not None:
+        await cache_set(key, json.dumps(checkpoint).encode(), soft_ttl=settings.indicator_checkpoint_ttl_seconds)
+    body = indicator_columns(bars.take(slice(first, None)), outputs, symbol, frequency)
+    return Response(json.dumps(body, allow_nan=False).encode(), media_type="application/json")
 
-    rows = await YahooFetcher().fetch_daily(symbol=symbol, start=start, end=end)
-    response = compute_indicators(rows=rows, indicators=indicator_list, symbol=symbol)
 
-    await redis_client.set(cache_key, json.dumps(response.model_dump(mode="json")), ex=60 * 30)
-    return response
+@router.post("/screen", response_model=ScreenResponse)
+async def screen_universe(payload: ScreenRequest) -> ScreenResponse:
+    expressions = [expression for expression in (payload.filter, payload.sort) if expression]
+    try:
+        plan_screen(expressions)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    bars, missing = await load_universe_bars(payload.symbols, payload.start, payload.end)
+    return run_screen(bars, payload.filter, payload.sort, payload.descending, payload.limit, missing)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
+from app.api.arrow import arrow_response, backtest_table, wants_arrow
+from app.data.series import load_daily_bars, load_intraday
 from app.engine.backtester.runner import run_backtest
 from app.models.schemas import BacktestRequest, BacktestResponse
 
@@ -7,8 +9,13 @@ router = APIRouter(prefix="/backtest", tags=["backtest"])
 
 
 @router.post("/run", response_model=BacktestResponse)
-async def run_backtest_route(payload: BacktestRequest) -> BacktestResponse:
+async def run_backtest_route(payload: BacktestRequest, request: Request) -> BacktestResponse | Response:
+    if payload.interval == "1d":
+        bars = (await load_daily_bars([payload.symbol], payload.start, payload.end))[payload.symbol.upper()]
+    else:
+        bars = await load_intraday("yahoo", payload.symbol, payload.start, payload.end, payload.interval)
     try:
-        return run_backtest(payload)
+        result = run_backtest(payload, bars)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return arrow_response(backtest_table(result)) if wants_arrow(request) else result
@@ -1,18 +1,38 @@
+import asyncio
 import json
-from datetime import UTC, datetime
+from collections.abc import AsyncIterator
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, or_, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from redis.exceptions import RedisError
+from sqlalchemy import or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import redis_client
+from app.api.arrow import ARROW_STREAM, arrow_bytes, series_table, wants_arrow
+from app.api.http_cache import conditional_response
+from app.core.cache import cache_get_decoded, cache_mget_decoded, cache_set
+from app.core.config import settings
 from app.core.db import get_db_session
-from app.data.fetchers.alpha_vantage import AlphaVantageFetcher
+from app.data.codec import ColumnFrame, decode_frame, decode_series_frame, encode_frame, frame_digest, frame_to_series
 from app.data.fetchers.fred import FredFetcher
-from app.data.fetchers.yahoo import YahooFetcher
-from app.data.processors.normalize import normalize_alpha_daily, normalize_fred_series, normalize_yahoo_ohlcv
+from app.data.fred_catalog import fred_catalog
+from app.data.processors.downsample import downsample_frame
+from app.data.processors.normalize import series_columns
+from app.data.registry import cached_registry_total, decode_cursor, encode_cursor
+from app.data.series import (
+    BAR_SOURCES,
+    get_series,
+    load_intraday_series,
+    load_series_coalesced,
+    schedule_refresh,
+    series_cache_key,
+    upstream_error,
+)
 from app.models.db_models import DataRegistryEntry
 from app.models.schemas import (
+    BatchSeriesItem,
+    BatchSeriesRequest,
     DataRegistryEntryResponse,
     DataRegistryListResponse,
     FredSearchItem,
@@ -22,54 +42,70 @@ from app.models.schemas import (
 
 router = APIRouter(prefix="/data", tags=["data"])
 
+SeriesFormat = Literal["json", "columnar"]
+FORMAT_QUERY = Query("json", alias="format", description="json (list of points) or columnar (parallel arrays)")
+INTERVAL_QUERY = Query("1d", description="1d, or an intraday bar size such as 1m, 5m, 30m or 1h")
+MAX_POINTS_QUERY = Query(
+    default=None, ge=3, le=100_000, description="Downsample to at most this many points (candles for bar series)"
+)
 
-async def _upsert_registry_entry(response: UnifiedSeriesResponse, db: AsyncSession) -> None:
-    latest_value = response.data[-1].value if response.data else None
-    metadata = {
-        "points": len(response.data),
-        "preview_start": response.data[0].timestamp.isoformat() if response.data else None,
-        "preview_end": response.data[-1].timestamp.isoformat() if response.data else None,
-    }
 
-    existing = await db.scalar(
-        select(DataRegistryEntry).where(
-            DataRegistryEntry.ticker_or_series_id == response.ticker_or_series_id,
-            DataRegistryEntry.source == response.source,
-        )
-    )
+async def _downsampled(series: ColumnFrame, digest: str, max_points: int) -> ColumnFrame:
+    """``series`` reduced to ``max_points``, cached per source digest and resolution for every format and encoding."""
+    if len(series.columns["timestamp"]) <= max_points:
+        return series
+    key = f"downsampled:{digest}:{max_points}"
+    entry = await cache_get_decoded(key, decode_frame)
+    if entry is not None:
+        return entry.payload
+    reduced = downsample_frame(series, max_points)
+    await cache_set(key, encode_frame(reduced), soft_ttl=settings.response_body_cache_ttl_seconds, value=reduced)
+    return reduced
 
-    now = datetime.now(UTC)
-    if existing:
-        existing.frequency = response.frequency
-        existing.unit = response.unit
-        existing.last_updated = now
-        existing.latest_value = latest_value
-        existing.metadata_json = metadata
-    else:
-        db.add(
-            DataRegistryEntry(
-                ticker_or_series_id=response.ticker_or_series_id,
-                source=response.source,
-                frequency=response.frequency,
-                unit=response.unit,
-                last_updated=now,
-                latest_value=latest_value,
-                metadata_json=metadata,
-            )
-        )
 
-    await db.commit()
+async def _series_response(
+    series: ColumnFrame, response_format: SeriesFormat, request: Request, max_points: int | None = None
+) -> Response:
+    # The ETag comes from the full series; each resolution's reduced frame is cached apart from the encoded bodies.
+    digest = frame_digest(series)
+    resolution = max_points or "all"
+
+    async def view() -> ColumnFrame:
+        return await _downsampled(series, digest, max_points) if max_points else series
+
+    # Arrow and columnar bodies are built straight from the frame's arrays, without per-point models.
+    async def render_arrow() -> bytes:
+        return arrow_bytes(series_table(await view()))
+
+    async def render_json() -> bytes:
+        return _series_json(await view(), response_format).encode()
+
+    if wants_arrow(request):
+        return await conditional_response(request, digest, f"arrow:{resolution}", ARROW_STREAM, render_arrow)
+    return await conditional_response(request, digest, f"{response_format}:{resolution}", "application/json", render_json)
+
+
+def _series_json(series: ColumnFrame, response_format: SeriesFormat) -> str:
+    if response_format == "columnar":
+        return json.dumps(series_columns(series), allow_nan=False)
+    return frame_to_series(series).model_dump_json()
 
 
 @router.get("/fred/search", response_model=FredSearchResponse)
 async def search_fred_series(
+    background_tasks: BackgroundTasks,
     q: str = Query(..., min_length=2, description="FRED search text"),
     limit: int = Query(default=20, ge=1, le=100),
 ) -> FredSearchResponse:
-    try:
-        total, rows = await FredFetcher().search_series(query=q, limit=limit)
-    except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"FRED search failed: {exc}") from exc
+    # Served from the local catalog; FRED is only asked when nothing matches, and its answer is kept.
+    await fred_catalog.ensure_loaded()
+    total, rows = fred_catalog.search(q, limit=limit)
+    if not rows:
+        try:
+            total, rows = await FredFetcher().search_series(query=q, limit=limit)
+        except Exception as exc:
+            raise upstream_error("FRED search", exc) from exc
+        background_tasks.add_task(fred_catalog.add, rows)
 
     return FredSearchResponse(
         total=total,
@@ -89,68 +125,92 @@ async def search_fred_series(
 @router.get("/fred/{series_id}", response_model=UnifiedSeriesResponse)
 async def get_fred_series(
     series_id: str,
+    request: Request,
     start: str = Query(..., description="YYYY-MM-DD"),
     end: str = Query(..., description="YYYY-MM-DD"),
-    db: AsyncSession = Depends(get_db_session),
-) -> UnifiedSeriesResponse:
-    cache_key = f"fred:{series_id}:{start}:{end}"
-    cached = await redis_client.get(cache_key)
-    if cached:
-        return UnifiedSeriesResponse.model_validate_json(cached)
-
+    response_format: SeriesFormat = FORMAT_QUERY,
+    max_points: int | None = MAX_POINTS_QUERY,
+) -> Response:
     if not series_id:
         raise HTTPException(status_code=400, detail="series_id is required")
-
-    try:
-        observations = await FredFetcher().fetch_series(series_id=series_id, start=start, end=end)
-    except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"FRED fetch failed: {exc}") from exc
-
-    response = normalize_fred_series(series_id=series_id, observations=observations)
-    await _upsert_registry_entry(response=response, db=db)
-    await redis_client.set(cache_key, json.dumps(response.model_dump(mode="json")), ex=60 * 60 * 24)
-    return response
+    series = await get_series("fred", series_id, start, end)
+    return await _series_response(series, response_format, request, max_points)
 
 
 @router.get("/yahoo/{symbol}", response_model=UnifiedSeriesResponse)
 async def get_yahoo_series(
     symbol: str,
+    request: Request,
     start: str = Query(..., description="YYYY-MM-DD"),
     end: str = Query(..., description="YYYY-MM-DD"),
-    db: AsyncSession = Depends(get_db_session),
-) -> UnifiedSeriesResponse:
-    cache_key = f"yahoo:{symbol}:{start}:{end}"
-    cached = await redis_client.get(cache_key)
-    if cached:
-        return UnifiedSeriesResponse.model_validate_json(cached)
+    response_format: SeriesFormat = FORMAT_QUERY,
+    max_points: int | None = MAX_POINTS_QUERY,
+    interval: str = INTERVAL_QUERY,
+) -> Response:
+    if interval == "1d":
+        series = await get_series("yahoo", symbol, start, end)
+    else:
+        series = await load_intraday_series("yahoo", symbol, start, end, interval)
+    return await _series_response(series, response_format, request, max_points)
 
-    try:
-        rows = await YahooFetcher().fetch_daily(symbol=symbol, start=start, end=end)
-    except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Yahoo fetch failed: {exc}") from exc
 
-    response = normalize_yahoo_ohlcv(symbol=symbol, rows=rows)
-    await _upsert_registry_entry(response=response, db=db)
-    await redis_client.set(cache_key, json.dumps(response.model_dump(mode="json")), ex=60 * 60)
-    return response
+@router.get("/alpha-vantage/{symbol}", response_model=UnifiedSeriesResponse)
+async def get_alpha_vantage(
+    symbol: str,
+    request: Request,
+    start: str | None = Query(default=None, description="YYYY-MM-DD, defaults to the latest 100 bars"),
+    end: str | None = Query(default=None, description="YYYY-MM-DD"),
+    response_format: SeriesFormat = FORMAT_QUERY,
+    max_points: int | None = MAX_POINTS_QUERY,
+    interval: str = INTERVAL_QUERY,
+) -> Response:
+    if interval == "1d":
+        series = await get_series("alpha-vantage", symbol, start, end)
+    else:
+        series = await load_intraday_series("alpha-vantage", symbol, start, end, interval)
+    return await _series_response(series, response_format, request, max_points)
+
 
+@router.post("/batch")
+async def get_series_batch(payload: BatchSeriesRequest) -> StreamingResponse:
+    return StreamingResponse(_stream_batch(payload.items, payload.format), media_type="application/x-ndjson")
 
-@router.get("/alpha-vantage/{symbol}", response_model=UnifiedSeriesResponse)
-async def get_alpha_vantage(symbol: str, db: AsyncSession = Depends(get_db_session)) -> UnifiedSeriesResponse:
-    cache_key = f"alpha:{symbol}"
-    cached = await redis_client.get(cache_key)
-    if cached:
-        return UnifiedSeriesResponse.model_validate_json(cached)
 
-    try:
-        rows = await AlphaVantageFetcher().fetch_daily(symbol=symbol)
-    except Exception as exc:
-        raise HTTPException(status_code=502, detail=f"Alpha Vantage fetch failed: {exc}") from exc
+async def _stream_batch(items: list[BatchSeriesItem], response_format: SeriesFormat = "json") -> AsyncIterator[str]:
+    # Bar series are assembled from month chunks while resolving; other series have one entry per range.
+    misses = [index for index, item in enumerate(items) if item.source in BAR_SOURCES]
+    ranged = [index for index, item in enumerate(items) if item.source not in BAR_SOURCES]
+    keys = [series_cache_key(items[index].source, items[index].id, items[index].start, items[index].end) for index in ranged]
+    entries = await cache_mget_decoded(keys, decode_series_frame) if keys else []
+    for index, entry in zip(ranged, entries):
+        if entry is None:
+            misses.append(index)
+            continue
+        if entry.is_stale:
+            item = items[index]
+            schedule_refresh(item.source, item.id, item.start, item.end)
+        yield f'{{"index":{index},"status":200,"series":{_series_json(entry.payload, response_format)}}}\n'
 
-    response = normalize_alpha_daily(symbol=symbol, rows=rows)
-    await _upsert_registry_entry(response=response, db=db)
-    await redis_client.set(cache_key, json.dumps(response.model_dump(mode="json")), ex=60 * 60)
-    return response
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+    async def resolve(index: int) -> str:
+        item = items[index]
+        async with semaphore:
+            try:
+                series = await load_series_coalesced(item.source, item.id, item.start, item.end)
+            except HTTPException as exc:
+                return json.dumps({"index": index, "status": exc.status_code, "error": exc.detail}) + "\n"
+            except RedisError as exc:
+                return json.dumps({"index": index, "status": 500, "error": str(exc)}) + "\n"
+        return f'{{"index":{index},"status":200,"series":{_series_json(series, response_format)}}}\n'
+
+    tasks = [asyncio.create_task(resolve(index)) for index in misses]
+    try:
+        for next_record in asyncio.as_completed(tasks):
+            yield await next_record
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 @router.get("/registry", response_model=DataRegistryListResponse)
@@ -158,37 +218,47 @@ async def list_registry(
     q: str = Query(default="", description="Search ticker/series id or source"),
     source: str | None = Query(default=None, description="Optional source filter"),
     limit: int = Query(default=50, ge=1, le=500),
-    offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    offset: int = Query(default=0, ge=0, description="Rows to skip; prefer cursor, which does not rescan skipped rows"),
     db: AsyncSession = Depends(get_db_session),
 ) -> DataRegistryListResponse:
     filters = []
     if source:
         filters.append(DataRegistryEntry.source.ilike(source))
 
-    if q:
-        query_text = f"%{q.strip()}%"
+    query_text = q.strip()
+    if query_text:
+        # Served by the pg_trgm indexes (see ensure_registry_search_indexes).
+        pattern = f"%{query_text}%"
         filters.append(
             or_(
-                DataRegistryEntry.ticker_or_series_id.ilike(query_text),
-                DataRegistryEntry.source.ilike(query_text),
+                DataRegistryEntry.ticker_or_series_id.ilike(pattern),
+                DataRegistryEntry.source.ilike(pattern),
             )
         )
 
-    where_clause = filters if filters else [True]
-    total = int(await db.scalar(select(func.count()).select_from(DataRegistryEntry).where(*where_clause)) or 0)
-    rows = (
+    total = await cached_registry_total(db, filters, f"registry:count:{(source or '').lower()}:{query_text.lower()}")
+
+    page = select(DataRegistryEntry).where(*filters)
+    if cursor:
+        try:
+            last_updated, row_id = decode_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        page = page.where(tuple_(DataRegistryEntry.last_updated, DataRegistryEntry.id) < (last_updated, row_id))
+    rows = list(
         (
             await db.execute(
-                select(DataRegistryEntry)
-                .where(*where_clause)
-                .order_by(DataRegistryEntry.last_updated.desc())
+                page.order_by(DataRegistryEntry.last_updated.desc(), DataRegistryEntry.id.desc())
                 .offset(offset)
-                .limit(limit)
+                .limit(limit + 1)
             )
         )
         .scalars()
         .all()
     )
+    next_cursor = encode_cursor(rows[limit - 1].last_updated, rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
 
     return DataRegistryListResponse(
         total=total,
@@ -204,6 +274,7 @@ async def list_registry(
             )
             for row in rows
         ],
+        next_cursor=next_cursor,
     )
 
 
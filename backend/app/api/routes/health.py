@@ -1,8 +1,15 @@
 from fastapi import APIRouter
 
+from app.core.scheduler import upstream_scheduler
+
 router = APIRouter(prefix="/health", tags=["health"])
 
 
 @router.get("")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/upstream")
+async def upstream_queues() -> dict[str, dict[str, float]]:
+    return upstream_scheduler.snapshot()
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 
+from app.data.series import load_daily_bars
 from app.engine.ml import train_baseline_model
 from app.models.schemas import MlTrainRequest, MlTrainResponse
 
@@ -8,7 +9,8 @@ router = APIRouter(prefix="/ml", tags=["ml"])
 
 @router.post("/train-baseline", response_model=MlTrainResponse)
 async def train_baseline(payload: MlTrainRequest) -> MlTrainResponse:
+    bars = await load_daily_bars([payload.symbol], payload.start, payload.end)
     try:
-        return train_baseline_model(payload)
+        return train_baseline_model(payload, bars[payload.symbol.upper()])
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
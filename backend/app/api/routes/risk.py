@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
+from app.api.arrow import arrow_response, mean_variance_table, risk_metrics_table, wants_arrow
+from app.data.series import load_daily_bars
 from app.engine.portfolio_risk import compute_mean_variance, compute_risk_metrics
 from app.models.schemas import MeanVarianceRequest, MeanVarianceResponse, RiskMetricsRequest, RiskMetricsResponse
 
@@ -7,30 +9,32 @@ router = APIRouter(prefix="/risk", tags=["risk"])
 
 
 @router.post("/mean-variance", response_model=MeanVarianceResponse)
-async def run_mean_variance(payload: MeanVarianceRequest) -> MeanVarianceResponse:
+async def run_mean_variance(payload: MeanVarianceRequest, request: Request) -> MeanVarianceResponse | Response:
+    bars = await load_daily_bars(payload.symbols, payload.start, payload.end)
     try:
-        return compute_mean_variance(
+        result = compute_mean_variance(
             symbols=payload.symbols,
-            start=payload.start,
-            end=payload.end,
+            bars=bars,
             risk_free_rate=payload.risk_free_rate,
             long_only=payload.long_only,
             frontier_points=payload.frontier_points,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return arrow_response(mean_variance_table(result)) if wants_arrow(request) else result
 
 
 @router.post("/metrics", response_model=RiskMetricsResponse)
-async def run_risk_metrics(payload: RiskMetricsRequest) -> RiskMetricsResponse:
+async def run_risk_metrics(payload: RiskMetricsRequest, request: Request) -> RiskMetricsResponse | Response:
+    bars = await load_daily_bars(payload.symbols, payload.start, payload.end)
     try:
-        return compute_risk_metrics(
+        result = compute_risk_metrics(
             symbols=payload.symbols,
-            start=payload.start,
-            end=payload.end,
+            bars=bars,
             confidence_level=payload.confidence_level,
             horizon_days=payload.horizon_days,
             weights=payload.weights,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return arrow_response(risk_metrics_table(result)) if wants_arrow(request) else result
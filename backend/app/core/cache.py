@@ -1,6 +1,154 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+from uuid import uuid4
+
+from loguru import logger
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from app.core.config import settings
+from app.core.local_cache import LocalCache
+
+T = TypeVar("T")
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Values are bytes: cache payloads are encoded by app.data.codec.
+redis_client = Redis.from_url(settings.redis_url)
+
+# Decoded values of hot keys, kept per worker and dropped when any worker rewrites the key.
+local_cache = LocalCache(max_entries=settings.l1_cache_max_entries, ttl_seconds=settings.l1_cache_ttl_seconds)
+
+_worker_id = uuid4().hex.encode()
+_refresh_tasks: dict[str, asyncio.Task] = {}
+
+
+@dataclass(frozen=True)
+class CacheEntry(Generic[T]):
+    """A cached payload with a soft expiry; Redis drops the key itself at the hard expiry."""
+
+    payload: T
+    soft_expires_at: float
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() >= self.soft_expires_at
+
+
+def encode_entry(payload: bytes, soft_ttl: int) -> bytes:
+    return b"%d|%b" % (int(time.time()) + soft_ttl, payload)
+
+
+def decode_entry(raw: bytes | None) -> CacheEntry | None:
+    if not raw:
+        return None
+    head, separator, payload = raw.partition(b"|")
+    if not separator or not head.isdigit():
+        # Values written before soft expiries existed only have their hard TTL.
+        return CacheEntry(payload=raw, soft_expires_at=float("inf"))
+    return CacheEntry(payload=payload, soft_expires_at=float(head))
+
+
+async def cache_get(key: str) -> CacheEntry | None:
+    return decode_entry(await redis_client.get(key))
+
+
+async def cache_mget(keys: list[str]) -> list[CacheEntry | None]:
+    return [decode_entry(raw) for raw in await redis_client.mget(keys)]
+
+
+async def cache_mget_decoded(keys: list[str], decode: Callable[[bytes], T]) -> list[CacheEntry[T] | None]:
+    """Like ``cache_mget`` with payloads decoded, serving keys held in the local cache without Redis."""
+    results: list[CacheEntry[T] | None] = [local_cache.get(key) for key in keys]
+    remote = [index for index, entry in enumerate(results) if entry is None]
+    if not remote:
+        return results
+
+    for index, raw in zip(remote, await redis_client.mget([keys[index] for index in remote])):
+        entry = decode_entry(raw)
+        if entry is None:
+            continue
+        results[index] = CacheEntry(payload=decode(entry.payload), soft_expires_at=entry.soft_expires_at)
+        local_cache.put(keys[index], results[index])
+    return results
+
+
+async def cache_get_decoded(key: str, decode: Callable[[bytes], T]) -> CacheEntry[T] | None:
+    (entry,) = await cache_mget_decoded([key], decode)
+    return entry
+
+
+def _hard_ttl(soft_ttl: int) -> int:
+    return soft_ttl + settings.cache_stale_grace_seconds if settings.cache_stale_while_revalidate else soft_ttl
+
+
+async def cache_set(key: str, payload: bytes, soft_ttl: int, value: object | None = None) -> None:
+    """Write ``payload``; ``value`` is its decoded form, kept in this worker's local cache."""
+    await cache_set_many([(key, payload, soft_ttl)], None if value is None else [value])
+
+
+async def cache_set_many(items: list[tuple[str, bytes, int]], values: list[object] | None = None) -> None:
+    """Write ``(key, payload, soft_ttl)`` entries in one round trip and invalidate other workers' copies."""
+    if not items:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, payload, soft_ttl in items:
+            pipe.set(key, encode_entry(payload, soft_ttl), ex=_hard_ttl(soft_ttl))
+            pipe.publish(INVALIDATION_CHANNEL, _worker_id + b"|" + key.encode())
+        await pipe.execute()
+
+    for index, (key, _, soft_ttl) in enumerate(items):
+        if values is None:
+            local_cache.invalidate(key)
+        else:
+            local_cache.put(key, CacheEntry(payload=values[index], soft_expires_at=time.time() + soft_ttl))
+
+
+async def run_invalidation_listener() -> None:
+    """Drop local copies of keys rewritten by other workers; the local cache is only used while subscribed."""
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            local_cache.active = True
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                origin, _, key = message["data"].partition(b"|")
+                if origin != _worker_id:
+                    local_cache.invalidate(key.decode())
+        except (RedisError, OSError) as exc:
+            logger.warning("Cache invalidation listener disconnected: {}", exc)
+        finally:
+            # Messages may have been missed while unsubscribed, so nothing local can be trusted.
+            local_cache.active = False
+            local_cache.clear()
+            await pubsub.aclose()
+        await asyncio.sleep(1)
+
+
+async def acquire_refresh_lock(key: str) -> bool:
+    # The lock is left to expire so a key is refreshed at most once per lock window across workers.
+    return bool(await redis_client.set(f"refresh:{key}", "1", nx=True, ex=settings.cache_refresh_lock_seconds))
+
+
+def refresh_in_background(key: str, refresh: Callable[[], Awaitable[object]]) -> None:
+    """Run ``refresh`` once per key across workers while callers keep serving the stale entry."""
+    if not settings.cache_stale_while_revalidate or key in _refresh_tasks:
+        return
 
+    async def run() -> None:
+        if not await acquire_refresh_lock(key):
+            return
+        try:
+            await refresh()
+        # Refreshes reach arbitrary upstream clients; whatever fails, the stale entry is still served.
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Background refresh of {} failed: {}", key, exc)
 
-redis_client = Redis.from_url(settings.redis_url, decode_responses=True)
+    task = asyncio.create_task(run())
+    _refresh_tasks[key] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(key, None))
@@ -14,6 +14,67 @@ class Settings(BaseSettings):
     alpha_vantage_api_key: str = ""
     fred_api_key: str = ""
 
+    # "live", "record" (live, saving upstream responses), "replay" (recordings only) or "synthetic".
+    market_data_mode: str = "live"
+    market_data_recordings_dir: str = "data/recordings"
+    synthetic_seed: int = 0
+    synthetic_origin: str = "2000-01-03"
+
+    bar_store_dir: str = "data/bars"
+    intraday_store_dir: str = "data/intraday"
+    intraday_fetch_window_days: int = 7
+    yahoo_max_workers: int = 8
+    fred_store_dir: str = "data/fred"
+    fred_refresh_interval_seconds: int = 60 * 60 * 6
+    fred_revision_lookback_days: int = 366 * 5
+    fred_catalog_path: str = "data/fred/catalog.parquet"
+    fred_catalog_refresh_interval_seconds: int = 60 * 60 * 24 * 7
+    fred_catalog_seed_queries: list[str] = [
+        "gdp", "inflation", "consumer price index", "unemployment", "employment", "interest rate", "treasury",
+        "money supply", "housing", "industrial production", "retail sales", "exchange rate", "oil", "wages",
+    ]
+    fred_catalog_pages_per_query: int = 2
+
+    http_timeout_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http_max_connections_per_host: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = False
+
+    alpha_vantage_calls_per_minute: int = 5
+    alpha_vantage_calls_per_day: int = 25
+    fred_calls_per_minute: int = 120
+    upstream_max_queue_wait_seconds: float = 30.0
+
+    batch_max_concurrency: int = 8
+
+    cache_stale_while_revalidate: bool = True
+    cache_stale_grace_seconds: int = 60 * 60 * 24
+    cache_refresh_lock_seconds: int = 60
+    cache_warm_interval_seconds: int = 300
+    cache_warm_batch_size: int = 50
+    bar_chunk_closed_month_ttl_seconds: int = 60 * 60 * 24 * 7
+    bar_chunk_mget_batch_size: int = 2000
+    universe_fetch_batch_size: int = 100
+    universe_fetch_concurrency: int = 4
+    cache_codec: str = "binary"
+    cache_compression: bool = True
+    cache_compress_min_bytes: int = 1024
+    l1_cache_enabled: bool = True
+    l1_cache_max_entries: int = 256
+    l1_cache_ttl_seconds: float = 30.0
+    response_compress_min_bytes: int = 1024
+    response_body_cache_ttl_seconds: int = 60 * 60
+    indicator_checkpoint_ttl_seconds: int = 60 * 60 * 24
+    indicator_cache_ttl_seconds: int = 60 * 60 * 24
+    registry_flush_interval_seconds: float = 2.0
+    registry_flush_batch_size: int = 500
+    registry_count_cache_ttl_seconds: int = 60
+
+    singleflight_lock_ttl_seconds: float = 30.0
+    singleflight_wait_timeout_seconds: float = 30.0
+
     frontend_origin: str = "http://localhost:3000"
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
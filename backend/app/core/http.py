@@ -0,0 +1,66 @@
+from collections.abc import Callable
+
+import httpx
+
+from app.core.config import settings
+
+# Each upstream host gets its own transport so one slow provider cannot exhaust the others' connections.
+UPSTREAM_HOSTS = ("https://api.stlouisfed.org", "https://www.alphavantage.co")
+
+_client: httpx.AsyncClient | None = None
+
+# Wraps a builder of the live transport into the transport actually mounted for each upstream host.
+UpstreamTransport = Callable[[Callable[[], httpx.AsyncBaseTransport]], httpx.AsyncBaseTransport]
+
+
+def _live_transport(live: Callable[[], httpx.AsyncBaseTransport]) -> httpx.AsyncBaseTransport:
+    return live()
+
+
+_upstream_transport: UpstreamTransport = _live_transport
+
+
+def set_upstream_transport(factory: UpstreamTransport) -> None:
+    """Install the upstream transport factory; ``app.data.providers`` installs the market-data-mode one."""
+    global _upstream_transport
+    _upstream_transport = factory
+
+
+def _build_transport() -> httpx.AsyncHTTPTransport:
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections_per_host,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    return httpx.AsyncHTTPTransport(limits=limits, http2=settings.http2_enabled)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    timeout = httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds)
+    return httpx.AsyncClient(
+        timeout=timeout,
+        transport=_build_transport(),
+        mounts={host: _upstream_transport(_build_transport) for host in UPSTREAM_HOSTS},
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        # Scripts and tests run without the app lifespan; give them a pool of their own.
+        _client = create_http_client()
+    return _client
@@ -0,0 +1,52 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+class LocalCache:
+    """Size- and TTL-bounded LRU of decoded cache values kept inside one worker process.
+
+    Values are only held while ``active`` is set, which the Redis invalidation listener does once it
+    is subscribed; without it a worker could keep serving a value another worker has rewritten.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.active = False
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        item = self._entries.get(key) if self.active else None
+        if item is None or item[0] <= self.clock():
+            if item is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def put(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        if not self.active or self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from app.core.config import settings
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+class UpstreamQuotaError(Exception):
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} quota exhausted, retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, period_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = capacity / period_seconds
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, tokens: int = 1) -> float:
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def consume(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+@dataclass
+class ProviderQueue:
+    buckets: list[TokenBucket]
+    waiters: list[tuple[int, int, asyncio.Future]] = field(default_factory=list)
+    dispatcher: asyncio.Task | None = None
+    granted: int = 0
+    rejected: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def delay(self, tokens: int = 1) -> float:
+        return max((bucket.time_until(tokens) for bucket in self.buckets), default=0.0)
+
+
+class UpstreamScheduler:
+    """Per-provider token buckets in front of rate-limited upstream APIs.
+
+    Callers wait in a priority queue until every bucket of their provider has a token, so
+    interactive requests overtake queued background refreshes. Buckets are per worker process.
+    """
+
+    def __init__(self, limits: dict[str, list[tuple[int, float]]], max_wait_seconds: float):
+        self.max_wait_seconds = max_wait_seconds
+        self._queues = {
+            provider: ProviderQueue(buckets=[TokenBucket(calls, period) for calls, period in windows if calls > 0])
+            for provider, windows in limits.items()
+        }
+        self._sequence = itertools.count()
+
+    async def acquire(self, provider: str, priority: Priority = Priority.INTERACTIVE) -> None:
+        queue = self._queues.get(provider)
+        if queue is None or not queue.buckets:
+            return
+
+        # Everything already queued ahead would drain first, so estimate the wait before joining.
+        ahead = sum(1 for item in queue.waiters if item[0] <= priority and not item[2].done())
+        estimate = queue.delay(ahead + 1)
+        if estimate > self.max_wait_seconds:
+            queue.rejected += 1
+            raise UpstreamQuotaError(provider, retry_after=estimate)
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        heapq.heappush(queue.waiters, (int(priority), next(self._sequence), future))
+        if queue.dispatcher is None or queue.dispatcher.done():
+            queue.dispatcher = asyncio.create_task(self._dispatch(queue))
+
+        enqueued = loop.time()
+        await future
+        waited = loop.time() - enqueued
+        queue.granted += 1
+        queue.total_wait_seconds += waited
+        queue.max_wait_seconds = max(queue.max_wait_seconds, waited)
+
+    async def _dispatch(self, queue: ProviderQueue) -> None:
+        while queue.waiters:
+            future = queue.waiters[0][2]
+            if future.done():
+                heapq.heappop(queue.waiters)
+                continue
+            delay = queue.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(queue.waiters)
+            for bucket in queue.buckets:
+                bucket.consume()
+            future.set_result(None)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {
+            provider: {
+                "queue_depth": sum(1 for item in queue.waiters if not item[2].done()),
+                "granted": queue.granted,
+                "rejected": queue.rejected,
+                "avg_wait_seconds": queue.total_wait_seconds / queue.granted if queue.granted else 0.0,
+                "max_wait_seconds": queue.max_wait_seconds,
+                "next_slot_seconds": queue.delay(),
+            }
+            for provider, queue in self._queues.items()
+        }
+
+
+# Replayed and synthetic responses never reach the providers, so their quotas do not apply.
+upstream_scheduler = UpstreamScheduler(
+    limits={
+        "alpha_vantage": [
+            (settings.alpha_vantage_calls_per_minute, 60.0),
+            (settings.alpha_vantage_calls_per_day, 86_400.0),
+        ],
+        "fred": [
+            (settings.fred_calls_per_minute, 60.0),
+        ],
+    }
+    if settings.market_data_mode in ("live", "record")
+    else {},
+    max_wait_seconds=settings.upstream_max_queue_wait_seconds,
+)
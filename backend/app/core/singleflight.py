@@ -0,0 +1,98 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from app.core.cache import redis_client
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Delete the lock only if this worker still owns it; an expired lock may have been taken over by a peer.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent loads of the same cache key into one upstream fetch.
+
+    Within a worker every caller awaits one shared task. Across workers the task first takes a
+    Redis lock; workers that lose the race poll ``load_cached`` until the owner has written the
+    result, and compute it themselves only if the lock is released without a result appearing.
+    """
+
+    def __init__(
+        self,
+        redis: Redis | None,
+        lock_ttl_seconds: float = 30.0,
+        wait_timeout_seconds: float = 30.0,
+        poll_interval_seconds: float = 0.1,
+    ):
+        self.redis = redis
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        load_cached: Callable[[], Awaitable[T | None]] | None = None,
+    ) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, compute, load_cached))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so a disconnecting client does not cancel the fetch other callers are waiting on.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        load_cached: Callable[[], Awaitable[T | None]] | None,
+    ) -> T:
+        if self.redis is None or load_cached is None:
+            return await compute()
+
+        loop = asyncio.get_running_loop()
+        lock_key = f"singleflight:{key}"
+        token = uuid4().hex
+        deadline = loop.time() + self.wait_timeout_seconds
+
+        while True:
+            if await self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl_seconds * 1000)):
+                try:
+                    # A previous owner may have finished between our cache miss and taking the lock.
+                    cached = await load_cached()
+                    return cached if cached is not None else await compute()
+                finally:
+                    await self.redis.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+
+            await asyncio.sleep(self.poll_interval_seconds)
+            cached = await load_cached()
+            if cached is not None:
+                return cached
+            if loop.time() >= deadline:
+                return await compute()
+
+
+singleflight = SingleFlight(
+    redis_client,
+    lock_ttl_seconds=settings.singleflight_lock_ttl_seconds,
+    wait_timeout_seconds=settings.singleflight_wait_timeout_seconds,
+)
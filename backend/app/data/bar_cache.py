@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime
+
+import pandas as pd
+
+from app.core.cache import cache_mget_decoded, cache_set_many, refresh_in_background
+from app.core.config import settings
+from app.core.singleflight import singleflight
+from app.data.bars import OhlcvArrays
+from app.data.codec import decode_bars, encode_bars
+
+RangeLoader = Callable[[str, str], Awaitable[OhlcvArrays]]
+ManyRangeLoader = Callable[[list[str], str, str], Awaitable[dict[str, OhlcvArrays]]]
+Period = tuple[date, date]
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def months_between(start: date, end: date) -> list[date]:
+    """Month starts overlapping the half-open ``[start, end)`` window."""
+    months: list[date] = []
+    cursor = month_start(start)
+    while cursor < end:
+        months.append(cursor)
+        cursor = next_month(cursor)
+    return months
+
+
+def rollup_periods(start: date, end: date, today: date) -> list[Period]:
+    """Half-open periods overlapping ``[start, end)`` as whole closed years, then the months of the current year."""
+    periods: list[Period] = []
+    cursor = date(start.year, 1, 1)
+    while cursor < end and cursor.year < today.year:
+        periods.append((cursor, date(cursor.year + 1, 1, 1)))
+        cursor = periods[-1][1]
+    months = months_between(max(cursor, start), end)
+    return periods + [(month, next_month(month)) for month in months if month <= month_start(today)]
+
+
+def chunk_key(source: str, symbol: str, month: date) -> str:
+    return f"bars:{source}:{symbol.upper()}:{month:%Y-%m}"
+
+
+def period_key(source: str, symbol: str, period: Period) -> str:
+    start, end = period
+    if end == next_month(start):
+        return chunk_key(source, symbol, start)
+    return f"bars:{source}:{symbol.upper()}:{start.year}"
+
+
+def _period_bounds_ns(period: Period) -> tuple[int, int]:
+    return pd.Timestamp(period[0], tz=UTC).value, pd.Timestamp(period[1], tz=UTC).value
+
+
+def _month_bounds_ns(month: date) -> tuple[int, int]:
+    return _period_bounds_ns((month, next_month(month)))
+
+
+class BarChunkCache:
+    """Daily bars cached in Redis as one entry per symbol and calendar month.
+
+    Any requested window is assembled from the month chunks it overlaps, so panning a chart
+    only loads the months not cached yet. Closed months change rarely and keep a long TTL; the
+    current month uses the short per-source TTL and is refreshed stale-while-revalidate.
+    """
+
+    def __init__(self, closed_month_ttl: int):
+        self.closed_month_ttl = closed_month_ttl
+
+    def _soft_ttl(self, period_end: date, current_ttl: int) -> int:
+        return current_ttl if period_end > datetime.now(UTC).date() else self.closed_month_ttl
+
+    async def _store(self, source: str, chunks: dict[tuple[str, Period], OhlcvArrays], current_ttl: int) -> None:
+        await cache_set_many(
+            [
+                (period_key(source, symbol, period), encode_bars(chunk), self._soft_ttl(period[1], current_ttl))
+                for (symbol, period), chunk in chunks.items()
+            ],
+            values=list(chunks.values()),
+        )
+
+    async def _fill(
+        self,
+        source: str,
+        symbol: str,
+        months: list[date],
+        load: RangeLoader,
+        current_ttl: int,
+    ) -> dict[date, OhlcvArrays]:
+        bars = await load(months[0].isoformat(), next_month(months[-1]).isoformat())
+        chunks = {month: bars.between(*_month_bounds_ns(month)) for month in months}
+        periods = {(symbol, (month, next_month(month))): chunk for month, chunk in chunks.items()}
+        await self._store(source, periods, current_ttl)
+        return chunks
+
+    async def _fill_many(
+        self,
+        source: str,
+        missing: dict[str, list[Period]],
+        load_many: ManyRangeLoader,
+        current_ttl: int,
+    ) -> dict[tuple[str, Period], OhlcvArrays]:
+        """Load the ``missing`` periods of several symbols in one call, over the span of all of them."""
+        first = min(periods[0][0] for periods in missing.values())
+        last = max(periods[-1][1] for periods in missing.values())
+        loaded = await load_many(list(missing), first.isoformat(), last.isoformat())
+        chunks = {
+            (symbol, period): loaded.get(symbol, OhlcvArrays.empty()).between(*_period_bounds_ns(period))
+            for symbol, periods in missing.items()
+            for period in periods
+        }
+        await self._store(source, chunks, current_ttl)
+        return chunks
+
+    async def _read_run(self, source: str, symbol: str, months: list[date]) -> dict[date, OhlcvArrays] | None:
+        entries = await cache_mget_decoded([chunk_key(source, symbol, month) for month in months], decode_bars)
+        if any(entry is None for entry in entries):
+            return None
+        return {month: entry.payload for month, entry in zip(months, entries)}
+
+    async def _read_periods(
+        self, source: str, periods: dict[str, list[Period]]
+    ) -> dict[tuple[str, Period], OhlcvArrays] | None:
+        wanted = [(symbol, period) for symbol, symbol_periods in periods.items() for period in symbol_periods]
+        entries = await cache_mget_decoded([period_key(source, *item) for item in wanted], decode_bars)
+        if any(entry is None for entry in entries):
+            return None
+        return {item: entry.payload for item, entry in zip(wanted, entries)}
+
+    async def get_range(
+        self,
+        source: str,
+        symbol: str,
+        start: str,
+        end: str,
+        load: RangeLoader,
+        current_ttl: int,
+        refresh_load: RangeLoader | None = None,
+    ) -> tuple[OhlcvArrays, bool]:
+        """Return bars in ``[start, end)`` and whether any month had to be loaded through ``load``."""
+        start_date = date.fromisoformat(start)
+        end_date = date.fromisoformat(end)
+        current_month = month_start(datetime.now(UTC).date())
+        months = [month for month in months_between(start_date, end_date) if month <= current_month]
+        if not months:
+            return OhlcvArrays.empty(), False
+
+        entries = await cache_mget_decoded([chunk_key(source, symbol, month) for month in months], decode_bars)
+        chunks: dict[date, OhlcvArrays] = {}
+        runs: list[list[date]] = []
+        for month, entry in zip(months, entries):
+            if entry is None:
+                if runs and next_month(runs[-1][-1]) == month:
+                    runs[-1].append(month)
+                else:
+                    runs.append([month])
+                continue
+            chunks[month] = entry.payload
+            if entry.is_stale:
+                refresh_in_background(
+                    chunk_key(source, symbol, month),
+                    lambda month=month: self._fill(source, symbol, [month], refresh_load or load, current_ttl),
+                )
+
+        for run in runs:
+            run_key = f"{chunk_key(source, symbol, run[0])}+{len(run)}"
+            chunks.update(
+                await singleflight.do(
+                    run_key,
+                    lambda run=run: self._fill(source, symbol, run, load, current_ttl),
+                    lambda run=run: self._read_run(source, symbol, run),
+                )
+            )
+
+        bars = OhlcvArrays.concat([chunks[month] for month in months])
+        lower = pd.Timestamp(start_date, tz=UTC).value
+        upper = pd.Timestamp(end_date, tz=UTC).value
+        return bars.between(lower, upper), bool(runs)
+
+    async def get_many(
+        self,
+        source: str,
+        symbols: list[str],
+        start: str,
+        end: str,
+        load_many: ManyRangeLoader,
+        current_ttl: int,
+    ) -> tuple[dict[str, OhlcvArrays], list[str]]:
+        """Bars in ``[start, end)`` for many symbols, plus the symbols whose load failed.
+
+        Closed years are cached as one chunk per symbol and year (the current year's months are the
+        chunks ``get_range`` uses), so a long window costs a few keys per symbol. Keys are read in
+        batched round trips; symbols missing any chunk are loaded through ``load_many`` in batches of
+        ``universe_fetch_batch_size``, at most ``universe_fetch_concurrency`` at a time, and concurrent
+        screens needing the same batch share one load.
+
+        The year chunks deliberately duplicate the closed month chunks: decoding twelve month chunks per
+        symbol and year dominated long screens. Both are written from upstream bars and neither is
+        invalidated by the other; each is rewritten when its own soft TTL lapses, so a corrected bar
+        reaches the two copies independently, within ``closed_month_ttl``.
+        """
+        periods = rollup_periods(date.fromisoformat(start), date.fromisoformat(end), datetime.now(UTC).date())
+        if not periods:
+            return {symbol: OhlcvArrays.empty() for symbol in symbols}, []
+
+        keys = [period_key(source, symbol, period) for symbol in symbols for period in periods]
+        entries = []
+        for offset in range(0, len(keys), settings.bar_chunk_mget_batch_size):
+            entries += await cache_mget_decoded(keys[offset : offset + settings.bar_chunk_mget_batch_size], decode_bars)
+
+        chunks: dict[tuple[str, Period], OhlcvArrays] = {}
+        missing: dict[str, list[Period]] = {}
+        stale: dict[str, list[Period]] = {}
+        for (symbol, period), entry in zip(((symbol, period) for symbol in symbols for period in periods), entries):
+            if entry is None:
+                missing.setdefault(symbol, []).append(period)
+                continue
+            chunks[symbol, period] = entry.payload
+            if entry.is_stale:
+                stale.setdefault(symbol, []).append(period)
+
+        size = settings.universe_fetch_batch_size
+        for offset in range(0, len(stale), size):
+            batch = {symbol: stale[symbol] for symbol in list(stale)[offset : offset + size]}
+            first = next(iter(batch))
+            refresh_in_background(
+                f"{period_key(source, first, batch[first][0])}+{len(batch)}",
+                lambda batch=batch: self._fill_many(source, batch, load_many, current_ttl),
+            )
+
+        semaphore = asyncio.Semaphore(settings.universe_fetch_concurrency)
+
+        async def fill(batch: list[str]) -> dict[tuple[str, Period], OhlcvArrays]:
+            wanted = {symbol: missing[symbol] for symbol in batch}
+            batch_keys = [period_key(source, symbol, period) for symbol in batch for period in wanted[symbol]]
+            async with semaphore:
+                return await singleflight.do(
+                    f"bars:{source}:batch:{hashlib.sha1(' '.join(batch_keys).encode()).hexdigest()}",
+                    lambda: self._fill_many(source, wanted, load_many, current_ttl),
+                    lambda: self._read_periods(source, wanted),
+                )
+
+        cold = list(missing)
+        batches = [cold[offset : offset + size] for offset in range(0, len(cold), size)]
+        failed: list[str] = []
+        for batch, result in zip(batches, await asyncio.gather(*map(fill, batches), return_exceptions=True)):
+            if isinstance(result, Exception):
+                failed += batch
+            else:
+                chunks.update(result)
+
+        lower = pd.Timestamp(date.fromisoformat(start), tz=UTC).value
+        upper = pd.Timestamp(date.fromisoformat(end), tz=UTC).value
+        bars = {
+            symbol: OhlcvArrays.concat([chunks[symbol, period] for period in periods]).between(lower, upper)
+            for symbol in symbols
+            if symbol not in failed
+        }
+        return bars, failed
+
+    async def refresh_month(
+        self,
+        source: str,
+        symbol: str,
+        month: date,
+        load: RangeLoader,
+        current_ttl: int,
+    ) -> None:
+        await self._fill(source, symbol, [month], load, current_ttl)
+
+
+bar_chunk_cache = BarChunkCache(closed_month_ttl=settings.bar_chunk_closed_month_ttl_seconds)
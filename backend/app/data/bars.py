@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class OhlcvArrays:
+    """Daily bars held column-wise: ``timestamps`` are UTC epoch nanoseconds, prices and volume float64."""
+
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def empty(cls) -> "OhlcvArrays":
+        return cls(np.empty(0, dtype=np.int64), *(np.empty(0, dtype=np.float64) for _ in BAR_COLUMNS))
+
+    @classmethod
+    def from_columns(cls, timestamps: pd.DatetimeIndex | pd.Series, **columns: np.ndarray) -> "OhlcvArrays":
+        """Build sorted, de-duplicated arrays; later duplicates of a timestamp win."""
+        index = pd.DatetimeIndex(timestamps)
+        index = index.tz_localize(UTC) if index.tz is None else index.tz_convert(UTC)
+        stamps = index.as_unit("ns").asi8
+
+        order = np.argsort(stamps, kind="stable")
+        stamps = stamps[order]
+        keep = np.ones(len(stamps), dtype=bool)
+        keep[:-1] = stamps[:-1] != stamps[1:]
+        selection = order[keep]
+
+        return cls(
+            stamps[keep],
+            *(np.asarray(columns[name], dtype=np.float64)[selection] for name in BAR_COLUMNS),
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "OhlcvArrays":
+        """Accept either a ``timestamp`` column or a datetime index, with lower-case bar columns."""
+        timestamps = frame["timestamp"] if "timestamp" in frame.columns else frame.index
+        return cls.from_columns(timestamps, **{name: frame[name].to_numpy() for name in BAR_COLUMNS})
+
+    @classmethod
+    def concat(cls, parts: list["OhlcvArrays"]) -> "OhlcvArrays":
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        timestamps = np.concatenate([part.timestamps for part in parts])
+        columns = {name: np.concatenate([getattr(part, name) for part in parts]) for name in BAR_COLUMNS}
+        if np.all(timestamps[1:] > timestamps[:-1]):
+            # Consecutive chunks are already sorted and distinct, so the re-sort is skipped.
+            return cls(timestamps, **columns)
+        return cls.from_columns(pd.to_datetime(timestamps, unit="ns", utc=True), **columns)
+
+    def index(self) -> pd.DatetimeIndex:
+        return pd.to_datetime(self.timestamps, unit="ns", utc=True)
+
+    def datetimes(self) -> list[datetime]:
+        return list(self.index().to_pydatetime())
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"timestamp": self.index(), **{name: getattr(self, name) for name in BAR_COLUMNS}})
+
+    def between(self, start_ns: int, end_ns: int) -> "OhlcvArrays":
+        lower, upper = np.searchsorted(self.timestamps, [start_ns, end_ns], side="left")
+        return self.take(slice(lower, upper))
+
+    def take(self, selection: slice | np.ndarray) -> "OhlcvArrays":
+        return OhlcvArrays(self.timestamps[selection], *(getattr(self, name)[selection] for name in BAR_COLUMNS))
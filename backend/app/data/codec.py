@@ -0,0 +1,238 @@
+import hashlib
+import json
+import struct
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Protocol
+
+import numpy as np
+import pandas as pd
+import zstandard
+
+from app.core.config import settings
+from app.data.bars import BAR_COLUMNS, OhlcvArrays
+from app.models.schemas import DataPoint, UnifiedSeriesResponse
+
+# Binary frame: magic, version, flags, then a length-prefixed JSON header and the raw column buffers.
+MAGIC = b"CF"
+VERSION = 1
+FLAG_ZSTD = 1
+_PREFIX = struct.Struct("<2sBB")
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class ColumnFrame:
+    """Named equal-length numpy columns plus a small JSON-able header."""
+
+    columns: dict[str, np.ndarray]
+    header: dict[str, Any] = field(default_factory=dict)
+
+
+class CacheCodec(Protocol):
+    def encode(self, frame: ColumnFrame) -> bytes: ...
+
+    def decode(self, data: bytes) -> ColumnFrame: ...
+
+
+class JsonCodec:
+    """The previous JSON representation, kept for comparison and for reading entries it wrote."""
+
+    def encode(self, frame: ColumnFrame) -> bytes:
+        return json.dumps(
+            {
+                "header": frame.header,
+                "dtypes": {name: column.dtype.str for name, column in frame.columns.items()},
+                "columns": {name: column.tolist() for name, column in frame.columns.items()},
+            }
+        ).encode()
+
+    def decode(self, data: bytes) -> ColumnFrame:
+        document = json.loads(data)
+        return ColumnFrame(
+            columns={
+                name: np.asarray(values, dtype=np.dtype(document["dtypes"][name]))
+                for name, values in document["columns"].items()
+            },
+            header=document["header"],
+        )
+
+
+class BinaryCodec:
+    """Packed little-endian column buffers, zstd-compressed once the body reaches ``compress_min_bytes``."""
+
+    def __init__(self, compression_level: int = 3, compress_min_bytes: int | None = 1024):
+        self.compression_level = compression_level
+        self.compress_min_bytes = compress_min_bytes
+        self._local = threading.local()
+
+    def _decompressor(self) -> zstandard.ZstdDecompressor:
+        # Building a decompressor costs about as much as decoding a month chunk; one per thread is reused.
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        return decompressor
+
+    def encode(self, frame: ColumnFrame) -> bytes:
+        columns = {name: np.ascontiguousarray(column, dtype=column.dtype.newbyteorder("<")) for name, column in frame.columns.items()}
+        header = json.dumps(
+            {
+                "header": frame.header,
+                "columns": [[name, column.dtype.str, len(column)] for name, column in columns.items()],
+            },
+            separators=(",", ":"),
+        ).encode()
+        body = b"".join([_HEADER_LENGTH.pack(len(header)), header, *(column.tobytes() for column in columns.values())])
+
+        flags = 0
+        if self.compress_min_bytes is not None and len(body) >= self.compress_min_bytes:
+            body = zstandard.ZstdCompressor(level=self.compression_level).compress(body)
+            flags |= FLAG_ZSTD
+        return _PREFIX.pack(MAGIC, VERSION, flags) + body
+
+    def decode(self, data: bytes) -> ColumnFrame:
+        magic, version, flags = _PREFIX.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a binary column frame")
+        body = memoryview(data)[_PREFIX.size :]
+        if flags & FLAG_ZSTD:
+            body = memoryview(self._decompressor().decompress(body))
+
+        (header_length,) = _HEADER_LENGTH.unpack_from(body)
+        offset = _HEADER_LENGTH.size
+        document = json.loads(bytes(body[offset : offset + header_length]))
+        offset += header_length
+
+        columns: dict[str, np.ndarray] = {}
+        for name, dtype, length in document["columns"]:
+            dtype = np.dtype(dtype)
+            columns[name] = np.frombuffer(body, dtype=dtype, count=length, offset=offset)
+            offset += dtype.itemsize * length
+        return ColumnFrame(columns=columns, header=document["header"])
+
+
+CODECS: dict[str, CacheCodec] = {
+    "binary": BinaryCodec(compress_min_bytes=settings.cache_compress_min_bytes if settings.cache_compression else None),
+    "json": JsonCodec(),
+}
+
+
+def get_codec(name: str | None = None) -> CacheCodec:
+    return CODECS[name or settings.cache_codec]
+
+
+def decode_frame(data: bytes) -> ColumnFrame:
+    """Decode with whichever codec wrote ``data``, so switching ``cache_codec`` keeps old entries readable."""
+    return CODECS["binary" if data[:2] == MAGIC else "json"].decode(data)
+
+
+def frame_digest(frame: ColumnFrame) -> str:
+    """Content hash of the columns and series identity, kept in the header so it is computed once per frame.
+
+    ``last_updated`` is left out: a re-fetch that returns the same data keeps the same digest.
+    """
+    digest = frame.header.get("digest")
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=16)
+        identity = {key: frame.header.get(key) for key in ("ticker_or_series_id", "source", "frequency", "unit")}
+        hasher.update(json.dumps(identity, sort_keys=True).encode())
+        for name, column in frame.columns.items():
+            column = np.ascontiguousarray(column)
+            hasher.update(f"{name}:{column.dtype.str}:{len(column)}".encode())
+            hasher.update(column.data)
+        digest = frame.header["digest"] = hasher.hexdigest()
+    return digest
+
+
+def bars_to_frame(bars: OhlcvArrays) -> ColumnFrame:
+    return ColumnFrame(columns={"timestamp": bars.timestamps, **{name: getattr(bars, name) for name in BAR_COLUMNS}})
+
+
+def frame_to_bars(frame: ColumnFrame) -> OhlcvArrays:
+    return OhlcvArrays(
+        np.asarray(frame.columns["timestamp"], dtype=np.int64),
+        *(np.asarray(frame.columns[name], dtype=np.float64) for name in BAR_COLUMNS),
+    )
+
+
+def series_to_frame(response: UnifiedSeriesResponse) -> ColumnFrame:
+    """Column-wise series; point metadata must be numeric fields or an echo of the point timestamp."""
+    timestamps = pd.DatetimeIndex([point.timestamp for point in response.data], dtype="datetime64[ns, UTC]")
+    metadata_keys = list(response.data[0].metadata) if response.data else []
+    timestamp_keys = [key for key in metadata_keys if isinstance(response.data[0].metadata[key], datetime)]
+    numeric_keys = [key for key in metadata_keys if key not in timestamp_keys]
+
+    columns = {
+        "timestamp": timestamps.asi8,
+        "value": np.fromiter((point.value for point in response.data), dtype=np.float64, count=len(response.data)),
+    }
+    for key in numeric_keys:
+        columns[f"metadata.{key}"] = np.asarray([point.metadata[key] for point in response.data], dtype=np.float64)
+
+    return ColumnFrame(
+        columns=columns,
+        header={
+            "ticker_or_series_id": response.ticker_or_series_id,
+            "source": response.source,
+            "frequency": response.frequency,
+            "unit": response.unit,
+            "last_updated": response.last_updated.isoformat(),
+            "metadata_keys": metadata_keys,
+            "timestamp_keys": timestamp_keys,
+        },
+    )
+
+
+def frame_to_series(frame: ColumnFrame) -> UnifiedSeriesResponse:
+    header = frame.header
+    timestamps = pd.to_datetime(frame.columns["timestamp"], unit="ns", utc=True).to_pydatetime()
+    keys = header["metadata_keys"]
+    metadata_columns = [
+        timestamps if key in header["timestamp_keys"] else frame.columns[f"metadata.{key}"].tolist() for key in keys
+    ]
+
+    values = frame.columns["value"].tolist()
+    if not keys:
+        points = [DataPoint(timestamp=timestamp, value=value) for timestamp, value in zip(timestamps, values)]
+    else:
+        points = [
+            DataPoint(timestamp=timestamp, value=value, metadata=dict(zip(keys, row)))
+            for timestamp, value, *row in zip(timestamps, values, *metadata_columns)
+        ]
+
+    return UnifiedSeriesResponse(
+        ticker_or_series_id=header["ticker_or_series_id"],
+        source=header["source"],
+        frequency=header["frequency"],
+        unit=header["unit"],
+        last_updated=datetime.fromisoformat(header["last_updated"]),
+        data=points,
+    )
+
+
+def encode_bars(bars: OhlcvArrays) -> bytes:
+    return get_codec().encode(bars_to_frame(bars))
+
+
+def decode_bars(data: bytes) -> OhlcvArrays:
+    return frame_to_bars(decode_frame(data))
+
+
+def encode_frame(frame: ColumnFrame) -> bytes:
+    return get_codec().encode(frame)
+
+
+def encode_series(response: UnifiedSeriesResponse) -> bytes:
+    return encode_frame(series_to_frame(response))
+
+
+def decode_series_frame(data: bytes) -> ColumnFrame:
+    if data[:1] == b"{" and b'"header"' not in data[:16]:
+        # Entries written before the codec hold the response JSON itself.
+        return series_to_frame(UnifiedSeriesResponse.model_validate_json(data))
+    return decode_frame(data)
+
+
+def decode_series(data: bytes) -> UnifiedSeriesResponse:
+    return frame_to_series(decode_series_frame(data))
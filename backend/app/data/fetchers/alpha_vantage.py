@@ -1,38 +1,89 @@
-from datetime import datetime
+from datetime import UTC, date, datetime, timedelta
 
 import httpx
+import pandas as pd
 
 from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.scheduler import Priority, upstream_scheduler
+from app.data.bars import OhlcvArrays
+
+FIELD_MAP = {
+    "open": "1. open",
+    "high": "2. high",
+    "low": "3. low",
+    "close": "4. close",
+    "volume": "6. volume",
+}
+INTRADAY_FIELD_MAP = {**FIELD_MAP, "volume": "5. volume"}
 
 
 class AlphaVantageFetcher:
     base_url = "https://www.alphavantage.co/query"
+    # The compact output holds the latest 100 trading days, roughly 140 calendar days.
+    compact_days = 140
+
+    def __init__(self, client: httpx.AsyncClient | None = None, priority: Priority = Priority.INTERACTIVE):
+        self.client = client or get_http_client()
+        self.priority = priority
 
-    async def fetch_daily(self, symbol: str) -> list[dict]:
+    async def fetch_daily(self, symbol: str, outputsize: str = "compact") -> OhlcvArrays:
         params = {
             "function": "TIME_SERIES_DAILY_ADJUSTED",
             "symbol": symbol,
-            "outputsize": "compact",
+            "outputsize": outputsize,
             "apikey": settings.alpha_vantage_api_key,
         }
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(self.base_url, params=params)
-            response.raise_for_status()
-            payload = response.json()
+        await upstream_scheduler.acquire("alpha_vantage", self.priority)
+        response = await self.client.get(self.base_url, params=params)
+        response.raise_for_status()
+        payload = response.json()
 
         raw = payload.get("Time Series (Daily)", {})
-        rows: list[dict] = []
-        for date_str, values in raw.items():
-            rows.append(
-                {
-                    "timestamp": datetime.fromisoformat(f"{date_str}T00:00:00+00:00"),
-                    "open": float(values["1. open"]),
-                    "high": float(values["2. high"]),
-                    "low": float(values["3. low"]),
-                    "close": float(values["4. close"]),
-                    "volume": float(values["6. volume"]),
-                }
-            )
-
-        rows.sort(key=lambda item: item["timestamp"])
-        return rows
+        if not raw:
+            return OhlcvArrays.empty()
+
+        frame = pd.DataFrame.from_dict(raw, orient="index")
+        return OhlcvArrays.from_columns(
+            pd.to_datetime(frame.index, utc=True),
+            **{name: frame[field].astype("float64").to_numpy() for name, field in FIELD_MAP.items()},
+        )
+
+    async def fetch_range(self, symbol: str, start: str, end: str) -> OhlcvArrays:
+        compact_start = datetime.now(UTC).date() - timedelta(days=self.compact_days)
+        outputsize = "compact" if date.fromisoformat(start) >= compact_start else "full"
+        bars = await self.fetch_daily(symbol=symbol, outputsize=outputsize)
+        return bars.between(pd.Timestamp(start, tz=UTC).value, pd.Timestamp(end, tz=UTC).value)
+
+    async def fetch_intraday(self, symbol: str, interval: str, month: str) -> OhlcvArrays:
+        """One calendar month (``YYYY-MM``) of regular-session bars for ``interval`` (``1min``, ``5min``, ...)."""
+        params = {
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": symbol,
+            "interval": interval,
+            "month": month,
+            "outputsize": "full",
+            "extended_hours": "false",
+            "apikey": settings.alpha_vantage_api_key,
+        }
+        await upstream_scheduler.acquire("alpha_vantage", self.priority)
+        response = await self.client.get(self.base_url, params=params)
+        response.raise_for_status()
+        payload = response.json()
+
+        raw = payload.get(f"Time Series ({interval})", {})
+        if not raw:
+            return OhlcvArrays.empty()
+
+        # Intraday timestamps are exchange-local wall clock times.
+        time_zone = payload.get("Meta Data", {}).get("6. Time Zone", "US/Eastern")
+        frame = pd.DataFrame.from_dict(raw, orient="index")
+        return OhlcvArrays.from_columns(
+            pd.to_datetime(frame.index).tz_localize(time_zone),
+            **{name: frame[field].astype("float64").to_numpy() for name, field in INTRADAY_FIELD_MAP.items()},
+        )
+
+    async def fetch_intraday_range(self, symbol: str, start: str, end: str, interval: str) -> OhlcvArrays:
+        months = pd.period_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), freq="M")
+        bars = OhlcvArrays.concat([await self.fetch_intraday(symbol, interval, str(month)) for month in months])
+        return bars.between(pd.Timestamp(start, tz=UTC).value, pd.Timestamp(end, tz=UTC).value)
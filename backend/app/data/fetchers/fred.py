@@ -1,44 +1,66 @@
-from datetime import datetime
-
 import httpx
 
 from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.scheduler import Priority, upstream_scheduler
 
 
 class FredFetcher:
     base_url = "https://api.stlouisfed.org/fred/series/observations"
     search_url = "https://api.stlouisfed.org/fred/series/search"
+    vintage_url = "https://api.stlouisfed.org/fred/series/vintagedates"
+
+    def __init__(self, client: httpx.AsyncClient | None = None, priority: Priority = Priority.INTERACTIVE):
+        self.client = client or get_http_client()
+        self.priority = priority
 
-    async def fetch_series(self, series_id: str, start: str, end: str) -> list[dict]:
+    async def fetch_series(self, series_id: str, start: str | None = None, end: str | None = None) -> list[dict]:
+        """Current-vintage observations; each row carries the ``realtime_start``/``realtime_end`` of the request."""
         params = {
             "series_id": series_id,
             "api_key": settings.fred_api_key,
             "file_type": "json",
-            "observation_start": start,
-            "observation_end": end,
         }
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(self.base_url, params=params)
-            response.raise_for_status()
-            payload = response.json()
+        if start is not None:
+            params["observation_start"] = start
+        if end is not None:
+            params["observation_end"] = end
+        await upstream_scheduler.acquire("fred", self.priority)
+        response = await self.client.get(self.base_url, params=params)
+        response.raise_for_status()
+        return response.json().get("observations", [])
 
-        observations = payload.get("observations", [])
-        for item in observations:
-            item["fetched_at"] = datetime.utcnow().isoformat()
-        return observations
+    async def fetch_vintage_dates(self, series_id: str, since: str) -> list[str]:
+        """Dates on which revisions or new observations of the series were published, from ``since`` on."""
+        params = {
+            "series_id": series_id,
+            "api_key": settings.fred_api_key,
+            "file_type": "json",
+            "realtime_start": since,
+            "sort_order": "asc",
+        }
+        await upstream_scheduler.acquire("fred", self.priority)
+        response = await self.client.get(self.vintage_url, params=params)
+        response.raise_for_status()
+        return [str(value) for value in response.json().get("vintage_dates", [])]
 
-    async def search_series(self, query: str, limit: int = 20) -> tuple[int, list[dict]]:
+    async def search_series(
+        self, query: str, limit: int = 20, offset: int = 0, order_by: str | None = None
+    ) -> tuple[int, list[dict]]:
         params = {
             "search_text": query,
             "api_key": settings.fred_api_key,
             "file_type": "json",
-            "limit": max(1, min(limit, 100)),
+            "limit": max(1, min(limit, 1000)),
+            "offset": offset,
             "sort_order": "desc",
         }
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(self.search_url, params=params)
-            response.raise_for_status()
-            payload = response.json()
+        if order_by is not None:
+            params["order_by"] = order_by
+        await upstream_scheduler.acquire("fred", self.priority)
+        response = await self.client.get(self.search_url, params=params)
+        response.raise_for_status()
+        payload = response.json()
 
         count = int(payload.get("count", 0))
         return count, payload.get("seriess", [])
@@ -1,25 +1,78 @@
-from datetime import UTC
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import pandas as pd
 import yfinance as yf
 
+from app.core.config import settings
+from app.data.bars import BAR_COLUMNS, OhlcvArrays
+
+# yfinance is synchronous; every call runs here so a slow Yahoo response never blocks the event loop.
+# Created on first use, so a lifespan that starts after an earlier shutdown gets a fresh pool.
+_executor: ThreadPoolExecutor | None = None
+
+
+def _yahoo_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.yahoo_max_workers, thread_name_prefix="yahoo")
+    return _executor
+
+
+def shutdown_yahoo_executor() -> None:
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _history_to_bars(history: pd.DataFrame) -> OhlcvArrays:
+    if history.empty:
+        return OhlcvArrays.empty()
+    history = history.dropna(subset=["Close"])
+    return OhlcvArrays.from_columns(
+        history.index,
+        **{name: history[name.capitalize()].to_numpy() for name in BAR_COLUMNS},
+    )
+
 
 class YahooFetcher:
-    async def fetch_daily(self, symbol: str, start: str, end: str) -> list[dict]:
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_yahoo_executor(), partial(func, *args, **kwargs))
+
+    async def fetch_daily(self, symbol: str, start: str, end: str) -> OhlcvArrays:
+        return await self.fetch_intraday(symbol, start, end, interval="1d")
+
+    async def fetch_intraday(self, symbol: str, start: str, end: str, interval: str) -> OhlcvArrays:
+        """Bars of a native Yahoo ``interval`` (``1m``, ``5m``, ...); Yahoo caps how far back and how wide these go."""
         ticker = yf.Ticker(symbol)
-        history: pd.DataFrame = ticker.history(start=start, end=end, interval="1d", auto_adjust=False)
-        history = history.reset_index()
-
-        rows: list[dict] = []
-        for _, row in history.iterrows():
-            rows.append(
-                {
-                    "timestamp": row["Date"].to_pydatetime().astimezone(UTC),
-                    "open": float(row["Open"]),
-                    "high": float(row["High"]),
-                    "low": float(row["Low"]),
-                    "close": float(row["Close"]),
-                    "volume": float(row["Volume"]),
-                }
-            )
-        return rows
+        history: pd.DataFrame = await self._run(ticker.history, start=start, end=end, interval=interval, auto_adjust=False)
+        return _history_to_bars(history)
+
+    async def fetch_daily_many(self, symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        """Download several symbols in one yfinance call and split the result per symbol."""
+        if not symbols:
+            return {}
+
+        frame: pd.DataFrame = await self._run(
+            yf.download,
+            symbols,
+            start=start,
+            end=end,
+            interval="1d",
+            auto_adjust=False,
+            group_by="ticker",
+            progress=False,
+            threads=settings.yahoo_max_workers,
+        )
+        if frame.empty:
+            return {symbol: OhlcvArrays.empty() for symbol in symbols}
+
+        if not isinstance(frame.columns, pd.MultiIndex):
+            frame = pd.concat({symbols[0]: frame}, axis=1)
+        available = set(frame.columns.get_level_values(0))
+        return {
+            symbol: _history_to_bars(frame[symbol]) if symbol in available else OhlcvArrays.empty() for symbol in symbols
+        }
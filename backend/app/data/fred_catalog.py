@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+import re
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from app.core.config import settings
+from app.core.scheduler import Priority, UpstreamQuotaError
+from app.data.fetchers.fred import FredFetcher
+
+CATALOG_COLUMNS = ["id", "title", "frequency", "units", "popularity"]
+FUZZY_MIN_SIMILARITY = 0.35
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+def catalog_frame(rows: list[dict]) -> pd.DataFrame:
+    """FRED ``series/search`` rows as catalog columns, one row per series id."""
+    frame = pd.DataFrame(rows, columns=CATALOG_COLUMNS)
+    frame["id"] = frame["id"].astype(str).str.upper()
+    frame["title"] = frame["title"].fillna("").astype(str)
+    for column in ("frequency", "units"):
+        frame[column] = frame[column].astype(object).where(frame[column].notna(), None)
+    frame["popularity"] = pd.to_numeric(frame["popularity"], errors="coerce").fillna(0).astype(np.int32)
+    return frame[frame["id"] != ""].drop_duplicates("id", keep="last").reset_index(drop=True)
+
+
+def _csr(codes: np.ndarray, values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Group ``values`` by ``codes`` so group ``i`` is ``grouped[offsets[i]:offsets[i + 1]]``."""
+    order = np.argsort(codes, kind="stable")
+    return np.searchsorted(codes[order], np.arange(size + 1)), values[order]
+
+
+@dataclass(frozen=True)
+class CatalogIndex:
+    """Catalog rows plus their search structures, swapped in as one object so readers never mix versions.
+
+    ``vocabulary`` holds every distinct id/title word in sorted order, grouped to the rows containing
+    it, so all words sharing a prefix map to one contiguous slice of ``word_rows``. Word trigrams are
+    grouped the same way for typo matching.
+    """
+
+    frame: pd.DataFrame
+    vocabulary: list[str] = field(default_factory=list)
+    word_offsets: np.ndarray = field(default_factory=lambda: np.zeros(1, dtype=np.int64))
+    word_rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    trigram_codes: dict[str, int] = field(default_factory=dict)
+    trigram_offsets: np.ndarray = field(default_factory=lambda: np.zeros(1, dtype=np.int64))
+    trigram_words: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    sorted_ids: list[str] = field(default_factory=list)
+    id_rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def build(cls, frame: pd.DataFrame) -> "CatalogIndex":
+        if not len(frame):
+            return cls(frame)
+        words = (frame["id"] + " " + frame["title"]).str.lower().str.findall(_TOKEN.pattern).explode().dropna()
+        pairs = pd.DataFrame({"word": words.to_numpy(dtype=str), "row": words.index.to_numpy(dtype=np.int32)})
+        pairs = pairs.drop_duplicates()
+        word_codes, vocabulary = pd.factorize(pairs["word"], sort=True)
+        word_offsets, word_rows = _csr(word_codes, pairs["row"].to_numpy(), len(vocabulary))
+
+        # Trigrams of "  word ", one vectorized slice per character position.
+        padded = pd.Series(vocabulary.to_numpy(dtype=str)).radd("  ").add(" ")
+        lengths = padded.str.len().to_numpy()
+        grams = []
+        for start in range(int(lengths.max()) - 2):
+            alive = np.flatnonzero(lengths - 2 > start)
+            grams.append(pd.DataFrame({"trigram": padded.iloc[alive].str.slice(start, start + 3).to_numpy(), "word": alive}))
+        grams = pd.concat(grams, ignore_index=True).drop_duplicates()
+        gram_codes, trigrams = pd.factorize(grams["trigram"], sort=True)
+        trigram_offsets, trigram_words = _csr(gram_codes, grams["word"].to_numpy(), len(trigrams))
+
+        id_order = np.argsort(frame["id"].to_numpy(dtype=str), kind="stable")
+        return cls(
+            frame=frame,
+            vocabulary=vocabulary.tolist(),
+            word_offsets=word_offsets,
+            word_rows=word_rows,
+            trigram_codes={trigram: code for code, trigram in enumerate(trigrams.tolist())},
+            trigram_offsets=trigram_offsets,
+            trigram_words=trigram_words,
+            sorted_ids=frame["id"].to_numpy()[id_order].tolist(),
+            id_rows=id_order,
+        )
+
+    def _rows_mask(self, word_codes: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(self.frame), dtype=bool)
+        for code in word_codes:
+            mask[self.word_rows[self.word_offsets[code] : self.word_offsets[code + 1]]] = True
+        return mask
+
+    def prefix_mask(self, word: str) -> np.ndarray:
+        lower = bisect_left(self.vocabulary, word)
+        upper = bisect_left(self.vocabulary, word + "\uffff", lower)
+        mask = np.zeros(len(self.frame), dtype=bool)
+        mask[self.word_rows[self.word_offsets[lower] : self.word_offsets[upper]]] = True
+        return mask
+
+    def fuzzy_mask(self, word: str) -> np.ndarray:
+        """Rows containing a word whose trigram Jaccard similarity to ``word`` is at least ``FUZZY_MIN_SIMILARITY``."""
+        query = _trigrams(word)
+        codes = [self.trigram_codes[trigram] for trigram in query if trigram in self.trigram_codes]
+        if not codes:
+            return np.zeros(len(self.frame), dtype=bool)
+        matches = np.concatenate([self.trigram_words[self.trigram_offsets[code] : self.trigram_offsets[code + 1]] for code in codes])
+        candidates, shared = np.unique(matches, return_counts=True)
+        sizes = np.fromiter((len(self.vocabulary[code]) + 1 for code in candidates), dtype=np.int64, count=len(candidates))
+        similarity = shared / (len(query) + sizes - shared)
+        return self._rows_mask(candidates[similarity >= FUZZY_MIN_SIMILARITY])
+
+    def id_prefix_mask(self, prefix: str) -> np.ndarray:
+        lower = bisect_left(self.sorted_ids, prefix)
+        upper = bisect_left(self.sorted_ids, prefix + "\uffff", lower)
+        mask = np.zeros(len(self.frame), dtype=bool)
+        mask[self.id_rows[lower:upper]] = True
+        return mask
+
+    def id_row(self, series_id: str) -> int | None:
+        position = bisect_left(self.sorted_ids, series_id)
+        found = position < len(self.sorted_ids) and self.sorted_ids[position] == series_id
+        return int(self.id_rows[position]) if found else None
+
+
+class FredCatalog:
+    """In-process index of FRED series metadata, persisted as one Parquet file.
+
+    Each query word matches the series with an id/title word starting with it, or, when no word does,
+    a word within trigram similarity (typos); a series matches when every query word does. Results
+    rank by id match, then popularity.
+    """
+
+    def __init__(self, path: str | Path, refresh_interval_seconds: float):
+        self.path = Path(path)
+        # Searches that fall back upstream also rewrite the Parquet file, so the last full ingest is kept apart.
+        self.ingest_path = self.path.with_name(f"{self.path.stem}.ingest.json")
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.index = CatalogIndex(catalog_frame([]))
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._queued: list[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.index.frame)
+
+    def load(self) -> None:
+        if self.path.exists():
+            self.index = CatalogIndex.build(catalog_frame(pd.read_parquet(self.path).to_dict("records")))
+        self._loaded = True
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self.index.frame.to_parquet(tmp, index=False)
+        os.replace(tmp, self.path)
+
+    def merge(self, rows: list[dict]) -> None:
+        """Add or update series from search rows and rebuild the index."""
+        if rows:
+            frame = pd.concat([self.index.frame, catalog_frame(rows)], ignore_index=True)
+            self.index = CatalogIndex.build(frame.drop_duplicates("id", keep="last").reset_index(drop=True))
+
+    def search(self, query: str, limit: int = 20) -> tuple[int, list[dict]]:
+        """``(total matches, top rows)`` in the shape of FRED's ``seriess`` entries."""
+        index = self.index
+        words = _tokens(query)
+        if not words or not len(index.frame):
+            return 0, []
+
+        mask = np.ones(len(index.frame), dtype=bool)
+        for word in words:
+            word_mask = index.prefix_mask(word)
+            mask &= word_mask if word_mask.any() else index.fuzzy_mask(word)
+        rows = np.flatnonzero(mask)
+
+        needle = query.strip().upper()
+        score = index.frame["popularity"].to_numpy()[rows] + 200.0 * index.id_prefix_mask(needle)[rows]
+        exact = index.id_row(needle)
+        if exact is not None:
+            score[rows == exact] += 1000.0
+        top = rows[np.argsort(-score, kind="stable")[:limit]]
+        return len(rows), index.frame.iloc[top].to_dict("records")
+
+    async def ensure_loaded(self) -> None:
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    await asyncio.to_thread(self.load)
+
+    async def add(self, rows: list[dict]) -> None:
+        """Merge upstream search results so the next identical search is served locally.
+
+        Rows queued while another merge holds the lock are merged together by the next one, so a burst of
+        misses rebuilds the index once rather than once per miss.
+        """
+        await self.ensure_loaded()
+        self._queued.extend(rows)
+        async with self._lock:
+            if not self._queued:
+                return
+            rows, self._queued = self._queued, []
+            await asyncio.to_thread(self.merge, rows)
+            await asyncio.to_thread(self.save)
+
+    async def ingest(self, fetcher: FredFetcher, queries: list[str], pages_per_query: int, page_size: int = 1000) -> int:
+        """Bulk-load the most popular series for each seed query."""
+        rows: list[dict] = []
+        for query in queries:
+            for page in range(pages_per_query):
+                total, batch = await fetcher.search_series(
+                    query=query, limit=page_size, offset=page * page_size, order_by="popularity"
+                )
+                rows.extend(batch)
+                if (page + 1) * page_size >= total:
+                    break
+        await self.add(rows)
+        await asyncio.to_thread(self._record_ingest, time.time())
+        return len(rows)
+
+    def _record_ingest(self, ingested_at: float) -> None:
+        tmp = self.ingest_path.with_name(f".{self.ingest_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"ingested_at": ingested_at}))
+        os.replace(tmp, self.ingest_path)
+
+    def is_due(self) -> bool:
+        if not self.path.exists() or not self.ingest_path.exists():
+            return True
+        ingested_at = json.loads(self.ingest_path.read_text())["ingested_at"]
+        return time.time() - ingested_at >= self.refresh_interval_seconds
+
+
+fred_catalog = FredCatalog(settings.fred_catalog_path, refresh_interval_seconds=settings.fred_catalog_refresh_interval_seconds)
+
+
+async def run_catalog_ingest() -> None:
+    """Re-ingest the seed queries whenever the last full ingest is older than the refresh interval."""
+    while True:
+        try:
+            await fred_catalog.ensure_loaded()
+            if fred_catalog.is_due():
+                ingested = await fred_catalog.ingest(
+                    FredFetcher(priority=Priority.BACKGROUND),
+                    settings.fred_catalog_seed_queries,
+                    settings.fred_catalog_pages_per_query,
+                )
+                logger.info("FRED catalog ingested {} rows, {} series indexed", ingested, len(fred_catalog))
+        except (httpx.HTTPError, UpstreamQuotaError, OSError, ValueError) as exc:
+            logger.warning("FRED catalog ingest failed: {}", exc)
+        except Exception:  # noqa: BLE001 - nothing awaits this loop, so ending it would stop catalog refreshes
+            logger.exception("FRED catalog ingest failed unexpectedly")
+        await asyncio.sleep(min(settings.fred_catalog_refresh_interval_seconds, 60 * 60))
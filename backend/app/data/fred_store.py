@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import time
+import weakref
+from collections.abc import Callable
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import httpx
+import pandas as pd
+from loguru import logger
+
+from app.core.config import settings
+from app.core.scheduler import UpstreamQuotaError
+from app.data.fetchers.fred import FredFetcher
+from app.data.store import keyed_lock, storage_name
+
+OBSERVATION_COLUMNS = ["date", "value", "realtime_start", "realtime_end"]
+# FRED dates its vintages (realtime periods) in St. Louis time.
+FRED_TIMEZONE = ZoneInfo("America/Chicago")
+
+
+def fred_today() -> date:
+    return datetime.now(FRED_TIMEZONE).date()
+
+
+def observations_to_frame(observations: list[dict]) -> pd.DataFrame:
+    """FRED observation rows as typed columns; missing values (``"."``) become NaN, vintage bounds stay ISO dates."""
+    frame = pd.DataFrame(observations, columns=OBSERVATION_COLUMNS)
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(frame["date"], utc=True).dt.as_unit("ns"),
+            "value": pd.to_numeric(frame["value"], errors="coerce").astype("float64"),
+            "realtime_start": frame["realtime_start"].astype(str),
+            "realtime_end": frame["realtime_end"].astype(str),
+        }
+    )
+
+
+class FredSeriesStore:
+    """Local copy of FRED series, one Parquet file per series plus a ``.json`` manifest.
+
+    Rows keep the realtime (vintage) bounds they were fetched under. A series is downloaded in full
+    once; afterwards it is re-checked at most every ``refresh_interval_seconds`` and, only if FRED
+    published a vintage after the newest one known to be stored, the trailing ``revision_lookback_days``
+    are re-fetched and merged over the stored rows. A failed re-check serves the stored copy.
+    """
+
+    def __init__(self, root: str | Path, refresh_interval_seconds: float, revision_lookback_days: int):
+        self.root = Path(root)
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.revision_lookback_days = revision_lookback_days
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def _path(self, series_id: str, suffix: str) -> Path:
+        return self.root / f"{storage_name(series_id)}{suffix}"
+
+    def _lock(self, series_id: str) -> asyncio.Lock:
+        return keyed_lock(self._locks, storage_name(series_id))
+
+    def manifest(self, series_id: str) -> dict | None:
+        path = self._path(series_id, ".json")
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def read(self, series_id: str) -> pd.DataFrame:
+        path = self._path(series_id, ".parquet")
+        return pd.read_parquet(path) if path.exists() else observations_to_frame([])
+
+    def write(self, series_id: str, frame: pd.DataFrame, manifest: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._replace(self._path(series_id, ".parquet"), lambda tmp: frame.to_parquet(tmp, index=False))
+        self.write_manifest(series_id, manifest)
+
+    def write_manifest(self, series_id: str, manifest: dict) -> None:
+        self._replace(self._path(series_id, ".json"), lambda tmp: tmp.write_text(json.dumps(manifest)))
+
+    @staticmethod
+    def _replace(path: Path, writer: Callable[[Path], object]) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        writer(tmp)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _manifest_for(frame: pd.DataFrame, listed: list[str]) -> dict:
+        """Manifest for ``frame`` as fetched today, after FRED listed the vintages ``listed``.
+
+        A fetch holds every vintage published before today, plus today's if it was already listed; a
+        vintage dated today but not listed may come out later the same day, so it must still count as new.
+        """
+        included = (fred_today() - timedelta(days=1)).isoformat()
+        return {
+            "included_vintage": max([included, *listed]),
+            "last_observation": frame["date"].max().date().isoformat() if len(frame) else None,
+            "checked_at": time.time(),
+        }
+
+    async def _download(self, series_id: str, fetcher: FredFetcher) -> None:
+        frame = observations_to_frame(await fetcher.fetch_series(series_id=series_id))
+        await asyncio.to_thread(self.write, series_id, frame, self._manifest_for(frame, []))
+
+    async def _refresh(self, series_id: str, manifest: dict, fetcher: FredFetcher) -> None:
+        included = manifest.get("included_vintage")
+        vintages = None
+        if included:
+            try:
+                vintages = await fetcher.fetch_vintage_dates(series_id=series_id, since=included)
+            except httpx.HTTPStatusError:
+                # Not every series has vintage history; fall back to re-reading the lookback window.
+                vintages = None
+            if vintages is not None and not any(vintage > included for vintage in vintages):
+                await asyncio.to_thread(self.write_manifest, series_id, {**manifest, "checked_at": time.time()})
+                return
+
+        last_observation = manifest.get("last_observation")
+        if last_observation is None:
+            await self._download(series_id, fetcher)
+            return
+
+        # Revisions land on recent observations, so only the trailing window is re-read and replaced.
+        since = date.fromisoformat(last_observation) - timedelta(days=self.revision_lookback_days)
+        recent = observations_to_frame(await fetcher.fetch_series(series_id=series_id, start=since.isoformat()))
+        stored = await asyncio.to_thread(self.read, series_id)
+        stored = stored[stored["date"] < pd.Timestamp(since, tz=UTC)]
+        frame = pd.concat([stored, recent], ignore_index=True) if len(stored) else recent
+        await asyncio.to_thread(self.write, series_id, frame, self._manifest_for(frame, vintages or []))
+
+    async def get_observations(self, series_id: str, start: str, end: str, fetcher: FredFetcher) -> pd.DataFrame:
+        """Stored observations dated within ``[start, end]``, syncing with FRED first when due."""
+        async with self._lock(series_id):
+            manifest = await asyncio.to_thread(self.manifest, series_id)
+            if manifest is None:
+                await self._download(series_id, fetcher)
+            elif time.time() - manifest.get("checked_at", 0) >= self.refresh_interval_seconds:
+                try:
+                    await self._refresh(series_id, manifest, fetcher)
+                except (httpx.HTTPError, UpstreamQuotaError) as exc:
+                    # The stored copy stays complete as of the last sync; checked_at is left alone so the next read retries.
+                    logger.warning("FRED refresh of {} failed, serving the stored copy: {}", series_id, exc)
+            frame = await asyncio.to_thread(self.read, series_id)
+
+        dates = frame["date"]
+        window = (dates >= pd.Timestamp(start, tz=UTC)) & (dates <= pd.Timestamp(end, tz=UTC))
+        return frame[window].reset_index(drop=True)
+
+
+fred_store = FredSeriesStore(
+    settings.fred_store_dir,
+    refresh_interval_seconds=settings.fred_refresh_interval_seconds,
+    revision_lookback_days=settings.fred_revision_lookback_days,
+)
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import os
+import re
+import weakref
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.data.bars import BAR_COLUMNS, OhlcvArrays
+from app.data.store import DateRange, keyed_lock, merge_ranges, missing_ranges, storage_name
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_DAY = 86_400 * NS_PER_SECOND
+# Minutes in the regular US equity session, 09:30-16:00 New York.
+SESSION_MINUTES = 390
+
+# One fixed-width 48-byte record per bar, so a day file is a plain array that can be appended to and mapped.
+BAR_RECORD = np.dtype([("timestamp", "<i8"), *((name, "<f8") for name in BAR_COLUMNS)])
+
+# Bar sizes each upstream serves natively, in minutes; coarser intervals are resampled from the largest divisor.
+NATIVE_MINUTES = {
+    "yahoo": (1, 2, 5, 15, 30, 60, 90),
+    "alpha-vantage": (1, 5, 15, 30, 60),
+}
+# Upstreams that serve intraday bars a calendar month per request, so a fetch window never spans two months.
+MONTHLY_WINDOW_SOURCES = {"alpha_vantage"}
+_INTERVAL = re.compile(r"^(\d+)(m|h)$")
+
+IntradayFetcher = Callable[[str, str, str], Awaitable[OhlcvArrays]]
+
+
+def interval_minutes(interval: str) -> int:
+    """Minutes in an interval such as ``1m``, ``5m`` or ``4h``; raises ``ValueError`` otherwise."""
+    match = _INTERVAL.match(interval.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Unsupported interval {interval!r}; use minutes or hours such as 1m, 5m, 1h")
+    return int(match.group(1)) * (60 if match.group(2) == "h" else 1)
+
+
+def native_interval(source: str, minutes: int) -> int:
+    """The largest native bar size of ``source`` that evenly divides ``minutes``."""
+    divisors = [native for native in NATIVE_MINUTES[source] if minutes % native == 0]
+    if not divisors:
+        raise ValueError(f"{minutes}m bars cannot be built from {source} intervals")
+    return max(divisors)
+
+
+def resample_bars(bars: OhlcvArrays, minutes: int) -> OhlcvArrays:
+    """Merge bars into ``minutes``-wide buckets anchored at each day's first bar (the session open).
+
+    Buckets are labelled by their start, like upstream bars, and take the first open, max high,
+    min low, last close and summed volume; all reductions run over contiguous index runs.
+    """
+    if not len(bars):
+        return bars
+    step = minutes * 60 * NS_PER_SECOND
+    stamps = bars.timestamps
+    days = stamps // NS_PER_DAY
+    day_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    session_open = np.repeat(stamps[day_starts], np.diff(np.r_[day_starts, len(stamps)]))
+    labels = session_open + (stamps - session_open) // step * step
+
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    if len(starts) == len(bars):
+        return bars
+    ends = np.r_[starts[1:], len(bars)] - 1
+    return OhlcvArrays(
+        labels[starts],
+        bars.open[starts],
+        np.maximum.reduceat(bars.high, starts),
+        np.minimum.reduceat(bars.low, starts),
+        bars.close[ends],
+        np.add.reduceat(bars.volume, starts),
+    )
+
+
+def _records(bars: OhlcvArrays) -> np.ndarray:
+    records = np.empty(len(bars), dtype=BAR_RECORD)
+    records["timestamp"] = bars.timestamps
+    for name in BAR_COLUMNS:
+        records[name] = getattr(bars, name)
+    return records
+
+
+def _columns(records: np.ndarray) -> OhlcvArrays:
+    # Field views share the record buffer (strided, no copy), so a mapped day is never unpacked.
+    return OhlcvArrays(records["timestamp"], *(records[name] for name in BAR_COLUMNS))
+
+
+class IntradayStore:
+    """Intraday bars as ``{source}/{symbol}/{minutes}m/{YYYY-MM-DD}.bars`` files of ``BAR_RECORD`` rows.
+
+    Newer bars are appended to the end of a day file; only out-of-order bars (corrections of bars
+    already stored) rewrite it. Reads memory-map the day files, so a window within one day is a view
+    of the page cache, and multi-day windows cost one array concatenation per column. As in the daily
+    ``BarStore``, a ``_coverage.json`` manifest records the (UTC) days fetched in full.
+    """
+
+    def __init__(self, root: str | Path, fetch_window_days: int = 7):
+        self.root = Path(root)
+        self.fetch_window_days = fetch_window_days
+        self._locks: weakref.WeakValueDictionary[tuple[str, str, int], asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def _dir(self, source: str, symbol: str, minutes: int) -> Path:
+        return self.root / source / storage_name(symbol) / f"{minutes}m"
+
+    def _lock(self, source: str, symbol: str, minutes: int) -> asyncio.Lock:
+        return keyed_lock(self._locks, (source, storage_name(symbol), minutes))
+
+    def coverage(self, source: str, symbol: str, minutes: int) -> list[DateRange]:
+        manifest = self._dir(source, symbol, minutes) / "_coverage.json"
+        if not manifest.exists():
+            return []
+        payload = json.loads(manifest.read_text())
+        return [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in payload.get("ranges", [])]
+
+    def day(self, source: str, symbol: str, minutes: int, day: date) -> np.ndarray:
+        """A read-only memory map of one day's records (empty when nothing is stored)."""
+        path = self._dir(source, symbol, minutes) / f"{day.isoformat()}.bars"
+        if not path.exists() or path.stat().st_size < BAR_RECORD.itemsize:
+            return np.empty(0, dtype=BAR_RECORD)
+        return np.memmap(path, dtype=BAR_RECORD, mode="r")
+
+    def read(self, source: str, symbol: str, minutes: int, start_ns: int, end_ns: int) -> OhlcvArrays:
+        """Bars with ``start_ns <= timestamp < end_ns``."""
+        first, last = start_ns // NS_PER_DAY, (end_ns - 1) // NS_PER_DAY
+        parts = []
+        for day_number in range(first, last + 1):
+            records = self.day(source, symbol, minutes, date(1970, 1, 1) + timedelta(days=day_number))
+            lower, upper = np.searchsorted(records["timestamp"], [start_ns, end_ns], side="left")
+            if upper > lower:
+                parts.append(records[lower:upper])
+        if not parts:
+            return OhlcvArrays.empty()
+        if len(parts) == 1:
+            return _columns(parts[0])
+        return OhlcvArrays(
+            np.concatenate([part["timestamp"] for part in parts]),
+            *(np.concatenate([part[name] for part in parts]) for name in BAR_COLUMNS),
+        )
+
+    def append(self, source: str, symbol: str, minutes: int, bars: OhlcvArrays, covered: list[DateRange]) -> None:
+        directory = self._dir(source, symbol, minutes)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        days = bars.timestamps // NS_PER_DAY
+        for day_number in np.unique(days):
+            day = date(1970, 1, 1) + timedelta(days=int(day_number))
+            chunk = _records(bars.take(days == day_number))
+            existing = self.day(source, symbol, minutes, day)
+            path = directory / f"{day.isoformat()}.bars"
+            if not len(existing) or chunk["timestamp"][0] > existing["timestamp"][-1]:
+                with path.open("ab") as handle:
+                    handle.write(chunk.tobytes())
+                continue
+            merged = _records(OhlcvArrays.concat([_columns(np.array(existing)), _columns(chunk)]))
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(merged.tobytes())
+            # Readers still mapping the old file keep its inode, so the swap never tears a read.
+            os.replace(tmp, path)
+
+        ranges = merge_ranges(self.coverage(source, symbol, minutes) + covered)
+        payload = {"ranges": [[start.isoformat(), end.isoformat()] for start, end in ranges]}
+        manifest = directory / "_coverage.json"
+        tmp = manifest.with_name(f".{manifest.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload))
+        os.replace(tmp, manifest)
+
+    def _windows(self, source: str, gaps: list[DateRange]) -> list[DateRange]:
+        # Upstreams cap the span of one intraday request (Yahoo serves 1m bars 7 days at a time); monthly
+        # sources get one window per calendar month, so no month is downloaded twice.
+        if source in MONTHLY_WINDOW_SOURCES:
+            months: dict[date, DateRange] = {}
+            for gap_start, gap_end in gaps:
+                cursor = gap_start
+                while cursor < gap_end:
+                    month = cursor.replace(day=1)
+                    upper = min((month + timedelta(days=32)).replace(day=1), gap_end)
+                    lower = months[month][0] if month in months else cursor
+                    months[month] = (lower, upper)
+                    cursor = upper
+            return list(months.values())
+        step = timedelta(days=self.fetch_window_days)
+        windows = []
+        for gap_start, gap_end in gaps:
+            cursor = gap_start
+            while cursor < gap_end:
+                windows.append((cursor, min(cursor + step, gap_end)))
+                cursor += step
+        return windows
+
+    async def get_intraday(
+        self, source: str, symbol: str, minutes: int, start: str, end: str, fetch: IntradayFetcher
+    ) -> OhlcvArrays:
+        """Serve ``[start, end)`` from the day files, calling ``fetch`` only for days not yet stored in full."""
+        start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+        today = datetime.now(UTC).date()
+
+        async with self._lock(source, symbol, minutes):
+            gaps = missing_ranges(self.coverage(source, symbol, minutes), start_date, end_date)
+            if gaps:
+                windows = self._windows(source, gaps)
+                fetched = await asyncio.gather(*(fetch(lower.isoformat(), upper.isoformat()) for lower, upper in windows))
+                # Today's session is still trading: its bars are stored but the day stays uncovered.
+                covered = [(lower, min(upper, today)) for lower, upper in gaps]
+                await asyncio.to_thread(self.append, source, symbol, minutes, OhlcvArrays.concat(list(fetched)), covered)
+
+            start_ns = pd.Timestamp(start_date, tz=UTC).value
+            end_ns = pd.Timestamp(end_date, tz=UTC).value
+            return await asyncio.to_thread(self.read, source, symbol, minutes, start_ns, end_ns)
+
+
+intraday_store = IntradayStore(settings.intraday_store_dir, fetch_window_days=settings.intraday_fetch_window_days)
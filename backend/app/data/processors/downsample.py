@@ -0,0 +1,93 @@
+import numpy as np
+
+from app.data.bars import OhlcvArrays
+from app.data.codec import ColumnFrame
+
+
+def bucket_bounds(length: int, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+    """First and last index of ``max_points`` contiguous, near-equal buckets over ``length`` rows."""
+    starts = np.linspace(0, length, min(max_points, length), endpoint=False).astype(np.int64)
+    ends = np.append(starts[1:], length) - 1
+    return starts, ends
+
+
+def downsample_bars(bars: OhlcvArrays, max_points: int) -> OhlcvArrays:
+    """Merge bars into at most ``max_points`` candles: first open, max high, min low, last close, summed volume."""
+    if len(bars) <= max_points:
+        return bars
+    starts, ends = bucket_bounds(len(bars), max_points)
+    return OhlcvArrays(
+        bars.timestamps[starts],
+        bars.open[starts],
+        np.maximum.reduceat(bars.high, starts),
+        np.minimum.reduceat(bars.low, starts),
+        bars.close[ends],
+        np.add.reduceat(bars.volume, starts),
+    )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices kept by Largest-Triangle-Three-Buckets, always including the first and last point.
+
+    Each interior bucket keeps the point forming the largest triangle with the point kept from the
+    previous bucket and the mean of the next one. Bucket means come from cumulative sums, so the only
+    Python-level loop is one short NumPy step per output point.
+    """
+    length = len(x)
+    if length <= max_points or max_points < 3:
+        return np.arange(length) if length <= max_points else np.array([0, length - 1])
+
+    x = np.asarray(x, dtype=np.float64) - float(x[0])
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, length - 1, max_points - 1).astype(np.int64)
+    sum_x = np.concatenate([[0.0], np.cumsum(x)])
+    sum_y = np.concatenate([[0.0], np.cumsum(y)])
+    # The bucket after the last interior one is the final point itself.
+    next_lo = np.append(edges[1:-1], length - 1)
+    next_hi = np.append(edges[2:], length)
+    next_x = (sum_x[next_hi] - sum_x[next_lo]) / (next_hi - next_lo)
+    next_y = (sum_y[next_hi] - sum_y[next_lo]) / (next_hi - next_lo)
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, length - 1
+    anchor = 0
+    for bucket in range(max_points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        anchor_x, anchor_y = x[anchor], y[anchor]
+        area = np.abs(
+            (anchor_x - next_x[bucket]) * (y[lo:hi] - anchor_y) - (anchor_x - x[lo:hi]) * (next_y[bucket] - anchor_y)
+        )
+        anchor = lo + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def downsample_frame(frame: ColumnFrame, max_points: int) -> ColumnFrame:
+    """Bar series are bucketed into candles, other series reduced with LTTB on ``value``."""
+    columns = frame.columns
+    if len(columns["timestamp"]) <= max_points:
+        return frame
+    header = {key: value for key, value in frame.header.items() if key != "digest"}
+
+    if "metadata.open" in columns:
+        bars = OhlcvArrays(
+            columns["timestamp"],
+            columns["metadata.open"],
+            columns["metadata.high"],
+            columns["metadata.low"],
+            columns["value"],
+            columns["metadata.volume"],
+        )
+        candles = downsample_bars(bars, max_points)
+        merged = {
+            "timestamp": candles.timestamps,
+            "value": candles.close,
+            "metadata.open": candles.open,
+            "metadata.high": candles.high,
+            "metadata.low": candles.low,
+            "metadata.volume": candles.volume,
+        }
+        return ColumnFrame(columns={name: merged[name] for name in columns}, header=header)
+
+    selected = lttb_indices(columns["timestamp"], columns["value"], max_points)
+    return ColumnFrame(columns={name: column[selected] for name, column in columns.items()}, header=header)
@@ -1,61 +1,89 @@
 from datetime import UTC, datetime
 
-from app.models.schemas import DataPoint, UnifiedSeriesResponse
-
-
-def normalize_fred_series(series_id: str, observations: list[dict]) -> UnifiedSeriesResponse:
-    points: list[DataPoint] = []
-    for obs in observations:
-        value_raw = obs.get("value")
-        if value_raw in (None, "."):
-            continue
-        points.append(
-            DataPoint(
-                timestamp=datetime.fromisoformat(f"{obs['date']}T00:00:00+00:00"),
-                value=float(value_raw),
-                metadata={},
-            )
-        )
-
-    return UnifiedSeriesResponse(
-        ticker_or_series_id=series_id,
-        source="FRED",
-        frequency="daily",
-        unit="index",
-        last_updated=datetime.now(UTC),
-        data=points,
-    )
+import numpy as np
+import pandas as pd
+
+from app.data.bars import OhlcvArrays
+from app.data.codec import ColumnFrame, frame_to_series
+from app.models.schemas import UnifiedSeriesResponse
+
+OHLCV_METADATA_KEYS = ["timestamp", "open", "high", "low", "volume"]
+
+
+def _series_header(series_id: str, source: str, unit: str, metadata_keys: list[str], frequency: str = "daily") -> dict:
+    return {
+        "ticker_or_series_id": series_id,
+        "source": source,
+        "frequency": frequency,
+        "unit": unit,
+        "last_updated": datetime.now(UTC).isoformat(),
+        "metadata_keys": metadata_keys,
+        "timestamp_keys": ["timestamp"] if "timestamp" in metadata_keys else [],
+    }
 
 
-def normalize_yahoo_ohlcv(symbol: str, rows: list[dict]) -> UnifiedSeriesResponse:
-    points = [
-        DataPoint(timestamp=row["timestamp"], value=row["close"], metadata={k: v for k, v in row.items() if k != "close"})
-        for row in rows
-    ]
-    return UnifiedSeriesResponse(
-        ticker_or_series_id=symbol,
-        source="Yahoo Finance",
-        frequency="daily",
-        unit="price",
-        last_updated=datetime.now(UTC),
-        data=points,
+def fred_series_frame(series_id: str, observations: list[dict] | pd.DataFrame) -> ColumnFrame:
+    frame = pd.DataFrame(observations, columns=["date", "value"])
+    values = pd.to_numeric(frame["value"], errors="coerce")
+    valid = values.notna().to_numpy()
+    timestamps = pd.DatetimeIndex(pd.to_datetime(frame["date"][valid], utc=True)).as_unit("ns")
+
+    return ColumnFrame(
+        columns={"timestamp": timestamps.asi8, "value": values[valid].to_numpy(dtype=np.float64)},
+        header=_series_header(series_id, "FRED", "index", []),
     )
 
 
-def normalize_alpha_daily(symbol: str, rows: list[dict]) -> UnifiedSeriesResponse:
-    points = [
-        DataPoint(
-            timestamp=row["timestamp"],
-            value=row["close"],
-            metadata={k: v for k, v in row.items() if k != "close"},
-        )
-        for row in rows
-    ]
-    return UnifiedSeriesResponse(
-        ticker_or_series_id=symbol,
-        source="Alpha Vantage",
-        frequency="daily",
-        unit="price",
-        last_updated=datetime.now(UTC),
-        data=points,
+def ohlcv_series_frame(symbol: str, source: str, bars: OhlcvArrays, frequency: str = "daily") -> ColumnFrame:
+    """Close prices as the series value, with the other bar fields carried as metadata columns."""
+    return ColumnFrame(
+        columns={
+            "timestamp": bars.timestamps,
+            "value": bars.close,
+            "metadata.open": bars.open,
+            "metadata.high": bars.high,
+            "metadata.low": bars.low,
+            "metadata.volume": bars.volume,
+        },
+        header=_series_header(symbol, source, "price", OHLCV_METADATA_KEYS, frequency),
     )
+
+
+def epoch_millis(timestamps: np.ndarray) -> list[int]:
+    return (np.asarray(timestamps, dtype=np.int64) // 1_000_000).tolist()
+
+
+def nullable_floats(values: np.ndarray) -> list[float | None]:
+    """Float array as a JSON-safe list, with NaN (e.g. indicator warm-up) and infinities as ``None``."""
+    array = np.asarray(values, dtype=np.float64)
+    return np.where(np.isfinite(array), array, None).tolist()
+
+
+def series_columns(frame: ColumnFrame) -> dict:
+    """Columnar response body: parallel epoch-millisecond ``timestamps``, ``values`` and bar-field arrays."""
+    header = frame.header
+    body = {
+        "ticker_or_series_id": header["ticker_or_series_id"],
+        "source": header["source"],
+        "frequency": header["frequency"],
+        "unit": header["unit"],
+        "last_updated": header["last_updated"],
+        "timestamps": epoch_millis(frame.columns["timestamp"]),
+        "values": nullable_floats(frame.columns["value"]),
+    }
+    for key in header["metadata_keys"]:
+        if key not in header["timestamp_keys"]:
+            body[key] = nullable_floats(frame.columns[f"metadata.{key}"])
+    return body
+
+
+def normalize_fred_series(series_id: str, observations: list[dict] | pd.DataFrame) -> UnifiedSeriesResponse:
+    return frame_to_series(fred_series_frame(series_id, observations))
+
+
+def normalize_yahoo_ohlcv(symbol: str, bars: OhlcvArrays) -> UnifiedSeriesResponse:
+    return frame_to_series(ohlcv_series_frame(symbol, "Yahoo Finance", bars))
+
+
+def normalize_alpha_daily(symbol: str, bars: OhlcvArrays) -> UnifiedSeriesResponse:
+    return frame_to_series(ohlcv_series_frame(symbol, "Alpha Vantage", bars))
@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import Protocol
+
+import httpx
+import pandas as pd
+
+from app.core.config import settings
+from app.core.http import set_upstream_transport
+from app.data.bars import OhlcvArrays
+from app.data.fetchers.yahoo import YahooFetcher
+from app.data.intraday import IntradayStore, interval_minutes
+from app.data.store import BarStore, missing_ranges
+from app.data.synthetic import SyntheticTransport, synthetic_bars, synthetic_intraday_bars
+
+MARKET_DATA_MODES = ("live", "record", "replay", "synthetic")
+
+# Credentials never reach a recording; date-window params only narrow which recording replay prefers.
+SECRET_PARAMS = {"api_key", "apikey"}
+WINDOW_PARAMS = {"observation_start", "observation_end", "realtime_start", "realtime_end", "outputsize"}
+
+
+class RecordingNotFoundError(LookupError):
+    pass
+
+
+class BarProvider(Protocol):
+    async def fetch_daily(self, symbol: str, start: str, end: str) -> OhlcvArrays: ...
+
+    async def fetch_daily_many(self, symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]: ...
+
+    async def fetch_intraday(self, symbol: str, start: str, end: str, interval: str) -> OhlcvArrays: ...
+
+
+def _digest(parts: list[tuple[str, str]]) -> str:
+    return hashlib.blake2b(json.dumps(parts).encode(), digest_size=12).hexdigest()
+
+
+def recording_path(root: Path, request: httpx.Request) -> tuple[Path, str]:
+    """``(directory, file name)`` of a request's recording.
+
+    The directory groups requests for the same resource (path plus identifying params); the file
+    name adds the date-window params, so replay can fall back to another window of the same series.
+    """
+    params = sorted((key, value) for key, value in request.url.params.multi_items() if key not in SECRET_PARAMS)
+    identity = [(key, value) for key, value in params if key not in WINDOW_PARAMS]
+    directory = root / request.url.host / _digest([(request.method, request.url.path), *identity])
+    return directory, f"{_digest(params)}.json"
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests upstream and saves every successful response under ``root``."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, root: str | Path):
+        self.inner = inner
+        self.root = Path(root)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        content_type = response.headers.get("content-type", "application/octet-stream")
+        if response.is_success:
+            directory, name = recording_path(self.root, request)
+            record = {"status": response.status_code, "content_type": content_type, "body": body.decode()}
+            await asyncio.to_thread(self._write, directory / name, record)
+        # The body is already decoded, so the upstream Content-Encoding must not travel with it.
+        return httpx.Response(response.status_code, headers={"content-type": content_type}, content=body)
+
+    @staticmethod
+    def _write(path: Path, record: dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(record))
+        os.replace(tmp, path)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded responses without touching the network.
+
+    An exact match wins; otherwise the newest recording of the same resource under another date
+    window is served, since callers such as the FRED store derive windows from today's date.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        directory, name = recording_path(self.root, request)
+        path = directory / name
+        if not path.exists():
+            candidates = sorted(directory.glob("*.json"), key=lambda item: item.stat().st_mtime)
+            if not candidates:
+                raise RecordingNotFoundError(f"No recording for {request.method} {request.url.host}{request.url.path}")
+            path = candidates[-1]
+        record = json.loads(await asyncio.to_thread(path.read_text))
+        headers = {"content-type": record["content_type"]}
+        return httpx.Response(record["status"], headers=headers, content=record["body"].encode())
+
+
+def upstream_transport(live: Callable[[], httpx.AsyncBaseTransport]) -> httpx.AsyncBaseTransport:
+    """The transport for an upstream host under ``settings.market_data_mode``; ``live`` builds the real one."""
+    mode = settings.market_data_mode
+    root = Path(settings.market_data_recordings_dir) / "http"
+    if mode == "synthetic":
+        return SyntheticTransport(seed=settings.synthetic_seed, origin=settings.synthetic_origin)
+    if mode == "replay":
+        return ReplayTransport(root)
+    if mode == "record":
+        return RecordingTransport(live(), root)
+    return live()
+
+
+def _covered(start: str, end: str) -> list[tuple[date, date]]:
+    # Today's bars are still forming, so like the stores the recordings never mark today covered.
+    return [(date.fromisoformat(start), min(date.fromisoformat(end), datetime.now(UTC).date()))]
+
+
+class RecordingBarProvider:
+    """Fetches bars upstream and merges each response into bar stores kept as the recording."""
+
+    def __init__(self, inner: BarProvider, store: BarStore, intraday: IntradayStore, source: str = "yahoo"):
+        self.inner = inner
+        self.store = store
+        self.intraday = intraday
+        self.source = source
+        self._lock = asyncio.Lock()
+
+    async def _record(self, symbol: str, start: str, end: str, bars: OhlcvArrays) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self.store.write, self.source, symbol, bars, _covered(start, end))
+
+    async def fetch_daily(self, symbol: str, start: str, end: str) -> OhlcvArrays:
+        bars = await self.inner.fetch_daily(symbol, start, end)
+        await self._record(symbol, start, end, bars)
+        return bars
+
+    async def fetch_daily_many(self, symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        result = await self.inner.fetch_daily_many(symbols, start, end)
+        for symbol, bars in result.items():
+            await self._record(symbol, start, end, bars)
+        return result
+
+    async def fetch_intraday(self, symbol: str, start: str, end: str, interval: str) -> OhlcvArrays:
+        bars = await self.inner.fetch_intraday(symbol, start, end, interval)
+        minutes = interval_minutes(interval)
+        async with self._lock:
+            await asyncio.to_thread(self.intraday.append, self.source, symbol, minutes, bars, _covered(start, end))
+        return bars
+
+
+class ReplayBarProvider:
+    """Serves bars from a recording and refuses windows it does not cover."""
+
+    def __init__(self, store: BarStore, intraday: IntradayStore, source: str = "yahoo"):
+        self.store = store
+        self.intraday = intraday
+        self.source = source
+
+    def _require(self, coverage: list[tuple[date, date]], symbol: str, start: str, end: str) -> None:
+        start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+        if missing_ranges(coverage, start_date, min(end_date, datetime.now(UTC).date())):
+            raise RecordingNotFoundError(f"No recorded {self.source} bars for {symbol} over [{start}, {end})")
+
+    async def fetch_daily(self, symbol: str, start: str, end: str) -> OhlcvArrays:
+        self._require(self.store.coverage(self.source, symbol), symbol, start, end)
+        start_date, end_date = date.fromisoformat(start), date.fromisoformat(end)
+        return await asyncio.to_thread(self.store.read, self.source, symbol, start_date, end_date)
+
+    async def fetch_daily_many(self, symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        return {symbol: await self.fetch_daily(symbol, start, end) for symbol in symbols}
+
+    async def fetch_intraday(self, symbol: str, start: str, end: str, interval: str) -> OhlcvArrays:
+        minutes = interval_minutes(interval)
+        self._require(self.intraday.coverage(self.source, symbol, minutes), symbol, start, end)
+        start_ns, end_ns = (pd.Timestamp(value, tz=UTC).value for value in (start, end))
+        return await asyncio.to_thread(self.intraday.read, self.source, symbol, minutes, start_ns, end_ns)
+
+
+class SyntheticBarProvider:
+    """Jump-diffusion bars for any symbol (see ``app.data.synthetic``); identical on every run for one seed."""
+
+    def __init__(self, seed: int, origin: str):
+        self.seed = seed
+        self.origin = origin
+
+    async def fetch_daily(self, symbol: str, start: str, end: str) -> OhlcvArrays:
+        return synthetic_bars(symbol, start, end, seed=self.seed, origin=self.origin)
+
+    async def fetch_daily_many(self, symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        return {symbol: await self.fetch_daily(symbol, start, end) for symbol in symbols}
+
+    async def fetch_intraday(self, symbol: str, start: str, end: str, interval: str) -> OhlcvArrays:
+        return synthetic_intraday_bars(symbol, start, end, interval_minutes(interval), seed=self.seed, origin=self.origin)
+
+
+def build_bar_provider(mode: str) -> BarProvider:
+    if mode not in MARKET_DATA_MODES:
+        raise ValueError(f"Unknown market_data_mode {mode!r}; expected one of {', '.join(MARKET_DATA_MODES)}")
+    root = Path(settings.market_data_recordings_dir)
+    recordings, intraday = BarStore(root / "bars"), IntradayStore(root / "intraday")
+    if mode == "synthetic":
+        return SyntheticBarProvider(seed=settings.synthetic_seed, origin=settings.synthetic_origin)
+    if mode == "replay":
+        return ReplayBarProvider(recordings, intraday)
+    if mode == "record":
+        return RecordingBarProvider(YahooFetcher(), recordings, intraday)
+    return YahooFetcher()
+
+
+bar_provider = build_bar_provider(settings.market_data_mode)
+set_upstream_transport(upstream_transport)
@@ -0,0 +1,215 @@
+import asyncio
+import base64
+import binascii
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from loguru import logger
+from sqlalchemy import ColumnElement, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.cache import cache_get_decoded, cache_set
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.data.codec import ColumnFrame
+from app.models.db_models import REGISTRY_PAGE_INDEX, REGISTRY_UNIQUE_INDEX, DataRegistryEntry
+
+UPDATED_COLUMNS = ("frequency", "unit", "last_updated", "latest_value", "metadata_json")
+
+# Trigram GIN indexes serve the registry's ``ILIKE '%q%'`` search; they need the pg_trgm extension.
+REGISTRY_SEARCH_INDEXES = {
+    "ix_data_registry_series_trgm": "ticker_or_series_id",
+    "ix_data_registry_source_trgm": "source",
+}
+
+
+# Failures of a flush that leave the batch pending: database errors and connections refused or dropped.
+FLUSH_ERRORS = (SQLAlchemyError, OSError)
+
+
+def _isoformat(timestamp_ns: int) -> str:
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=UTC).isoformat()
+
+
+def registry_row(
+    series: ColumnFrame, request_start: str | None = None, request_end: str | None = None, requested: bool = True
+) -> dict:
+    header = series.header
+    timestamps, values = series.columns["timestamp"], series.columns["value"]
+    now = datetime.now(UTC)
+    return {
+        "ticker_or_series_id": header["ticker_or_series_id"],
+        "source": header["source"],
+        "frequency": header["frequency"],
+        "unit": header["unit"],
+        "last_updated": now,
+        # None keeps the stored request time (see upsert_registry_rows).
+        "last_requested": now if requested else None,
+        "latest_value": float(values[-1]) if len(values) else None,
+        "metadata_json": {
+            "points": len(values),
+            "preview_start": _isoformat(int(timestamps[0])) if len(timestamps) else None,
+            "preview_end": _isoformat(int(timestamps[-1])) if len(timestamps) else None,
+            # The requested window lets the cache warmer rebuild the exact cache key later.
+            "request_start": request_start,
+            "request_end": request_end,
+        },
+    }
+
+
+async def upsert_registry_rows(db: AsyncSession, rows: list[dict]) -> None:
+    """One ``INSERT ... ON CONFLICT DO UPDATE`` for all rows, in key order so concurrent flushes lock alike."""
+    statement = insert(DataRegistryEntry).values(sorted(rows, key=lambda row: (row["ticker_or_series_id"], row["source"])))
+    statement = statement.on_conflict_do_update(
+        index_elements=[DataRegistryEntry.ticker_or_series_id, DataRegistryEntry.source],
+        set_={
+            **{name: statement.excluded[name] for name in UPDATED_COLUMNS},
+            "last_requested": func.coalesce(statement.excluded.last_requested, DataRegistryEntry.last_requested),
+        },
+    )
+    await db.execute(statement)
+    await db.commit()
+
+
+async def ensure_registry_index(connection: AsyncConnection) -> None:
+    """Add the unique ``(ticker_or_series_id, source)`` index to tables created before it existed.
+
+    Earlier SELECT-then-INSERT upserts could race into duplicates, so those are dropped first,
+    keeping the most recently updated row of each series.
+    """
+    if await connection.scalar(text("SELECT to_regclass(:name)"), {"name": REGISTRY_UNIQUE_INDEX}) is not None:
+        return
+    table = DataRegistryEntry.__tablename__
+    await connection.execute(
+        text(
+            f"DELETE FROM {table} AS older USING {table} AS newer "
+            "WHERE older.ticker_or_series_id = newer.ticker_or_series_id AND older.source = newer.source "
+            "AND (older.last_updated, older.id) < (newer.last_updated, newer.id)"
+        )
+    )
+    await connection.execute(
+        text(f"CREATE UNIQUE INDEX IF NOT EXISTS {REGISTRY_UNIQUE_INDEX} ON {table} (ticker_or_series_id, source)")
+    )
+
+
+async def ensure_registry_request_column(connection: AsyncConnection) -> None:
+    """Add ``last_requested`` and its index to tables created before the column existed."""
+    table = DataRegistryEntry.__tablename__
+    await connection.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS last_requested TIMESTAMPTZ"))
+    await connection.execute(
+        text(f"CREATE INDEX IF NOT EXISTS ix_{table}_last_requested ON {table} (last_requested)")
+    )
+
+
+async def ensure_registry_search_indexes(connection: AsyncConnection) -> None:
+    """Create the keyset-pagination and trigram search indexes missing from existing tables."""
+    table = DataRegistryEntry.__tablename__
+    await connection.execute(text(f"CREATE INDEX IF NOT EXISTS {REGISTRY_PAGE_INDEX} ON {table} (last_updated, id)"))
+    try:
+        async with connection.begin_nested():
+            await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as exc:
+        logger.warning("pg_trgm is unavailable, registry search stays unindexed: {}", exc)
+        return
+    for name, column in REGISTRY_SEARCH_INDEXES.items():
+        await connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"))
+
+
+def encode_cursor(last_updated: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{last_updated.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """``(last_updated, id)`` of the last row of the previous page; raises ``ValueError`` when malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    last_updated, separator, row_id = raw.rpartition("|")
+    if not separator or not row_id.isdigit():
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(last_updated), int(row_id)
+
+
+async def cached_registry_total(db: AsyncSession, filters: list[ColumnElement[bool]], cache_key: str) -> int:
+    """Row count for a registry filter, recounted at most every ``registry_count_cache_ttl_seconds``."""
+    entry = await cache_get_decoded(cache_key, int)
+    if entry is not None and not entry.is_stale:
+        return entry.payload
+    total = int(await db.scalar(select(func.count()).select_from(DataRegistryEntry).where(*filters)) or 0)
+    await cache_set(cache_key, str(total).encode(), soft_ttl=settings.registry_count_cache_ttl_seconds, value=total)
+    return total
+
+
+class RegistryWriter:
+    """Write-behind queue for registry rows: callers enqueue without waiting on Postgres.
+
+    Rows are coalesced per series (the latest wins) and flushed in batches of ``batch_size`` every
+    ``flush_interval_seconds``, or as soon as a full batch is pending.
+    """
+
+    def __init__(
+        self,
+        flush_interval_seconds: float,
+        batch_size: int,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+    ):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._full = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(
+        self,
+        series: ColumnFrame,
+        request_start: str | None = None,
+        request_end: str | None = None,
+        requested: bool = True,
+    ) -> None:
+        row = registry_row(series, request_start, request_end, requested)
+        self._pending[(row["ticker_or_series_id"], row["source"])] = row
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    async def flush(self) -> int:
+        flushed = 0
+        while self._pending:
+            keys = list(self._pending)[: self.batch_size]
+            batch = {key: self._pending.pop(key) for key in keys}
+            try:
+                async with self.session_factory() as db:
+                    await upsert_registry_rows(db, list(batch.values()))
+            except BaseException:
+                # Put the batch back unless a newer row for the same series arrived meanwhile; this includes
+                # a cancelled flush, so the final flush at shutdown still writes it.
+                for key, row in batch.items():
+                    self._pending.setdefault(key, row)
+                raise
+            flushed += len(batch)
+        return flushed
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval_seconds)
+            except TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except FLUSH_ERRORS as exc:
+                logger.warning("Registry flush failed, {} rows pending: {}", len(self._pending), exc)
+            except Exception:  # noqa: BLE001 - nothing awaits this loop, so ending it would stop registry writes
+                logger.exception("Registry flush failed unexpectedly, {} rows pending", len(self._pending))
+
+
+registry_writer = RegistryWriter(
+    flush_interval_seconds=settings.registry_flush_interval_seconds,
+    batch_size=settings.registry_flush_batch_size,
+)
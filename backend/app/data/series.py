@@ -0,0 +1,294 @@
+import math
+from datetime import UTC, date, datetime, timedelta
+from functools import partial
+
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from app.core.cache import cache_get_decoded, cache_set, refresh_in_background
+from app.core.scheduler import Priority, UpstreamQuotaError
+from app.core.singleflight import singleflight
+from app.data.bar_cache import RangeLoader, bar_chunk_cache, chunk_key, month_start
+from app.data.bars import OhlcvArrays
+from app.data.codec import ColumnFrame, decode_series_frame, encode_frame, frame_digest
+from app.data.fetchers.alpha_vantage import AlphaVantageFetcher
+from app.data.fetchers.fred import FredFetcher
+from app.data.fred_store import fred_store
+from app.data.intraday import IntradayFetcher, interval_minutes, intraday_store, native_interval, resample_bars
+from app.data.processors.normalize import fred_series_frame, ohlcv_series_frame
+from app.data.providers import bar_provider
+from app.data.registry import registry_writer
+from app.data.store import InvalidSymbolError, bar_store
+
+ALPHA_COMPACT_BARS = 100
+
+SERIES_CACHE_TTLS = {
+    "fred": 60 * 60 * 24,
+    "yahoo": 60 * 60,
+    "alpha-vantage": 60 * 60,
+}
+
+# Bar sources are cached as per-month chunks (see bar_cache) rather than one entry per requested range.
+BAR_SOURCES = {
+    "yahoo": "yahoo",
+    "alpha-vantage": "alpha_vantage",
+}
+
+# What loading or refreshing a series raises: upstream failures arrive as HTTPExceptions, cache failures as-is.
+SERIES_ERRORS = (HTTPException, RedisError)
+
+
+def upstream_error(action: str, exc: Exception) -> HTTPException:
+    if isinstance(exc, InvalidSymbolError):
+        return HTTPException(status_code=400, detail=str(exc))
+    if isinstance(exc, UpstreamQuotaError):
+        return HTTPException(
+            status_code=429,
+            detail=str(exc),
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+    return HTTPException(status_code=502, detail=f"{action} failed: {exc}")
+
+
+def series_cache_key(source: str, series_id: str, start: str | None, end: str | None) -> str:
+    return f"{source}:{series_id}:{start}:{end}"
+
+
+def series_warm_key(source: str, series_id: str, start: str | None, end: str | None) -> str | None:
+    """Cache key whose expiry decides whether the warmer refreshes a series, if any can go stale."""
+    if source not in BAR_SOURCES:
+        return series_cache_key(source, series_id, start, end)
+    # Closed months keep their long TTL; only the chunk of the current month needs warming.
+    current_month = month_start(datetime.now(UTC).date())
+    if end is not None and date.fromisoformat(end) <= current_month:
+        return None
+    return chunk_key(BAR_SOURCES[source], series_id, current_month)
+
+
+async def read_cached_series(cache_key: str) -> ColumnFrame | None:
+    entry = await cache_get_decoded(cache_key, decode_series_frame)
+    return entry.payload if entry else None
+
+
+async def _fetch_fred(series_id: str, start: str, end: str, priority: Priority) -> ColumnFrame:
+    try:
+        observations = await fred_store.get_observations(series_id, start, end, FredFetcher(priority=priority))
+    except Exception as exc:
+        raise upstream_error("FRED fetch", exc) from exc
+    return fred_series_frame(series_id, observations)
+
+
+def bar_loader(source: str, symbol: str, priority: Priority = Priority.INTERACTIVE) -> RangeLoader:
+    """Load daily bars through the local bar store, fetching only the gaps from upstream."""
+    if source == "yahoo":
+        fetch = partial(bar_provider.fetch_daily, symbol)
+    else:
+        fetch = partial(AlphaVantageFetcher(priority=priority).fetch_range, symbol)
+
+    async def load(start: str, end: str) -> OhlcvArrays:
+        return await bar_store.get_daily(source=BAR_SOURCES[source], symbol=symbol, start=start, end=end, fetch=fetch)
+
+    return load
+
+
+async def load_bars(
+    source: str,
+    symbol: str,
+    start: str,
+    end: str,
+    priority: Priority = Priority.INTERACTIVE,
+) -> tuple[OhlcvArrays, bool]:
+    """Assemble ``[start, end)`` from cached month chunks; the flag tells whether any chunk was loaded."""
+    try:
+        return await bar_chunk_cache.get_range(
+            BAR_SOURCES[source],
+            symbol,
+            start,
+            end,
+            load=bar_loader(source, symbol, priority),
+            current_ttl=SERIES_CACHE_TTLS[source],
+            refresh_load=bar_loader(source, symbol, Priority.BACKGROUND),
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        action = "Yahoo fetch" if source == "yahoo" else "Alpha Vantage fetch"
+        raise upstream_error(action, exc) from exc
+
+
+async def load_universe_bars(symbols: list[str], start: str, end: str) -> tuple[dict[str, OhlcvArrays], list[str]]:
+    """Daily Yahoo bars of many symbols from batched chunk reads, plus the symbols that could not be loaded.
+
+    Symbols missing from the cache are downloaded together through ``fetch_daily_many`` rather than one
+    upstream request each.
+    """
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+    bars, _ = await bar_chunk_cache.get_many(
+        BAR_SOURCES["yahoo"],
+        symbols,
+        start,
+        end,
+        load_many=bar_provider.fetch_daily_many,
+        current_ttl=SERIES_CACHE_TTLS["yahoo"],
+    )
+    loaded = {symbol: symbol_bars for symbol, symbol_bars in bars.items() if len(symbol_bars)}
+    return loaded, [symbol for symbol in symbols if symbol not in loaded]
+
+
+async def load_daily_bars(symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+    """Daily Yahoo bars straight from the market data provider, keyed by upper-cased symbol."""
+    try:
+        return await bar_provider.fetch_daily_many([symbol.upper() for symbol in symbols], start, end)
+    except Exception as exc:
+        raise upstream_error("Yahoo fetch", exc) from exc
+
+
+def intraday_loader(source: str, symbol: str, native_minutes: int, priority: Priority) -> IntradayFetcher:
+    if source == "yahoo":
+        return partial(bar_provider.fetch_intraday, symbol, interval=f"{native_minutes}m")
+    return partial(AlphaVantageFetcher(priority=priority).fetch_intraday_range, symbol, interval=f"{native_minutes}min")
+
+
+async def load_intraday(
+    source: str,
+    symbol: str,
+    start: str,
+    end: str,
+    interval: str,
+    priority: Priority = Priority.INTERACTIVE,
+) -> OhlcvArrays:
+    """``interval`` bars over ``[start, end)``, read from the memory-mapped intraday store.
+
+    Bars are stored at the coarsest native upstream size dividing ``interval`` and resampled on read,
+    so ``10m`` and ``30m`` requests on Alpha Vantage share the stored ``5min`` bars.
+    """
+    try:
+        minutes = interval_minutes(interval)
+        native = native_interval(source, minutes)
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Intraday {interval} bars are not available from {source}") from exc
+    try:
+        bars = await intraday_store.get_intraday(
+            BAR_SOURCES[source], symbol, native, start, end, intraday_loader(source, symbol, native, priority)
+        )
+    except Exception as exc:
+        action = "Yahoo intraday fetch" if source == "yahoo" else "Alpha Vantage intraday fetch"
+        raise upstream_error(action, exc) from exc
+    return resample_bars(bars, minutes) if minutes != native else bars
+
+
+async def load_intraday_series(source: str, symbol: str, start: str | None, end: str | None, interval: str) -> ColumnFrame:
+    if start is None or end is None:
+        raise HTTPException(status_code=400, detail="start and end are required for intraday bars")
+    bars = await load_intraday(source, symbol, start, end, interval)
+    return ohlcv_series_frame(symbol, "Yahoo Finance" if source == "yahoo" else "Alpha Vantage", bars, frequency=interval)
+
+
+async def load_bar_series(
+    source: str,
+    symbol: str,
+    start: str | None,
+    end: str | None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> ColumnFrame:
+    if source == "alpha-vantage":
+        today = datetime.now(UTC).date()
+        window_start = start or (today - timedelta(days=AlphaVantageFetcher.compact_days)).isoformat()
+        window_end = end or (today + timedelta(days=1)).isoformat()
+    elif start is None or end is None:
+        raise HTTPException(status_code=400, detail=f"start and end are required for {source}")
+    else:
+        window_start, window_end = start, end
+
+    bars, loaded = await load_bars(source, symbol, window_start, window_end, priority)
+    if source == "alpha-vantage" and start is None:
+        bars = bars.take(slice(-ALPHA_COMPACT_BARS, None))
+    series = ohlcv_series_frame(symbol, "Yahoo Finance" if source == "yahoo" else "Alpha Vantage", bars)
+
+    # Registry rows track what was pulled from upstream, so pure cache hits skip the database.
+    if loaded:
+        registry_writer.submit(series, request_start=start, request_end=end, requested=priority != Priority.BACKGROUND)
+    return series
+
+
+async def load_series(
+    source: str,
+    series_id: str,
+    start: str | None,
+    end: str | None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> ColumnFrame:
+    """Fetch a series past the cache, queue its registry row and write it back to Redis."""
+    if source in BAR_SOURCES:
+        return await load_bar_series(source, series_id, start, end, priority)
+    if start is None or end is None:
+        raise HTTPException(status_code=400, detail=f"start and end are required for {source}")
+    if source == "fred":
+        series = await _fetch_fred(series_id, start, end, priority)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported source: {source}")
+
+    registry_writer.submit(series, request_start=start, request_end=end, requested=priority != Priority.BACKGROUND)
+    cache_key = series_cache_key(source, series_id, start, end)
+    # The digest rides in the cached header, so ETags for cache hits need no hashing.
+    frame_digest(series)
+    await cache_set(cache_key, encode_frame(series), soft_ttl=SERIES_CACHE_TTLS[source], value=series)
+    return series
+
+
+async def refresh_series(source: str, series_id: str, start: str | None, end: str | None) -> None:
+    if source in BAR_SOURCES:
+        try:
+            await bar_chunk_cache.refresh_month(
+                BAR_SOURCES[source],
+                series_id,
+                month_start(datetime.now(UTC).date()),
+                load=bar_loader(source, series_id, Priority.BACKGROUND),
+                current_ttl=SERIES_CACHE_TTLS[source],
+            )
+        except Exception as exc:
+            action = "Yahoo fetch" if source == "yahoo" else "Alpha Vantage fetch"
+            raise upstream_error(action, exc) from exc
+        return
+    await load_series(source, series_id, start, end, priority=Priority.BACKGROUND)
+
+
+def schedule_refresh(source: str, series_id: str, start: str | None, end: str | None) -> None:
+    refresh_in_background(
+        series_cache_key(source, series_id, start, end),
+        lambda: refresh_series(source, series_id, start, end),
+    )
+
+
+async def load_series_coalesced(
+    source: str,
+    series_id: str,
+    start: str | None,
+    end: str | None,
+) -> ColumnFrame:
+    if source in BAR_SOURCES:
+        # Chunk loads are coalesced inside the bar cache.
+        return await load_bar_series(source, series_id, start, end)
+    cache_key = series_cache_key(source, series_id, start, end)
+    return await singleflight.do(
+        cache_key,
+        lambda: load_series(source, series_id, start, end),
+        lambda: read_cached_series(cache_key),
+    )
+
+
+async def get_series(
+    source: str,
+    series_id: str,
+    start: str | None,
+    end: str | None,
+) -> ColumnFrame:
+    """The series as a column frame (see ``app.data.codec``), from cache when possible."""
+    if source in BAR_SOURCES:
+        return await load_bar_series(source, series_id, start, end)
+    entry = await cache_get_decoded(series_cache_key(source, series_id, start, end), decode_series_frame)
+    if entry:
+        if entry.is_stale:
+            schedule_refresh(source, series_id, start, end)
+        return entry.payload
+    return await load_series_coalesced(source, series_id, start, end)
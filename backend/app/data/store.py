@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import re
+import weakref
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.data.bars import OhlcvArrays
+
+DateRange = tuple[date, date]
+RangeFetcher = Callable[[str, str], Awaitable[OhlcvArrays]]
+
+# Tickers (BRK.B, ^GSPC, EURUSD=X, ES=F) and FRED series IDs; symbols name directories, so nothing else is let through.
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9.^=_-]{1,32}")
+
+
+class InvalidSymbolError(ValueError):
+    pass
+
+
+def storage_name(symbol: str) -> str:
+    """``symbol`` upper-cased for use as a path component; raises ``InvalidSymbolError`` for anything else."""
+    name = symbol.upper()
+    if not SYMBOL_PATTERN.fullmatch(name) or ".." in name or name == ".":
+        raise InvalidSymbolError(f"Invalid symbol {symbol!r}")
+    return name
+
+
+def keyed_lock(locks: weakref.WeakValueDictionary, key: object) -> asyncio.Lock:
+    """The lock for ``key``; entries drop out once no caller holds or awaits them, so ``locks`` stays small."""
+    lock = locks.get(key)
+    if lock is None:
+        lock = locks[key] = asyncio.Lock()
+    return lock
+
+
+def merge_ranges(ranges: list[DateRange]) -> list[DateRange]:
+    merged: list[DateRange] = []
+    for start, end in sorted(item for item in ranges if item[0] < item[1]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(covered: list[DateRange], start: date, end: date) -> list[DateRange]:
+    """Return the sub-ranges of the half-open ``[start, end)`` window not present in ``covered``."""
+    gaps: list[DateRange] = []
+    cursor = start
+    for covered_start, covered_end in merge_ranges(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class BarStore:
+    """On-disk daily bar store partitioned as ``{source}/{symbol}/{year}.parquet``.
+
+    Each symbol directory keeps a ``_coverage.json`` manifest of the half-open date ranges that
+    were fetched from upstream, so repeated requests only download the dates not held yet.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._locks: weakref.WeakValueDictionary[tuple[str, str], asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def _symbol_dir(self, source: str, symbol: str) -> Path:
+        return self.root / source / storage_name(symbol)
+
+    def _lock(self, source: str, symbol: str) -> asyncio.Lock:
+        return keyed_lock(self._locks, (source, storage_name(symbol)))
+
+    def coverage(self, source: str, symbol: str) -> list[DateRange]:
+        manifest = self._symbol_dir(source, symbol) / "_coverage.json"
+        if not manifest.exists():
+            return []
+        payload = json.loads(manifest.read_text())
+        return [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in payload.get("ranges", [])]
+
+    def read(self, source: str, symbol: str, start: date, end: date) -> OhlcvArrays:
+        directory = self._symbol_dir(source, symbol)
+        bars = OhlcvArrays.concat(
+            [
+                OhlcvArrays.from_frame(pd.read_parquet(path))
+                for year in range(start.year, end.year + 1)
+                if (path := directory / f"{year}.parquet").exists()
+            ]
+        )
+        return bars.between(pd.Timestamp(start, tz=UTC).value, pd.Timestamp(end, tz=UTC).value)
+
+    def write(self, source: str, symbol: str, bars: OhlcvArrays, covered: list[DateRange]) -> None:
+        directory = self._symbol_dir(source, symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        years = bars.index().year.to_numpy()
+        for year in np.unique(years):
+            chunk = bars.take(years == year)
+            path = directory / f"{year}.parquet"
+            if path.exists():
+                chunk = OhlcvArrays.concat([OhlcvArrays.from_frame(pd.read_parquet(path)), chunk])
+            self._replace(path, lambda tmp, chunk=chunk: chunk.to_frame().to_parquet(tmp, index=False))
+
+        ranges = merge_ranges(self.coverage(source, symbol) + covered)
+        payload = {"ranges": [[start.isoformat(), end.isoformat()] for start, end in ranges]}
+        self._replace(directory / "_coverage.json", lambda tmp: tmp.write_text(json.dumps(payload)))
+
+    @staticmethod
+    def _replace(path: Path, writer: Callable[[Path], object]) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        writer(tmp)
+        os.replace(tmp, path)
+
+    async def get_daily(self, source: str, symbol: str, start: str, end: str, fetch: RangeFetcher) -> OhlcvArrays:
+        """Serve ``[start, end)`` from disk, calling ``fetch`` only for the date gaps not yet stored."""
+        start_date = date.fromisoformat(start)
+        end_date = date.fromisoformat(end)
+        # Today's bar is still forming, so it is stored but never marked as covered.
+        today = datetime.now(UTC).date()
+
+        async with self._lock(source, symbol):
+            gaps = missing_ranges(self.coverage(source, symbol), start_date, end_date)
+            if gaps:
+                fetched = await asyncio.gather(
+                    *(fetch(gap_start.isoformat(), gap_end.isoformat()) for gap_start, gap_end in gaps)
+                )
+                covered = [(gap_start, min(gap_end, today)) for gap_start, gap_end in gaps]
+                await asyncio.to_thread(self.write, source, symbol, OhlcvArrays.concat(list(fetched)), covered)
+
+            return await asyncio.to_thread(self.read, source, symbol, start_date, end_date)
+
+
+bar_store = BarStore(settings.bar_store_dir)
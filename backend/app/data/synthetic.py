@@ -0,0 +1,173 @@
+import json
+import zlib
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from app.data.bars import OhlcvArrays
+from app.data.intraday import SESSION_MINUTES
+
+TRADING_DAYS = 252
+JUMPS_PER_YEAR = 1.5
+JUMP_MEAN = -0.02
+JUMP_VOLATILITY = 0.06
+# The regular session's open at its standard-time UTC offset.
+SESSION_OPEN = pd.Timedelta(hours=14, minutes=30)
+
+
+def _streams(name: str, seed: int, count: int) -> list[np.random.Generator]:
+    """Independent generators per path component, so a longer path extends a shorter one draw for draw."""
+    sequence = np.random.SeedSequence([seed, zlib.crc32(name.upper().encode())])
+    return [np.random.default_rng(child) for child in sequence.spawn(count)]
+
+
+def synthetic_bars(symbol: str, start: str, end: str, seed: int = 0, origin: str = "2000-01-03") -> OhlcvArrays:
+    """Daily bars in ``[start, end)`` from a Merton jump-diffusion path unique to ``symbol`` and ``seed``.
+
+    The path always starts at ``origin`` on business days, so any window of a symbol agrees with every
+    other window of it; days before ``origin`` have no bars.
+    """
+    days = pd.bdate_range(origin, pd.Timestamp(end) - pd.Timedelta(days=1), tz=UTC)
+    if not len(days):
+        return OhlcvArrays.empty()
+    params, diffusion, jumps, jump_sizes, gaps, ranges, volumes = _streams(symbol, seed, 7)
+    drift, volatility, first_price, base_volume = params.uniform([0.02, 0.15, 20.0, 13.0], [0.12, 0.45, 300.0, 16.0])
+
+    count = len(days)
+    dt = 1.0 / TRADING_DAYS
+    jump_counts = jumps.poisson(JUMPS_PER_YEAR * dt, count)
+    log_returns = (
+        (drift - 0.5 * volatility**2) * dt
+        + volatility * np.sqrt(dt) * diffusion.standard_normal(count)
+        + JUMP_MEAN * jump_counts
+        + JUMP_VOLATILITY * np.sqrt(jump_counts) * jump_sizes.standard_normal(count)
+    )
+    close = first_price * np.exp(np.cumsum(log_returns))
+    # Opens gap by a slice of the day's move; highs and lows widen the open-close range by half-normal wicks.
+    previous = np.concatenate([[first_price], close[:-1]])
+    open_ = previous * np.exp(0.3 * log_returns * gaps.uniform(size=count))
+    wicks = np.abs(ranges.standard_normal((count, 2))) * 0.5 * volatility * np.sqrt(dt)
+    high = np.maximum(open_, close) * np.exp(wicks[:, 0])
+    low = np.minimum(open_, close) * np.exp(-wicks[:, 1])
+    volume = np.round(np.exp(base_volume + 0.4 * volumes.standard_normal(count) + 8.0 * np.abs(log_returns)))
+
+    bars = OhlcvArrays(days.as_unit("ns").asi8, open_, high, low, close, volume)
+    return bars.between(pd.Timestamp(start, tz=UTC).value, pd.Timestamp(end, tz=UTC).value)
+
+
+def synthetic_intraday_bars(
+    symbol: str, start: str, end: str, minutes: int, seed: int = 0, origin: str = "2000-01-03"
+) -> OhlcvArrays:
+    """Regular-session ``minutes`` bars whose path is a Brownian bridge from each synthetic daily open to its close.
+
+    Every day draws from a generator keyed by the day itself, so windows agree however they are cut.
+    """
+    daily = synthetic_bars(symbol, start, end, seed=seed, origin=origin)
+    if not len(daily):
+        return OhlcvArrays.empty()
+    steps = -(-SESSION_MINUTES // minutes)
+    day_numbers = daily.timestamps // (86_400 * 10**9)
+    draws = np.stack(
+        [_streams(f"{symbol}:{day}", seed, 1)[0].standard_normal(2 * steps) for day in day_numbers.tolist()]
+    )
+
+    log_open, log_close = np.log(daily.open)[:, None], np.log(daily.close)[:, None]
+    fraction = np.arange(1, steps + 1) / steps
+    scale = (np.log(daily.high / daily.low) / np.sqrt(steps))[:, None]
+    walk = np.cumsum(draws[:, :steps], axis=1) * scale
+    path = log_open + fraction * (log_close - log_open) + walk - fraction * walk[:, -1:]
+    close = np.exp(path)
+    open_ = np.concatenate([daily.open[:, None], close[:, :-1]], axis=1)
+    wicks = np.abs(draws[:, steps : 2 * steps]) * 0.3 * scale
+    high = np.maximum(open_, close) * np.exp(wicks)
+    low = np.minimum(open_, close) * np.exp(-wicks)
+    # Volume follows the usual U-shape: heavy at the open and close, light at midday.
+    profile = 1.0 + 2.0 * (2.0 * fraction - 1.0 - 1.0 / steps) ** 2
+    volume = np.round(daily.volume[:, None] * profile / profile.sum())
+
+    offsets = SESSION_OPEN.value + np.arange(steps) * minutes * 60 * 10**9
+    timestamps = daily.timestamps[:, None] + offsets
+    return OhlcvArrays(timestamps.ravel(), open_.ravel(), high.ravel(), low.ravel(), close.ravel(), volume.ravel())
+
+
+def synthetic_observations(series_id: str, start: str, end: str, seed: int = 0, origin: str = "2000-01-03") -> list[dict]:
+    """Monthly FRED-style observation rows following a slow geometric random walk."""
+    months = pd.date_range(pd.Timestamp(origin).to_period("M").to_timestamp(), end, freq="MS")
+    if not len(months):
+        return []
+    params, steps = _streams(series_id, seed, 2)
+    level, drift, volatility = params.uniform([1.0, -0.002, 0.002], [500.0, 0.006, 0.02])
+    values = level * np.exp(np.cumsum(drift + volatility * steps.standard_normal(len(months))))
+    today = datetime.now(UTC).date().isoformat()
+    return [
+        {"realtime_start": today, "realtime_end": today, "date": month.date().isoformat(), "value": f"{value:.3f}"}
+        for month, value in zip(months, values, strict=True)
+        if month >= pd.Timestamp(start)
+    ]
+
+
+class SyntheticTransport(httpx.AsyncBaseTransport):
+    """Answers the FRED and Alpha Vantage endpoints the fetchers call with generated data, offline."""
+
+    def __init__(self, seed: int = 0, origin: str = "2000-01-03"):
+        self.seed = seed
+        self.origin = origin
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        path = request.url.path
+        today = datetime.now(UTC).date()
+        if path.endswith("/series/observations"):
+            observations = synthetic_observations(
+                params["series_id"],
+                params.get("observation_start", self.origin),
+                params.get("observation_end", today.isoformat()),
+                self.seed,
+                self.origin,
+            )
+            payload = {"observations": observations}
+        elif path.endswith("/series/vintagedates"):
+            payload = {"vintage_dates": []}
+        elif path.endswith("/series/search"):
+            payload = {"count": 0, "seriess": []}
+        elif params.get("function", "").startswith("TIME_SERIES_DAILY"):
+            tomorrow = (today + timedelta(days=1)).isoformat()
+            bars = synthetic_bars(params["symbol"], self.origin, tomorrow, self.seed, self.origin)
+            if params.get("outputsize", "compact") == "compact":
+                bars = bars.take(slice(-100, None))
+            payload = {"Time Series (Daily)": self._time_series(bars, "%Y-%m-%d", "6. volume")}
+        elif params.get("function") == "TIME_SERIES_INTRADAY":
+            month = pd.Period(params["month"], freq="M")
+            minutes = int(params["interval"].removesuffix("min"))
+            bars = synthetic_intraday_bars(
+                params["symbol"],
+                month.start_time.date().isoformat(),
+                (month.end_time.date() + timedelta(days=1)).isoformat(),
+                minutes,
+                self.seed,
+                self.origin,
+            )
+            payload = {
+                "Meta Data": {"6. Time Zone": "UTC"},
+                f"Time Series ({params['interval']})": self._time_series(bars, "%Y-%m-%d %H:%M:%S", "5. volume"),
+            }
+        else:
+            return httpx.Response(404, json={"error": f"No synthetic data for {request.url.path}"}, request=request)
+        return httpx.Response(200, content=json.dumps(payload).encode(), headers={"content-type": "application/json"})
+
+    @staticmethod
+    def _time_series(bars: OhlcvArrays, stamp_format: str, volume_field: str) -> dict:
+        return {
+            stamp.strftime(stamp_format): {
+                "1. open": f"{open_:.4f}",
+                "2. high": f"{high:.4f}",
+                "3. low": f"{low:.4f}",
+                "4. close": f"{close:.4f}",
+                volume_field: f"{volume:.0f}",
+            }
+            for stamp, open_, high, low, close, volume in zip(
+                bars.index(), bars.open, bars.high, bars.low, bars.close, bars.volume, strict=True
+            )
+        }
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.cache import acquire_refresh_lock, cache_mget
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.data.series import SERIES_ERRORS, refresh_series, series_warm_key
+from app.models.db_models import DataRegistryEntry
+
+REGISTRY_SOURCES = {
+    "Yahoo Finance": "yahoo",
+    "FRED": "fred",
+    "Alpha Vantage": "alpha-vantage",
+}
+
+# A pass fails as a whole when the registry or the cache cannot be read.
+WARM_PASS_ERRORS = (SQLAlchemyError, OSError, RedisError)
+
+
+async def warm_recent_series() -> int:
+    """Refresh the most recently requested registry series whose cache entry goes stale before the next pass."""
+    async with SessionLocal() as db:
+        rows = (
+            (
+                await db.execute(
+                    select(DataRegistryEntry)
+                    .order_by(DataRegistryEntry.last_requested.desc().nulls_last())
+                    .limit(settings.cache_warm_batch_size)
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+    targets, keys = [], []
+    for row in rows:
+        source = REGISTRY_SOURCES.get(row.source)
+        metadata = row.metadata_json or {}
+        start, end = metadata.get("request_start"), metadata.get("request_end")
+        if source is None or (source != "alpha-vantage" and (start is None or end is None)):
+            continue
+        key = series_warm_key(source, row.ticker_or_series_id, start, end)
+        if key is None:
+            continue
+        targets.append((source, row.ticker_or_series_id, start, end))
+        keys.append(key)
+
+    entries = await cache_mget(keys) if keys else []
+    horizon = time.time() + settings.cache_warm_interval_seconds
+
+    warmed = 0
+    for key, target, entry in zip(keys, targets, entries):
+        if entry is not None and entry.soft_expires_at > horizon:
+            continue
+        if not await acquire_refresh_lock(key):
+            continue
+        try:
+            await refresh_series(*target)
+            warmed += 1
+        except SERIES_ERRORS as exc:
+            logger.warning("Cache warmer failed for {}: {}", key, exc)
+    return warmed
+
+
+async def run_cache_warmer() -> None:
+    while True:
+        await asyncio.sleep(settings.cache_warm_interval_seconds)
+        try:
+            warmed = await warm_recent_series()
+            if warmed:
+                logger.info("Cache warmer refreshed {} series", warmed)
+        except WARM_PASS_ERRORS as exc:
+            logger.warning("Cache warm pass failed: {}", exc)
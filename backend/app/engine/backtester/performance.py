@@ -17,7 +17,9 @@ def max_drawdown(equity_curve: list[EquityPoint]) -> float:
     return abs(drawdown)
 
 
-def build_tear_sheet(initial_capital: float, equity_curve: list[EquityPoint], trades: list[BacktestTrade]) -> TearSheet:
+def build_tear_sheet(
+    initial_capital: float, equity_curve: list[EquityPoint], trades: list[BacktestTrade], periods_per_year: float = 252
+) -> TearSheet:
     if len(equity_curve) < 2:
         return TearSheet(
             total_return=0.0,
@@ -44,8 +46,8 @@ def build_tear_sheet(initial_capital: float, equity_curve: list[EquityPoint], tr
     variance = sum((value - avg_return) ** 2 for value in returns) / len(returns)
     volatility = math.sqrt(variance)
 
-    annualized_return = (1 + avg_return) ** 252 - 1
-    annualized_volatility = volatility * math.sqrt(252)
+    annualized_return = (1 + avg_return) ** periods_per_year - 1
+    annualized_volatility = volatility * math.sqrt(periods_per_year)
     sharpe_ratio = annualized_return / annualized_volatility if annualized_volatility > 0 else 0.0
 
     largest_drawdown = max_drawdown(equity_curve)
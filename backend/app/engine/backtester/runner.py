@@ -1,50 +1,43 @@
 from collections import deque
 
-import yfinance as yf
+import numpy as np
 
-from app.engine.backtester.events import BarEvent, FillEvent, OrderEvent, SignalEvent
+from app.data.bars import BAR_COLUMNS, OhlcvArrays
+from app.data.intraday import SESSION_MINUTES, interval_minutes
+from app.engine.backtester.events import FillEvent, OrderEvent, SignalEvent
 from app.engine.backtester.performance import build_tear_sheet
 from app.engine.backtester.strategy import SmaCrossoverStrategy
 from app.models.schemas import BacktestRequest, BacktestResponse, BacktestTrade, EquityPoint
 
 
-def run_backtest(payload: BacktestRequest) -> BacktestResponse:
-    frame = yf.download(payload.symbol, start=payload.start, end=payload.end, auto_adjust=False, progress=False)
-    if frame.empty:
+def run_backtest(payload: BacktestRequest, bars: OhlcvArrays) -> BacktestResponse:
+    complete = ~np.isnan(np.column_stack([getattr(bars, name) for name in BAR_COLUMNS])).any(axis=1)
+    bars = bars.take(complete)
+    if not len(bars):
         raise ValueError("No market data available for requested range")
 
-    frame = frame[["Open", "High", "Low", "Close", "Volume"]].dropna().copy()
-    frame.columns = ["open", "high", "low", "close", "volume"]
-
     strategy = SmaCrossoverStrategy(
         fast_window=payload.strategy.fast_window,
         slow_window=payload.strategy.slow_window,
     )
-
-    frame["sma_fast"] = frame["close"].rolling(payload.strategy.fast_window).mean()
-    frame["sma_slow"] = frame["close"].rolling(payload.strategy.slow_window).mean()
+    signals = strategy.signals(bars.close)
+    index = bars.index()
 
     event_queue: deque[object] = deque()
     position = 0
     cash = payload.initial_capital
     entry_price = 0.0
     trades: list[BacktestTrade] = []
-    equity_curve: list[EquityPoint] = []
-
-    for index, (timestamp, row) in enumerate(frame.iterrows()):
-        bar = BarEvent(
-            timestamp=timestamp.to_pydatetime(),
-            open=float(row["open"]),
-            high=float(row["high"]),
-            low=float(row["low"]),
-            close=float(row["close"]),
-            volume=float(row["volume"]),
-        )
-        event_queue.append(bar)
+    # Cash and position only change on signal bars, so only those bars go through the event queue;
+    # the state after each of them is kept, after the initial state at bar -1.
+    state_bars = [-1]
+    cash_states = [cash]
+    position_states = [position]
 
-        signal = strategy.generate_signal(index=index, frame=frame)
-        if signal:
-            event_queue.append(SignalEvent(timestamp=bar.timestamp, signal=signal))
+    for bar_index in np.flatnonzero(signals).tolist():
+        timestamp = index[bar_index].to_pydatetime()
+        close = float(bars.close[bar_index])
+        event_queue.append(SignalEvent(timestamp=timestamp, signal="BUY" if signals[bar_index] > 0 else "SELL"))
 
         while event_queue:
             event = event_queue.popleft()
@@ -59,7 +52,7 @@ def run_backtest(payload: BacktestRequest) -> BacktestResponse:
                         timestamp=event.timestamp,
                         side=event.side,
                         quantity=event.quantity,
-                        price=bar.close,
+                        price=close,
                     )
                 )
             elif isinstance(event, FillEvent):
@@ -93,18 +86,22 @@ def run_backtest(payload: BacktestRequest) -> BacktestResponse:
                         )
                     )
 
-        mark_to_market = cash + (position * bar.close)
-        equity_curve.append(EquityPoint(timestamp=bar.timestamp, equity=mark_to_market))
+        state_bars.append(bar_index)
+        cash_states.append(cash)
+        position_states.append(position)
+
+    # Mark to market in one pass: every bar carries the state after the last signal bar at or before it.
+    state = np.searchsorted(state_bars, np.arange(len(bars)), side="right") - 1
+    equity = np.asarray(cash_states)[state] + np.asarray(position_states)[state] * bars.close
 
     if position > 0:
-        last_bar = frame.iloc[-1]
-        liquidation_price = float(last_bar["close"])
+        liquidation_price = float(bars.close[-1])
         proceeds = liquidation_price * position
         cash += proceeds
         pnl = (liquidation_price - entry_price) * position
         trades.append(
             BacktestTrade(
-                timestamp=frame.index[-1].to_pydatetime(),
+                timestamp=index[-1].to_pydatetime(),
                 side="SELL",
                 quantity=position,
                 price=liquidation_price,
@@ -112,9 +109,16 @@ def run_backtest(payload: BacktestRequest) -> BacktestResponse:
             )
         )
         position = 0
-        equity_curve[-1] = EquityPoint(timestamp=equity_curve[-1].timestamp, equity=cash)
+        equity[-1] = cash
+
+    equity_curve = [
+        EquityPoint(timestamp=timestamp, equity=value)
+        for timestamp, value in zip(index.to_pydatetime(), equity.tolist(), strict=True)
+    ]
 
-    tear_sheet = build_tear_sheet(payload.initial_capital, equity_curve, trades)
+    # Intraday returns annualize over the regular-session bars of a trading year.
+    periods_per_year = 252 if payload.interval == "1d" else 252 * SESSION_MINUTES / interval_minutes(payload.interval)
+    tear_sheet = build_tear_sheet(payload.initial_capital, equity_curve, trades, periods_per_year)
 
     return BacktestResponse(
         symbol=payload.symbol.upper(),
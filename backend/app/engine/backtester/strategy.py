@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
 import pandas as pd
 
 
 class BaseStrategy(ABC):
     @abstractmethod
-    def generate_signal(self, index: int, frame: pd.DataFrame) -> str | None:
+    def signals(self, close: np.ndarray) -> np.ndarray:
+        """One entry per bar: ``1`` to buy, ``-1`` to sell, ``0`` to hold."""
         raise NotImplementedError
 
 
@@ -16,22 +18,15 @@ class SmaCrossoverStrategy(BaseStrategy):
         self.fast_window = fast_window
         self.slow_window = slow_window
 
-    def generate_signal(self, index: int, frame: pd.DataFrame) -> str | None:
-        if index < self.slow_window:
-            return None
-
-        current_fast = frame.iloc[index]["sma_fast"]
-        current_slow = frame.iloc[index]["sma_slow"]
-        previous_fast = frame.iloc[index - 1]["sma_fast"]
-        previous_slow = frame.iloc[index - 1]["sma_slow"]
-
-        if pd.isna(current_fast) or pd.isna(current_slow) or pd.isna(previous_fast) or pd.isna(previous_slow):
-            return None
-
-        if previous_fast <= previous_slow and current_fast > current_slow:
-            return "BUY"
-
-        if previous_fast >= previous_slow and current_fast < current_slow:
-            return "SELL"
-
-        return None
+    def signals(self, close: np.ndarray) -> np.ndarray:
+        prices = pd.Series(close)
+        fast = prices.rolling(self.fast_window).mean().to_numpy()
+        slow = prices.rolling(self.slow_window).mean().to_numpy()
+        previous_fast = np.r_[np.nan, fast[:-1]]
+        previous_slow = np.r_[np.nan, slow[:-1]]
+
+        valid = ~(np.isnan(fast) | np.isnan(slow) | np.isnan(previous_fast) | np.isnan(previous_slow))
+        valid[: self.slow_window] = False
+        buy = valid & (previous_fast <= previous_slow) & (fast > slow)
+        sell = valid & (previous_fast >= previous_slow) & (fast < slow)
+        return buy.astype(np.int8) - sell.astype(np.int8)
@@ -0,0 +1,305 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from app.data.bars import BAR_COLUMNS, OhlcvArrays
+from app.data.intraday import NS_PER_DAY
+
+# A node is ``(operation, *params, *input nodes)``; equal tuples are the same intermediate, computed once.
+Node = tuple
+Kernel = Callable[..., np.ndarray]
+
+MAX_WINDOW = 10_000
+SOURCES = {name: (name,) for name in ("timestamps", *BAR_COLUMNS)}
+
+# Kernels run down axis 0, so every price input may be one series or a (bars x symbols) matrix of them.
+
+
+def _prepend(values: np.ndarray, fill: float) -> np.ndarray:
+    return np.concatenate([np.full((1, *values.shape[1:]), fill, dtype=values.dtype), values])
+
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    # Running totals are taken relative to each column's first value so they stay small next to each window's sum.
+    finite = np.isfinite(values)
+    first = finite.argmax(axis=0)
+    reference = values[first] if values.ndim == 1 else values[first, np.arange(values.shape[1])]
+    return np.where(finite.any(axis=0), reference, 0.0)
+
+
+def _window_totals(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Sums over each trailing ``window`` from prefix sums, and whether the window had no missing values."""
+    present = ~np.isnan(values)
+    totals = _prepend(np.cumsum(np.where(present, values, 0.0), axis=0), 0.0)
+    counts = _prepend(np.cumsum(present, axis=0), 0)
+    return totals[window:] - totals[:-window], counts[window:] - counts[:-window] == window
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        shift = _shift(values)
+        sums, full = _window_totals(values - shift, window)
+        # Windows of zeros (e.g. no gains for an RSI) must average to exactly zero, free of the shift's rounding.
+        nonzero, _ = _window_totals((values != 0).astype(float), window)
+        out[window - 1 :] = np.where(full, np.where(nonzero > 0, sums / window + shift, 0.0), np.nan)
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Sample standard deviation (``ddof=1``, as pandas) over each trailing window.
+
+    Each window's variance comes from pandas' rolling kernel rather than running sums of squares, which
+    cancel at high price levels and leave a flat window with a small non-zero spread.
+    """
+    if window < 2:
+        return np.full(values.shape, np.nan)
+    frame = pd.Series(values) if values.ndim == 1 else pd.DataFrame(values)
+    return frame.rolling(window, min_periods=window).std().to_numpy()
+
+
+def ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    # The recursion y[t] = alpha * x[t] + (1 - alpha) * y[t - 1] runs in pandas' compiled kernel (adjust=False),
+    # column by column for a matrix.
+    frame = pd.Series(values) if values.ndim == 1 else pd.DataFrame(values)
+    return frame.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean().to_numpy()
+
+
+def diff(values: np.ndarray) -> np.ndarray:
+    return _prepend(np.diff(values, axis=0), np.nan) if len(values) else values.astype(float)
+
+
+def scale(values: np.ndarray, factor: float) -> np.ndarray:
+    return values * factor
+
+
+def positive_part(values: np.ndarray) -> np.ndarray:
+    return np.maximum(values, 0.0)
+
+
+def negative_part(values: np.ndarray) -> np.ndarray:
+    return np.maximum(-values, 0.0)
+
+
+def typical_price(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    return (high + low + close) / 3
+
+
+def previous(values: np.ndarray) -> np.ndarray:
+    return _prepend(values[:-1].astype(float), np.nan) if len(values) else values.astype(float)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, prior_close: np.ndarray) -> np.ndarray:
+    ranges = np.stack([high - low, np.abs(high - prior_close), np.abs(low - prior_close)])
+    # The first bar has no prior close, so its range is just high - low.
+    return np.fmax(np.fmax(ranges[0], ranges[1]), ranges[2])
+
+
+def relative_strength(gain: np.ndarray, loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+def session_ratio(numerator: np.ndarray, denominator: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    """Running ``sum(numerator) / sum(denominator)``, restarted each UTC day when bars are intraday."""
+    if not len(timestamps):
+        return numerator.astype(float)
+    days = timestamps // NS_PER_DAY
+    starts = np.zeros(len(days), dtype=bool)
+    starts[0] = True
+    if len(np.unique(days)) < len(days):
+        starts[1:] = days[1:] != days[:-1]
+    group = np.cumsum(starts) - 1
+    first = np.flatnonzero(starts)
+    top, bottom = np.cumsum(numerator, axis=0), np.cumsum(denominator, axis=0)
+    top = top - _prepend(top, 0.0)[first][group]
+    bottom = bottom - _prepend(bottom, 0.0)[first][group]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return top / bottom
+
+
+@dataclass
+class IndicatorPlan:
+    """The dependency graph of one indicator request.
+
+    ``steps`` holds every distinct intermediate in dependency order (inputs are always added first),
+    so evaluation is a single pass; ``outputs`` maps each output name to the node that produces it and
+    ``requests`` maps the canonical name of each indicator planned to its output names.
+    """
+
+    steps: dict[Node, tuple[Kernel, tuple[Node, ...], dict]] = field(default_factory=dict)
+    outputs: list[tuple[str, Node]] = field(default_factory=list)
+    requests: dict[str, list[str]] = field(default_factory=dict)
+
+    def add(self, key: Node, kernel: Kernel, inputs: tuple[Node, ...], **params) -> Node:
+        self.steps.setdefault(key, (kernel, inputs, params))
+        return key
+
+    def combine(self, operation: str, kernel: Kernel, *inputs: Node) -> Node:
+        return self.add((operation, *inputs), kernel, inputs)
+
+    def rolling_mean(self, source: Node, window: int) -> Node:
+        return self.add(("rolling_mean", window, source), rolling_mean, (source,), window=window)
+
+    def rolling_std(self, source: Node, window: int) -> Node:
+        return self.add(("rolling_std", window, source), rolling_std, (source,), window=window)
+
+    def ewm(self, source: Node, alpha: float, min_periods: int = 0) -> Node:
+        return self.add(("ewm", alpha, min_periods, source), ewm, (source,), alpha=alpha, min_periods=min_periods)
+
+    def ema(self, source: Node, span: int) -> Node:
+        return self.ewm(source, 2 / (span + 1))
+
+    def scaled(self, source: Node, factor: float) -> Node:
+        return self.add(("scale", factor, source), scale, (source,), factor=factor)
+
+    def evaluate_columns(self, columns: dict[str, np.ndarray], keep: set[Node] | None = None) -> dict[Node, np.ndarray]:
+        """Every source and intermediate array of the plan over bar ``columns`` (keyed like ``SOURCES``).
+
+        With ``keep``, each other intermediate is released after its last consumer runs, which bounds
+        memory when the columns are (bars x symbols) matrices.
+        """
+        values: dict[Node, np.ndarray] = {
+            node: np.asarray(columns[name], dtype=np.int64 if name == "timestamps" else np.float64)
+            for name, node in SOURCES.items()
+        }
+        last_use = {node: position for position, (_, inputs, _) in enumerate(self.steps.values()) for node in inputs}
+        for position, (key, (kernel, inputs, params)) in enumerate(self.steps.items()):
+            values[key] = kernel(*(values[node] for node in inputs), **params)
+            if keep is not None:
+                for node in inputs:
+                    if last_use[node] == position and node not in keep and node not in SOURCES.values():
+                        values.pop(node, None)
+        return values
+
+    def evaluate_nodes(self, bars: OhlcvArrays) -> dict[Node, np.ndarray]:
+        """Every source and intermediate array of the plan over ``bars``."""
+        return self.evaluate_columns({name: getattr(bars, name) for name in SOURCES})
+
+    def evaluate(self, bars: OhlcvArrays) -> list[tuple[str, np.ndarray]]:
+        values = self.evaluate_nodes(bars)
+        return [(name, values[node]) for name, node in self.outputs]
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """An indicator family: positional parameter defaults and a builder adding its nodes to a plan.
+
+    ``build(plan, name, params)`` returns ``(output name, node)`` pairs, where ``name`` is the canonical
+    request name (e.g. ``SMA_50``).
+    """
+
+    defaults: tuple[float, ...]
+    build: Callable[[IndicatorPlan, str, tuple], list[tuple[str, Node]]]
+    integer_params: int = 0
+
+
+def _sma(plan: IndicatorPlan, name: str, params: tuple) -> list[tuple[str, Node]]:
+    return [(name, plan.rolling_mean(SOURCES["close"], params[0]))]
+
+
+def _ema(plan: IndicatorPlan, name: str, params: tuple) -> list[tuple[str, Node]]:
+    return [(name, plan.ema(SOURCES["close"], params[0]))]
+
+
+def _rsi(plan: IndicatorPlan, name: str, params: tuple) -> list[tuple[str, Node]]:
+    # Average gain over average loss with simple moving averages, not Wilder smoothing.
+    change = plan.add(("diff", SOURCES["close"]), diff, (SOURCES["close"],))
+    gain, loss = plan.combine("gain", positive_part, change), plan.combine("loss", negative_part, change)
+    window = params[0]
+    average_gain, average_loss = plan.rolling_mean(gain, window), plan.rolling_mean(loss, window)
+    return [(name, plan.combine("rsi", relative_strength, average_gain, average_loss))]
+
+
+def _macd(plan: IndicatorPlan, name: str, params: tuple) -> list[tuple[str, Node]]:
+    fast, slow, signal_span = params
+    close = SOURCES["close"]
+    line = plan.combine("subtract", np.subtract, plan.ema(close, fast), plan.ema(close, slow))
+    signal = plan.ema(line, signal_span)
+    return [(name, line), (f"{name}_SIGNAL", signal), (f"{name}_HIST", plan.combine("subtract", np.subtract, line, signal))]
+
+
+def _bbands(plan: IndicatorPlan, name: str, params: tuple) -> list[tuple[str, Node]]:
+    window, width = params
+    close = SOURCES["close"]
+    middle, spread = plan.rolling_mean(close, window), plan.scaled(plan.rolling_std(close, window), float(width))
+    # The default bands keep their original unparameterised names.
+    prefix = "BBANDS" if name == "BBANDS_20_2" else name
+    return [
+        (f"{prefix}_MID", middle),
+        (f"{prefix}_UPPER", plan.combine("add", np.add, middle, spread)),
+        (f"{prefix}_LOWER", plan.combine("subtract", np.subtract, middle, spread)),
+    ]
+
+
+def _atr(plan: IndicatorPlan, name: str, params: tuple) -> list[tuple[str, Node]]:
+    prior_close = plan.add(("previous", SOURCES["close"]), previous, (SOURCES["close"],))
+    ranges = plan.combine("true_range", true_range, SOURCES["high"], SOURCES["low"], prior_close)
+    # Wilder's smoothing is an EWM with alpha = 1 / period, shown once a full period has elapsed.
+    return [(name, plan.ewm(ranges, 1 / params[0], min_periods=params[0]))]
+
+
+def _vwap(plan: IndicatorPlan, name: str, params: tuple) -> list[tuple[str, Node]]:
+    typical = plan.combine("typical_price", typical_price, SOURCES["high"], SOURCES["low"], SOURCES["close"])
+    weighted = plan.combine("multiply", np.multiply, typical, SOURCES["volume"])
+    return [(name, plan.combine("session_ratio", session_ratio, weighted, SOURCES["volume"], SOURCES["timestamps"]))]
+
+
+INDICATORS: dict[str, IndicatorSpec] = {
+    "SMA": IndicatorSpec((20,), _sma, integer_params=1),
+    "EMA": IndicatorSpec((20,), _ema, integer_params=1),
+    "RSI": IndicatorSpec((14,), _rsi, integer_params=1),
+    "MACD": IndicatorSpec((12, 26, 9), _macd, integer_params=3),
+    "BBANDS": IndicatorSpec((20, 2), _bbands, integer_params=1),
+    "ATR": IndicatorSpec((14,), _atr, integer_params=1),
+    "VWAP": IndicatorSpec((), _vwap),
+}
+
+
+def parse_indicator(request: str) -> tuple[str, str, tuple]:
+    """``(family, canonical name, params)`` for a request such as ``SMA_50``, ``BBANDS_20_2.5`` or ``MACD``.
+
+    Omitted trailing parameters take the family defaults. Raises ``ValueError`` for unknown families
+    and invalid parameters.
+    """
+    family, *raw = request.strip().upper().split("_")
+    spec = INDICATORS.get(family)
+    if spec is None:
+        raise ValueError(f"Unknown indicator {request!r}; available: {', '.join(INDICATORS)}")
+    if len(raw) > len(spec.defaults):
+        raise ValueError(f"{family} takes at most {len(spec.defaults)} parameter(s), got {request!r}")
+    try:
+        values = [float(value) for value in raw]
+    except ValueError:
+        raise ValueError(f"Indicator parameters must be numbers, got {request!r}") from None
+    params = (*values, *spec.defaults[len(values) :])
+    for position, value in enumerate(params):
+        if not np.isfinite(value) or value <= 0:
+            raise ValueError(f"{family} parameters must be positive, got {request!r}")
+        if position < spec.integer_params and (value != int(value) or value > MAX_WINDOW):
+            raise ValueError(f"{family} periods must be whole numbers up to {MAX_WINDOW}, got {request!r}")
+    params = tuple(int(value) if position < spec.integer_params else value for position, value in enumerate(params))
+    if family == "BBANDS" and params[0] < 2:
+        raise ValueError(f"BBANDS needs a window of at least 2, got {request!r}")
+    # MACD with its standard spans keeps the plain name its outputs always had.
+    if family == "MACD" and params == spec.defaults:
+        return family, family, params
+    return family, "_".join([family, *(f"{value:g}" for value in params)]), params
+
+
+def plan_indicators(requests: list[str]) -> IndicatorPlan:
+    """Plan ``requests`` into one graph; shared intermediates (e.g. the 20-bar mean of SMA_20 and BBANDS_20,
+    or the 12-bar EMA of EMA_12 and MACD) become a single step. Raises ``ValueError`` on invalid requests."""
+    plan = IndicatorPlan()
+    for request in requests:
+        if not request.strip():
+            continue
+        family, name, params = parse_indicator(request)
+        if name in plan.requests:
+            continue
+        outputs = INDICATORS[family].build(plan, name, params)
+        plan.requests[name] = [output for output, _ in outputs]
+        plan.outputs.extend(outputs)
+    return plan
@@ -0,0 +1,288 @@
+import math
+
+import numpy as np
+
+from app.data.bars import OhlcvArrays
+from app.data.intraday import NS_PER_DAY
+from app.engine import indicator_registry as registry
+from app.engine.indicator_registry import SOURCES, IndicatorPlan, Node
+
+# Kernels whose value depends on earlier bars; every other step is element-wise.
+STATEFUL_KERNELS = (
+    registry.rolling_mean,
+    registry.rolling_std,
+    registry.ewm,
+    registry.diff,
+    registry.previous,
+    registry.session_ratio,
+)
+
+
+class RollingState:
+    """The last ``window`` inputs with running sums, for a trailing mean or sample standard deviation.
+
+    Sums are kept relative to a reference value and re-added exactly once per full turn of the buffer,
+    so each step is O(1) amortized and rounding never accumulates past one window.
+    """
+
+    def __init__(self, window: int, kind: str, buffer: list[float], position: int = 0):
+        self.window = window
+        self.kind = kind
+        self.buffer = buffer
+        self.position = position
+        self._resum()
+
+    def _resum(self) -> None:
+        present = [value for value in self.buffer if not math.isnan(value)]
+        self.reference = present[0] if present else 0.0
+        self.total = math.fsum(value - self.reference for value in present)
+        self.squares = math.fsum((value - self.reference) ** 2 for value in present)
+        self.missing = len(self.buffer) - len(present)
+        self.nonzero = sum(1 for value in present if value != 0)
+
+    def _count(self, value: float, sign: int) -> None:
+        if math.isnan(value):
+            self.missing += sign
+            return
+        self.total += sign * (value - self.reference)
+        self.squares += sign * (value - self.reference) ** 2
+        self.nonzero += sign * (value != 0)
+
+    def step(self, value: float, *_: float) -> float:
+        value = float(value)
+        if len(self.buffer) < self.window:
+            self.buffer.append(value)
+            self._count(value, 1)
+        else:
+            self._count(self.buffer[self.position], -1)
+            self.buffer[self.position] = value
+            self._count(value, 1)
+            self.position = (self.position + 1) % self.window
+            if self.position == 0:
+                self._resum()
+        if len(self.buffer) < self.window or self.missing:
+            return math.nan
+        if self.kind == "mean":
+            return 0.0 if not self.nonzero else self.total / self.window + self.reference
+        if self.window < 2:
+            return math.nan
+        variance = (self.squares - self.total**2 / self.window) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @classmethod
+    def seed(cls, values: np.ndarray, upto: int, window: int, kind: str) -> "RollingState":
+        return cls(window, kind, values[max(upto - window, 0) : upto].tolist())
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "kind": self.kind, "buffer": self.buffer, "position": self.position}
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "RollingState":
+        return cls(payload["window"], payload["kind"], list(payload["buffer"]), payload["position"])
+
+
+class EwmState:
+    """pandas' ``ewm(alpha, adjust=False).mean()`` recursion, one input at a time (missing inputs decay the weight)."""
+
+    def __init__(self, alpha: float, min_periods: int, value: float = math.nan, weight: float = 1.0, observations: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = value
+        self.weight = weight
+        self.observations = observations
+
+    def step(self, value: float) -> float:
+        value = float(value)
+        observed = not math.isnan(value)
+        self.observations += observed
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.weight *= 1 - self.alpha
+            if observed:
+                if self.value != value:
+                    self.value = (self.weight * self.value + self.alpha * value) / (self.weight + self.alpha)
+                self.weight = 1.0
+        return self.value if self.observations >= max(self.min_periods, 1) else math.nan
+
+    @classmethod
+    def seed(cls, values: np.ndarray, upto: int, alpha: float, min_periods: int) -> "EwmState":
+        observed = np.flatnonzero(~np.isnan(values[:upto]))
+        if not len(observed):
+            return cls(alpha, min_periods)
+        value = float(registry.ewm(values[:upto], alpha, 0)[-1])
+        return cls(alpha, min_periods, value, (1 - alpha) ** (upto - 1 - observed[-1]), len(observed))
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "min_periods": self.min_periods,
+            "value": self.value,
+            "weight": self.weight,
+            "observations": self.observations,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "EwmState":
+        return cls(**payload)
+
+
+class LagState:
+    """The previous input, returned as is (``previous``) or subtracted from the current one (``diff``)."""
+
+    def __init__(self, difference: bool, last: float = math.nan):
+        self.difference = difference
+        self.last = last
+
+    def step(self, value: float) -> float:
+        value, last = float(value), self.last
+        self.last = value
+        return value - last if self.difference else last
+
+    @classmethod
+    def seed(cls, values: np.ndarray, upto: int, difference: bool) -> "LagState":
+        return cls(difference, float(values[upto - 1]) if upto else math.nan)
+
+    def to_dict(self) -> dict:
+        return {"difference": self.difference, "last": self.last}
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "LagState":
+        return cls(**payload)
+
+
+class SessionRatioState:
+    """Running sums behind ``session_ratio``; ``per_session`` restarts them on each new UTC day."""
+
+    def __init__(self, per_session: bool, day: int = -1, numerator: float = 0.0, denominator: float = 0.0):
+        self.per_session = per_session
+        self.day = day
+        self.numerator = numerator
+        self.denominator = denominator
+
+    def step(self, numerator: float, denominator: float, timestamp: int) -> float:
+        day = int(timestamp) // NS_PER_DAY
+        if self.per_session and day != self.day:
+            self.numerator = self.denominator = 0.0
+        self.day = day
+        self.numerator += float(numerator)
+        self.denominator += float(denominator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(np.float64(self.numerator) / self.denominator)
+
+    @classmethod
+    def seed(cls, numerator: np.ndarray, denominator: np.ndarray, timestamps: np.ndarray, upto: int) -> "SessionRatioState":
+        days = timestamps // NS_PER_DAY
+        per_session = len(np.unique(days)) < len(days)
+        if not upto:
+            return cls(per_session)
+        first = int(np.searchsorted(days, days[upto - 1])) if per_session else 0
+        return cls(
+            per_session,
+            int(days[upto - 1]),
+            math.fsum(numerator[first:upto].tolist()),
+            math.fsum(denominator[first:upto].tolist()),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "per_session": self.per_session,
+            "day": self.day,
+            "numerator": self.numerator,
+            "denominator": self.denominator,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "SessionRatioState":
+        return cls(**payload)
+
+
+def _seed_state(kernel, inputs: list[np.ndarray], upto: int, params: dict):
+    if kernel is registry.rolling_mean:
+        return RollingState.seed(inputs[0], upto, params["window"], "mean")
+    if kernel is registry.rolling_std:
+        return RollingState.seed(inputs[0], upto, params["window"], "std")
+    if kernel is registry.ewm:
+        return EwmState.seed(inputs[0], upto, params["alpha"], params["min_periods"])
+    if kernel is registry.diff or kernel is registry.previous:
+        return LagState.seed(inputs[0], upto, difference=kernel is registry.diff)
+    if kernel is registry.session_ratio:
+        return SessionRatioState.seed(*inputs, upto)
+    return None
+
+
+STATE_TYPES = {cls.__name__: cls for cls in (RollingState, EwmState, LagState, SessionRatioState)}
+
+
+class IndicatorStream:
+    """A plan's running state after its first ``count`` bars, advanced one bar at a time.
+
+    Stateful steps (windows, EWMs, lags, session sums) keep O(window) state and do O(1) work per bar;
+    element-wise steps reuse the plan's NumPy kernels on scalars. ``timestamp`` and ``close`` of the
+    last bar folded in let a checkpoint recognise the history it continues.
+    """
+
+    def __init__(self, plan: IndicatorPlan, states: dict[Node, object], count: int, timestamp: int, close: float):
+        self.plan = plan
+        self.states = states
+        self.count = count
+        self.timestamp = timestamp
+        self.close = close
+
+    @classmethod
+    def seed(cls, plan: IndicatorPlan, bars: OhlcvArrays, upto: int) -> tuple["IndicatorStream", dict[Node, np.ndarray]]:
+        """The stream after ``bars[:upto]``, seeded from one vectorized pass, plus that pass's arrays over all ``bars``."""
+        values = plan.evaluate_nodes(bars)
+        states = {}
+        for key, (kernel, inputs, params) in plan.steps.items():
+            state = _seed_state(kernel, [values[node] for node in inputs], upto, params)
+            if state is not None:
+                states[key] = state
+        timestamp, close = (int(bars.timestamps[upto - 1]), float(bars.close[upto - 1])) if upto else (0, math.nan)
+        return cls(plan, states, upto, timestamp, close), values
+
+    def resumes(self, bars: OhlcvArrays) -> bool:
+        """Whether ``bars`` starts with exactly the history this stream has folded in."""
+        if not self.count:
+            return False
+        index = int(np.searchsorted(bars.timestamps, self.timestamp))
+        return (
+            index + 1 == self.count
+            and index < len(bars)
+            and int(bars.timestamps[index]) == self.timestamp
+            and float(bars.close[index]) == self.close
+        )
+
+    def step(self, bars: OhlcvArrays, index: int) -> dict[Node, float]:
+        """Fold in ``bars[index]`` (the bar after the last one folded in) and return every node's value for it."""
+        values: dict[Node, float] = {
+            node: bars.timestamps[index] if name == "timestamps" else np.float64(getattr(bars, name)[index])
+            for name, node in SOURCES.items()
+        }
+        for key, (kernel, inputs, params) in self.plan.steps.items():
+            arguments = [values[node] for node in inputs]
+            state = self.states.get(key)
+            if state is not None:
+                values[key] = np.float64(state.step(*arguments))
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    values[key] = kernel(*arguments, **params)
+        self.count += 1
+        self.timestamp, self.close = int(bars.timestamps[index]), float(bars.close[index])
+        return values
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "timestamp": self.timestamp,
+            "close": self.close,
+            "states": [[type(state).__name__, state.to_dict()] for state in self.states.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, plan: IndicatorPlan, payload: dict) -> "IndicatorStream":
+        keys = [key for key, (kernel, inputs, params) in plan.steps.items() if kernel in STATEFUL_KERNELS]
+        if len(keys) != len(payload["states"]):
+            raise ValueError("Checkpoint does not match the indicator plan")
+        states = {key: STATE_TYPES[name].from_dict(state) for key, (name, state) in zip(keys, payload["states"])}
+        return cls(plan, states, payload["count"], payload["timestamp"], payload["close"])
@@ -1,84 +1,99 @@
 from datetime import UTC, datetime
 
+import numpy as np
 import pandas as pd
 
+from app.data.bars import BAR_COLUMNS, OhlcvArrays
+from app.data.processors.downsample import bucket_bounds, downsample_bars, lttb_indices
+from app.data.processors.normalize import epoch_millis, nullable_floats
+from app.engine.indicator_registry import plan_indicators
 from app.models.schemas import IndicatorPoint, IndicatorSeries, OhlcvBar, TechnicalAnalysisResponse
 
 
-def _series_to_points(values: pd.Series) -> list[IndicatorPoint]:
-    points: list[IndicatorPoint] = []
-    clean = values.dropna()
-    for timestamp, value in clean.items():
-        ts = pd.Timestamp(timestamp).to_pydatetime()
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=UTC)
-        else:
-            ts = ts.astimezone(UTC)
-        points.append(IndicatorPoint(timestamp=ts, value=float(value)))
-    return points
-
-
-def compute_indicators(rows: list[dict], indicators: list[str], symbol: str) -> TechnicalAnalysisResponse:
-    frame = pd.DataFrame(rows)
-    frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
-    frame = frame.sort_values("timestamp").set_index("timestamp")
-
-    close = frame["close"]
-    selected = {name.strip().upper() for name in indicators if name.strip()}
-    series: list[IndicatorSeries] = []
-
-    if "SMA_20" in selected:
-        sma20 = close.rolling(20).mean()
-        series.append(IndicatorSeries(name="SMA_20", points=_series_to_points(sma20)))
-
-    if "EMA_20" in selected:
-        ema20 = close.ewm(span=20, adjust=False).mean()
-        series.append(IndicatorSeries(name="EMA_20", points=_series_to_points(ema20)))
-
-    if "RSI_14" in selected:
-        delta = close.diff()
-        gain = delta.clip(lower=0).rolling(14).mean()
-        loss = (-delta.clip(upper=0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        series.append(IndicatorSeries(name="RSI_14", points=_series_to_points(rsi)))
-
-    if "MACD" in selected:
-        ema12 = close.ewm(span=12, adjust=False).mean()
-        ema26 = close.ewm(span=26, adjust=False).mean()
-        macd = ema12 - ema26
-        signal = macd.ewm(span=9, adjust=False).mean()
-        histogram = macd - signal
-        series.append(IndicatorSeries(name="MACD", points=_series_to_points(macd)))
-        series.append(IndicatorSeries(name="MACD_SIGNAL", points=_series_to_points(signal)))
-        series.append(IndicatorSeries(name="MACD_HIST", points=_series_to_points(histogram)))
+def _series_to_points(timestamps: np.ndarray, values: np.ndarray, max_points: int | None = None) -> list[IndicatorPoint]:
+    present = ~np.isnan(values)
+    timestamps, values = timestamps[present], values[present]
+    if max_points is not None and len(values) > max_points:
+        kept = lttb_indices(timestamps, values, max_points)
+        timestamps, values = timestamps[kept], values[kept]
+    return [
+        IndicatorPoint(timestamp=timestamp, value=value)
+        for timestamp, value in zip(pd.to_datetime(timestamps, unit="ns", utc=True).to_pydatetime(), values.tolist())
+    ]
 
-    if "BBANDS_20" in selected:
-        basis = close.rolling(20).mean()
-        std = close.rolling(20).std()
-        upper = basis + 2 * std
-        lower = basis - 2 * std
-        series.append(IndicatorSeries(name="BBANDS_MID", points=_series_to_points(basis)))
-        series.append(IndicatorSeries(name="BBANDS_UPPER", points=_series_to_points(upper)))
-        series.append(IndicatorSeries(name="BBANDS_LOWER", points=_series_to_points(lower)))
 
-    ohlcv = [
-        OhlcvBar(
-            timestamp=pd.Timestamp(index).to_pydatetime(),
-            open=float(item["open"]),
-            high=float(item["high"]),
-            low=float(item["low"]),
-            close=float(item["close"]),
-            volume=float(item["volume"]),
+def _ohlcv_bars(bars: OhlcvArrays) -> list[OhlcvBar]:
+    return [
+        OhlcvBar(timestamp=timestamp, open=open_, high=high, low=low, close=close, volume=volume)
+        for timestamp, open_, high, low, close, volume in zip(
+            bars.datetimes(),
+            bars.open.tolist(),
+            bars.high.tolist(),
+            bars.low.tolist(),
+            bars.close.tolist(),
+            bars.volume.tolist(),
         )
-        for index, item in frame.iterrows()
     ]
 
+
+def compute_indicators(
+    bars: OhlcvArrays,
+    indicators: list[str],
+    symbol: str,
+    max_points: int | None = None,
+    frequency: str = "daily",
+    outputs: list[tuple[str, np.ndarray]] | None = None,
+) -> TechnicalAnalysisResponse:
+    """Indicators over the full history; with ``max_points`` bars become candles and each line is reduced by LTTB.
+
+    ``outputs`` are indicator arrays already computed over ``bars`` (e.g. read from the cache).
+    """
+    if outputs is None:
+        outputs = plan_indicators(indicators).evaluate(bars)
     return TechnicalAnalysisResponse(
         ticker_or_series_id=symbol,
         source="Yahoo Finance",
-        frequency="daily",
+        frequency=frequency,
         last_updated=datetime.now(UTC),
-        ohlcv=ohlcv,
-        indicators=series,
+        ohlcv=_ohlcv_bars(downsample_bars(bars, max_points) if max_points else bars),
+        indicators=[
+            IndicatorSeries(name=name, points=_series_to_points(bars.timestamps, values, max_points))
+            for name, values in outputs
+        ],
     )
+
+
+def indicator_columns(
+    bars: OhlcvArrays, outputs: list[tuple[str, np.ndarray]], symbol: str, frequency: str = "daily"
+) -> dict:
+    """The columnar technical analysis body for ``bars`` and indicator arrays aligned with them."""
+    return {
+        "ticker_or_series_id": symbol,
+        "source": "Yahoo Finance",
+        "frequency": frequency,
+        "last_updated": datetime.now(UTC).isoformat(),
+        "timestamps": epoch_millis(bars.timestamps),
+        **{name: nullable_floats(getattr(bars, name)) for name in BAR_COLUMNS},
+        "indicators": {name: nullable_floats(values) for name, values in outputs},
+    }
+
+
+def technical_columns(
+    bars: OhlcvArrays,
+    indicators: list[str],
+    symbol: str,
+    max_points: int | None = None,
+    frequency: str = "daily",
+    outputs: list[tuple[str, np.ndarray]] | None = None,
+) -> dict:
+    """Columnar technical analysis: bar arrays plus each indicator aligned to ``timestamps`` (null in warm-up).
+
+    With ``max_points`` the bars become candles and indicators keep their value at each candle's close.
+    """
+    if outputs is None:
+        outputs = plan_indicators(indicators).evaluate(bars)
+    if max_points is not None and len(bars) > max_points:
+        _, ends = bucket_bounds(len(bars), max_points)
+        bars = downsample_bars(bars, max_points)
+        outputs = [(name, values[ends]) for name, values in outputs]
+    return indicator_columns(bars, outputs, symbol, frequency)
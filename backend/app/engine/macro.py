@@ -1,9 +1,11 @@
+import asyncio
 from datetime import UTC, datetime
 
 import numpy as np
 import pandas as pd
 
 from app.data.fetchers.fred import FredFetcher
+from app.data.fred_store import fred_store
 from app.models.schemas import CorrelationCell, MacroDashboardResponse, MacroPoint, MacroSeries
 
 DEFAULT_MACRO_SERIES: dict[str, str] = {
@@ -15,10 +17,6 @@ DEFAULT_MACRO_SERIES: dict[str, str] = {
 }
 
 
-def _to_timestamp(date_str: str) -> datetime:
-    return datetime.fromisoformat(f"{date_str}T00:00:00+00:00")
-
-
 def _build_points(values: pd.Series, recession_map: dict[datetime, int]) -> list[MacroPoint]:
     yoy = values.pct_change(periods=12) * 100.0
     std = values.std(ddof=0)
@@ -47,27 +45,24 @@ async def build_macro_dashboard(start: str, end: str, series_ids: list[str] | No
     chosen_series = [series.upper() for series in (series_ids or list(DEFAULT_MACRO_SERIES.keys()))]
     fetcher = FredFetcher()
 
-    recession_obs = await fetcher.fetch_series(series_id="USREC", start=start, end=end)
+    # Series are read from the local FRED store, which only goes upstream when a new vintage is due.
+    recession_obs, *series_obs = await asyncio.gather(
+        *(fred_store.get_observations(series_id, start, end, fetcher) for series_id in ["USREC", *chosen_series])
+    )
     recession_map: dict[datetime, int] = {
-        _to_timestamp(item["date"]): int(float(item.get("value", 0.0) if item.get("value") != "." else 0.0))
-        for item in recession_obs
+        timestamp: int(value)
+        for timestamp, value in zip(recession_obs["date"].dt.to_pydatetime(), recession_obs["value"].fillna(0.0))
     }
 
     frame_data: dict[str, pd.Series] = {}
     series_collection: list[MacroSeries] = []
 
-    for series_id in chosen_series:
-        observations = await fetcher.fetch_series(series_id=series_id, start=start, end=end)
-        rows = [
-            (_to_timestamp(item["date"]), float(item["value"]))
-            for item in observations
-            if item.get("value") not in (None, ".")
-        ]
-
-        if not rows:
+    for series_id, observations in zip(chosen_series, series_obs):
+        observations = observations.dropna(subset=["value"])
+        if observations.empty:
             continue
 
-        data = pd.Series({timestamp: value for timestamp, value in rows}).sort_index()
+        data = pd.Series(observations["value"].to_numpy(), index=observations["date"]).sort_index()
         frame_data[series_id] = data
 
         series_collection.append(
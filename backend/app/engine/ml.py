@@ -2,8 +2,8 @@ import math
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 
+from app.data.bars import OhlcvArrays
 from app.models.schemas import MlPredictionPoint, MlTrainRequest, MlTrainResponse
 
 
@@ -35,12 +35,11 @@ def _predict(x: np.ndarray, coefficients: np.ndarray, intercept: float) -> np.nd
     return x @ coefficients + intercept
 
 
-def train_baseline_model(payload: MlTrainRequest) -> MlTrainResponse:
-    frame = yf.download(payload.symbol, start=payload.start, end=payload.end, auto_adjust=False, progress=False)
-    if frame.empty:
+def train_baseline_model(payload: MlTrainRequest, bars: OhlcvArrays) -> MlTrainResponse:
+    if not len(bars):
         raise ValueError("No market data available for requested range")
 
-    close_series = frame["Close"].dropna()
+    close_series = pd.Series(bars.close, index=bars.index()).dropna()
     x, y, timestamps = _build_lag_matrix(close_series, payload.lags)
 
     if len(y) < 30:
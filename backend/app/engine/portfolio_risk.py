@@ -3,33 +3,35 @@ import statistics
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 
-from app.models.schemas import CorrelationCell, MeanVarianceResponse, PortfolioFrontierPoint, PortfolioWeights, RiskMetricsResponse
+from app.data.bars import OhlcvArrays
+from app.models.schemas import (
+    CorrelationCell,
+    MeanVarianceResponse,
+    PortfolioFrontierPoint,
+    PortfolioWeights,
+    RiskMetricsResponse,
+)
 
 
-def _fetch_close_returns(symbols: list[str], start: str, end: str) -> pd.DataFrame:
-    data = yf.download(symbols, start=start, end=end, auto_adjust=False, progress=False)
-    closes = data["Close"] if "Close" in data else data
-
-    if isinstance(closes, pd.Series):
-        closes = closes.to_frame(name=symbols[0])
-
+def _close_returns(symbols: list[str], bars: dict[str, OhlcvArrays]) -> pd.DataFrame:
+    closes = pd.DataFrame({symbol: pd.Series(bars[symbol].close, index=bars[symbol].index()) for symbol in symbols})
     closes = closes.dropna(how="all").ffill().dropna()
     returns = closes.pct_change().dropna()
+    if returns.empty:
+        raise ValueError("No market data available for requested range")
     return returns
 
 
 def compute_mean_variance(
     symbols: list[str],
-    start: str,
-    end: str,
+    bars: dict[str, OhlcvArrays],
     risk_free_rate: float,
     long_only: bool,
     frontier_points: int,
 ) -> MeanVarianceResponse:
     clean_symbols = [symbol.upper() for symbol in symbols]
-    returns = _fetch_close_returns(clean_symbols, start=start, end=end)
+    returns = _close_returns(clean_symbols, bars)
 
     mean_returns = returns.mean().to_numpy(dtype=float) * 252.0
     covariance = returns.cov().to_numpy(dtype=float) * 252.0
@@ -88,14 +90,13 @@ def compute_mean_variance(
 
 def compute_risk_metrics(
     symbols: list[str],
-    start: str,
-    end: str,
+    bars: dict[str, OhlcvArrays],
     confidence_level: float,
     horizon_days: int,
     weights: list[float] | None,
 ) -> RiskMetricsResponse:
     clean_symbols = [symbol.upper() for symbol in symbols]
-    returns = _fetch_close_returns(clean_symbols, start=start, end=end)
+    returns = _close_returns(clean_symbols, bars)
 
     return compute_risk_metrics_from_returns(
         symbols=clean_symbols,
@@ -0,0 +1,253 @@
+import ast
+from datetime import UTC, datetime
+
+import numpy as np
+
+from app.data.bars import BAR_COLUMNS, OhlcvArrays
+from app.engine.indicator_registry import SOURCES, IndicatorPlan, Node, parse_indicator, plan_indicators
+from app.models.schemas import ScreenMatch, ScreenResponse
+
+# Suffixes naming one output of a multi-output indicator, e.g. MACD_SIGNAL or BBANDS_50_2_UPPER.
+OUTPUT_SUFFIXES = ("SIGNAL", "HIST", "MID", "UPPER", "LOWER")
+FUNCTIONS = {"abs": 1, "prev": 1, "crossed_above": 2, "crossed_below": 2}
+COMPARISONS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+OPERATORS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide, ast.Pow: np.power}
+_SYNTAX = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.BinOp,
+    ast.Compare,
+    ast.Name,
+    ast.Load,
+    *OPERATORS,
+    *COMPARISONS,
+)
+
+
+def _unsupported(node: ast.AST) -> str | None:
+    """What makes ``node`` unsupported in a screen expression, or ``None`` when it is allowed."""
+    if isinstance(node, ast.Call):
+        name = node.func.id.lower() if isinstance(node.func, ast.Name) else None
+        if name in FUNCTIONS and not node.keywords and len(node.args) == FUNCTIONS[name]:
+            return None
+        return f"Unsupported call; available: {', '.join(FUNCTIONS)}"
+    if isinstance(node, ast.Constant):
+        return None if isinstance(node.value, int | float) else "Only numeric constants are allowed"
+    return None if isinstance(node, _SYNTAX) else f"Unsupported syntax: {type(node).__name__}"
+
+
+def parse_expression(source: str) -> ast.Expression:
+    """Parse a screen expression, allowing only arithmetic, comparisons, ``and``/``or``/``not``, numbers,
+    bar fields, indicator names and the ``FUNCTIONS``; raises ``ValueError`` for anything else."""
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid screen expression {source!r}: {exc.msg}") from None
+    for node in ast.walk(tree):
+        if problem := _unsupported(node):
+            raise ValueError(f"{problem} in {source!r}")
+    return tree
+
+
+def referenced_names(tree: ast.Expression) -> list[str]:
+    functions = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    names = [node.id.upper() for node in ast.walk(tree) if isinstance(node, ast.Name) and id(node) not in functions]
+    return list(dict.fromkeys(names))
+
+
+def _resolve(identifier: str) -> tuple[str | None, str | None]:
+    """``(indicator request, output suffix)`` an identifier refers to; ``(None, None)`` for a bar field."""
+    if identifier.lower() in BAR_COLUMNS:
+        return None, None
+    try:
+        parse_indicator(identifier)
+        return identifier, None
+    except ValueError:
+        head, _, suffix = identifier.rpartition("_")
+        if not head or suffix not in OUTPUT_SUFFIXES:
+            raise
+        parse_indicator(head)
+        return head, suffix
+
+
+def plan_screen(expressions: list[str]) -> tuple[IndicatorPlan, list[ast.Expression], dict[str, Node]]:
+    """Parse ``expressions`` and plan every indicator they name into one graph.
+
+    Returns the plan, the parsed expressions and the node behind each identifier. Raises ``ValueError``
+    for invalid expressions, unknown names and names of a multi-output indicator that do not pick an output.
+    """
+    trees = [parse_expression(expression) for expression in expressions]
+    identifiers = list(dict.fromkeys(name for tree in trees for name in referenced_names(tree)))
+    resolved = {identifier: _resolve(identifier) for identifier in identifiers}
+    plan = plan_indicators([request for request, _ in resolved.values() if request is not None])
+    outputs = dict(plan.outputs)
+
+    nodes: dict[str, Node] = {}
+    for identifier, (request, suffix) in resolved.items():
+        if request is None:
+            nodes[identifier] = SOURCES[identifier.lower()]
+            continue
+        canonical = parse_indicator(request)[1]
+        names = plan.requests[canonical]
+        candidates = [name for name in names if name.endswith(f"_{suffix}")] if suffix else [canonical]
+        if not candidates:
+            raise ValueError(f"{identifier} has no {suffix} output")
+        if candidates[0] not in names:
+            raise ValueError(f"{identifier} has several outputs ({', '.join(names)}); name one of them")
+        nodes[identifier] = outputs[candidates[0]]
+    return plan, trees, nodes
+
+
+def bar_matrix(bars: dict[str, OhlcvArrays]) -> dict[str, np.ndarray]:
+    """Align each symbol's bars on the union of their timestamps as (bars x symbols) columns.
+
+    A symbol's missing bars repeat its last close with zero volume (a halted or thinly traded day);
+    rows before its first bar stay NaN.
+    """
+    stamps = np.concatenate([symbol_bars.timestamps for symbol_bars in bars.values()])
+    timestamps, rows = np.unique(stamps, return_inverse=True)
+    shape = (len(timestamps), len(bars))
+    # Flat positions in the (bars x symbols) matrix, computed once for every column.
+    positions = rows * shape[1] + np.repeat(np.arange(shape[1]), [len(symbol_bars) for symbol_bars in bars.values()])
+    columns = {}
+    for name in BAR_COLUMNS:
+        columns[name] = np.full(shape, np.nan)
+        np.put(columns[name], positions, np.concatenate([getattr(symbol_bars, name) for symbol_bars in bars.values()]))
+    present = np.zeros(shape, dtype=bool)
+    np.put(present, positions, True)
+
+    last = np.maximum.accumulate(np.where(present, np.arange(shape[0])[:, None], -1), axis=0)
+    gaps = ~present & (last >= 0)
+    carried = columns["close"][np.maximum(last, 0), np.arange(shape[1])]
+    for name in ("open", "high", "low", "close"):
+        columns[name][gaps] = carried[gaps]
+    columns["volume"][gaps] = 0.0
+    return {"timestamps": timestamps, **columns}
+
+
+def _truth(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values)
+    return values if values.dtype == bool else (values != 0) & ~np.isnan(values)
+
+
+class _Evaluator:
+    """Evaluates a vetted expression over all symbols at once, on the last row (``lag`` 0) or earlier ones."""
+
+    def __init__(self, values: dict[str, np.ndarray], width: int):
+        self.values = values
+        self.width = width
+
+    def __call__(self, node: ast.AST, lag: int = 0) -> np.ndarray:
+        if isinstance(node, ast.Expression):
+            return self(node.body, lag)
+        if isinstance(node, ast.Constant):
+            return np.full(self.width, float(node.value))
+        if isinstance(node, ast.Name):
+            matrix = self.values[node.id.upper()]
+            return matrix[-1 - lag] if len(matrix) > lag else np.full(self.width, np.nan)
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return combine.reduce([_truth(self(value, lag)) for value in node.values])
+        if isinstance(node, ast.UnaryOp):
+            operand = self(node.operand, lag)
+            if isinstance(node.op, ast.Not):
+                return ~_truth(operand)
+            operand = np.asarray(operand, dtype=float)
+            return -operand if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.BinOp):
+            # Conditions count as 0/1 in arithmetic, as in Python.
+            left, right = (np.asarray(self(side, lag), dtype=float) for side in (node.left, node.right))
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                return OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.Compare):
+            result = np.ones(self.width, dtype=bool)
+            left = self(node.left, lag)
+            for operator, comparator in zip(node.ops, node.comparators):
+                right = self(comparator, lag)
+                result &= COMPARISONS[type(operator)](left, right)
+                left = right
+            return result
+        name, arguments = node.func.id.lower(), node.args
+        if name == "abs":
+            return np.abs(self(arguments[0], lag))
+        if name == "prev":
+            return self(arguments[0], lag + 1)
+        first, second = arguments
+        now, before = self(first, lag) - self(second, lag), self(first, lag + 1) - self(second, lag + 1)
+        if name == "crossed_above":
+            return (now > 0) & (before <= 0)
+        return (now < 0) & (before >= 0)
+
+
+def run_screen(
+    bars: dict[str, OhlcvArrays],
+    filter_expression: str | None,
+    sort_expression: str | None,
+    descending: bool = True,
+    limit: int = 50,
+    missing: list[str] | None = None,
+) -> ScreenResponse:
+    """Screen ``bars`` (keyed by symbol) on their latest row.
+
+    Every indicator named by the expressions is computed once over the aligned (bars x symbols) matrix,
+    then ``filter_expression`` selects symbols and ``sort_expression`` ranks them (NaN scores last).
+    Symbols with no bar on the latest date are reported as ``stale`` instead of screened.
+    """
+    expressions = [expression for expression in (filter_expression, sort_expression) if expression]
+    plan, trees, nodes = plan_screen(expressions)
+    bars = {symbol: symbol_bars for symbol, symbol_bars in bars.items() if len(symbol_bars)}
+    if not bars:
+        return ScreenResponse(as_of=None, universe=0, matched=0, missing=missing or [], results=[])
+    # A delisted or stale symbol would otherwise be screened on its last close carried forward to as_of.
+    latest_ns = max(int(symbol_bars.timestamps[-1]) for symbol_bars in bars.values())
+    stale = [symbol for symbol, symbol_bars in bars.items() if symbol_bars.timestamps[-1] < latest_ns]
+    bars = {symbol: symbol_bars for symbol, symbol_bars in bars.items() if symbol_bars.timestamps[-1] == latest_ns}
+    symbols = list(bars)
+
+    columns = bar_matrix(bars)
+    computed = plan.evaluate_columns(columns, keep=set(nodes.values()))
+    evaluate = _Evaluator({identifier: computed[node] for identifier, node in nodes.items()}, len(symbols))
+
+    trees = iter(trees)
+    selected = _truth(evaluate(next(trees))) if filter_expression else np.ones(len(symbols), dtype=bool)
+    candidates = np.flatnonzero(selected)
+    scores = None
+    if sort_expression:
+        scores = np.asarray(evaluate(next(trees)), dtype=float)
+        keys = np.where(np.isnan(scores), np.inf, -scores if descending else scores)[candidates]
+        candidates = candidates[np.argsort(keys, kind="stable")]
+
+    latest = {identifier: evaluate(ast.Name(id=identifier)) for identifier in nodes}
+    results = [
+        ScreenMatch(
+            symbol=symbols[column],
+            score=None if scores is None or np.isnan(scores[column]) else float(scores[column]),
+            values={
+                identifier: None if np.isnan(values[column]) else float(values[column])
+                for identifier, values in latest.items()
+            },
+        )
+        for column in candidates[:limit].tolist()
+    ]
+    as_of = datetime.fromtimestamp(int(columns["timestamps"][-1]) / 1e9, tz=UTC)
+    return ScreenResponse(
+        as_of=as_of,
+        universe=len(symbols),
+        matched=len(candidates),
+        missing=missing or [],
+        stale=stale,
+        results=results,
+    )
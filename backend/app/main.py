@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -5,9 +7,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from app.api.routes import analysis, auth, backtest, data, fundamentals, health, macro, ml, risk, workspace
-from app.core.cache import redis_client
+from app.core.cache import redis_client, run_invalidation_listener
 from app.core.config import settings
 from app.core.db import Base, engine
+from app.core.http import close_http_client, open_http_client
+from app.data.fetchers.yahoo import shutdown_yahoo_executor
+from app.data.fred_catalog import run_catalog_ingest
+from app.data.registry import (
+    FLUSH_ERRORS,
+    ensure_registry_index,
+    ensure_registry_request_column,
+    ensure_registry_search_indexes,
+    registry_writer,
+)
+from app.data.warmer import run_cache_warmer
 
 
 @asynccontextmanager
@@ -15,9 +28,31 @@ async def lifespan(_: FastAPI):
     logger.info("Starting API service")
     async with engine.begin() as connection:
         await connection.run_sync(Base.metadata.create_all)
+        await ensure_registry_index(connection)
+        await ensure_registry_request_column(connection)
+        await ensure_registry_search_indexes(connection)
+    await open_http_client()
+    background = [asyncio.create_task(registry_writer.run())]
+    if settings.cache_stale_while_revalidate and settings.cache_warm_interval_seconds > 0:
+        background.append(asyncio.create_task(run_cache_warmer()))
+    if settings.fred_api_key and settings.fred_catalog_seed_queries:
+        background.append(asyncio.create_task(run_catalog_ingest()))
+    if settings.l1_cache_enabled:
+        background.append(asyncio.create_task(run_invalidation_listener()))
     yield
-    await redis_client.aclose()
-    await engine.dispose()
+    for task in background:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    try:
+        await registry_writer.flush()
+    except FLUSH_ERRORS:
+        logger.exception("Final registry flush failed, {} rows dropped", len(registry_writer))
+    finally:
+        await close_http_client()
+        shutdown_yahoo_executor()
+        await redis_client.aclose()
+        await engine.dispose()
     logger.info("API service stopped")
 
 
@@ -1,11 +1,14 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
 
+REGISTRY_UNIQUE_INDEX = "uq_data_registry_series"
+REGISTRY_PAGE_INDEX = "ix_data_registry_last_updated_id"
+
 
 class User(Base):
     __tablename__ = "users"
@@ -33,6 +36,10 @@ class WorkspaceLayout(Base):
 
 class DataRegistryEntry(Base):
     __tablename__ = "data_registry_entries"
+    __table_args__ = (
+        UniqueConstraint("ticker_or_series_id", "source", name=REGISTRY_UNIQUE_INDEX),
+        Index(REGISTRY_PAGE_INDEX, "last_updated", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     ticker_or_series_id: Mapped[str] = mapped_column(String(120), index=True)
@@ -40,5 +47,7 @@ class DataRegistryEntry(Base):
     frequency: Mapped[str] = mapped_column(String(40), index=True)
     unit: Mapped[str] = mapped_column(String(40))
     last_updated: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    # Last load a client asked for; background refreshes leave it alone so the cache warmer does not chase itself.
+    last_requested: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), index=True)
     latest_value: Mapped[float | None]
     metadata_json: Mapped[dict] = mapped_column(JSONB, default=dict)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -34,6 +34,18 @@ class UnifiedSeriesResponse(BaseModel):
     data: list[DataPoint]
 
 
+class BatchSeriesItem(BaseModel):
+    source: Literal["yahoo", "fred", "alpha-vantage"]
+    id: str = Field(min_length=1, max_length=120)
+    start: str | None = None
+    end: str | None = None
+
+
+class BatchSeriesRequest(BaseModel):
+    items: list[BatchSeriesItem] = Field(min_length=1, max_length=500)
+    format: Literal["json", "columnar"] = "json"
+
+
 class DataRegistryEntryResponse(BaseModel):
     ticker_or_series_id: str
     source: str
@@ -47,6 +59,7 @@ class DataRegistryEntryResponse(BaseModel):
 class DataRegistryListResponse(BaseModel):
     total: int
     items: list[DataRegistryEntryResponse]
+    next_cursor: str | None = None
 
 
 class FredSearchItem(BaseModel):
@@ -89,6 +102,32 @@ class TechnicalAnalysisResponse(BaseModel):
     indicators: list[IndicatorSeries]
 
 
+class ScreenRequest(BaseModel):
+    symbols: list[str] = Field(min_length=1, max_length=5000)
+    start: str
+    end: str
+    filter: str | None = Field(default=None, max_length=500, description="e.g. RSI_14 < 30 and close > SMA_200")
+    sort: str | None = Field(default=None, max_length=500, description="e.g. close / SMA_200 - 1")
+    descending: bool = True
+    limit: int = Field(default=50, ge=1, le=5000)
+
+
+class ScreenMatch(BaseModel):
+    symbol: str
+    score: float | None = None
+    values: dict[str, float | None]
+
+
+class ScreenResponse(BaseModel):
+    as_of: datetime | None
+    universe: int
+    matched: int
+    missing: list[str]
+    # Symbols whose last bar is older than ``as_of``; they are left out rather than screened on carried bars.
+    stale: list[str] = Field(default_factory=list)
+    results: list[ScreenMatch]
+
+
 class DcfStage(BaseModel):
     years: int = Field(ge=1)
     growth_rate: float = Field(description="Annual growth rate as decimal, e.g. 0.08")
@@ -210,6 +249,7 @@ class BacktestRequest(BaseModel):
     end: str
     initial_capital: float = Field(default=100000.0, gt=0)
     trade_size: int = Field(default=100, ge=1)
+    interval: str = Field(default="1d", description="1d, or an intraday bar size such as 1m, 5m or 1h")
     strategy: BacktestStrategyConfig = Field(default_factory=BacktestStrategyConfig)
 
 
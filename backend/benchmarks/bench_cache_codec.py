@@ -0,0 +1,69 @@
+"""Compare bytes stored and encode/decode time of the cache codecs against plain response JSON.
+
+Run from ``backend/``: ``python -m benchmarks.bench_cache_codec``.
+"""
+
+import time
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+from app.data.bars import OhlcvArrays
+from app.data.codec import BinaryCodec, JsonCodec, bars_to_frame, frame_to_bars, frame_to_series, series_to_frame
+from app.data.processors.normalize import normalize_yahoo_ohlcv
+from app.models.schemas import UnifiedSeriesResponse
+
+BARS = 10_000
+
+
+def _bars(count: int) -> OhlcvArrays:
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    index = pd.date_range("1985-01-01", periods=count, freq="B", tz="UTC")
+    volume = rng.integers(100_000, 1_000_000, count).astype(np.float64)
+    return OhlcvArrays.from_columns(index, open=close, high=close * 1.01, low=close * 0.99, close=close, volume=volume)
+
+
+def _best_of(func: Callable[[], object], repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _report(label: str, encode: Callable[[], bytes], decode: Callable[[bytes], object]) -> None:
+    payload = encode()
+    encode_ms = _best_of(encode) * 1000
+    decode_ms = _best_of(lambda: decode(payload)) * 1000
+    print(f"{label:<34} {len(payload):>10,} B  encode {encode_ms:7.2f} ms  decode {decode_ms:7.2f} ms")
+
+
+def main() -> None:
+    bars = _bars(BARS)
+    response = normalize_yahoo_ohlcv("BENCH", bars)
+    codecs = {"json columns": JsonCodec(), "binary": BinaryCodec(compress_min_bytes=None), "binary+zstd": BinaryCodec()}
+
+    print(f"bars={BARS}")
+    print("-- series response (cache hit returns UnifiedSeriesResponse)")
+    _report("response JSON (previous)", lambda: response.model_dump_json().encode(), UnifiedSeriesResponse.model_validate_json)
+    for name, codec in codecs.items():
+        _report(
+            name,
+            lambda codec=codec: codec.encode(series_to_frame(response)),
+            lambda payload, codec=codec: frame_to_series(codec.decode(payload)),
+        )
+
+    print("-- bar chunk (cache hit returns OhlcvArrays)")
+    for name, codec in codecs.items():
+        _report(
+            name,
+            lambda codec=codec: codec.encode(bars_to_frame(bars)),
+            lambda payload, codec=codec: frame_to_bars(codec.decode(payload)),
+        )
+
+
+if __name__ == "__main__":
+    main()
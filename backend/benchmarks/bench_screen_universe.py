@@ -0,0 +1,96 @@
+"""Time a warm S&P 500-sized screen: batched chunk reads, matrix alignment and one indicator pass.
+
+Run from ``backend/``: ``python -m benchmarks.bench_screen_universe``. Redis is replaced by an in-process
+dict so only decoding and compute are measured.
+"""
+
+import asyncio
+import time
+from typing import Self
+
+import numpy as np
+import pandas as pd
+
+from app.core import cache
+from app.core.singleflight import SingleFlight
+from app.data import bar_cache, series
+from app.data.bar_cache import BarChunkCache
+from app.data.bars import OhlcvArrays
+from app.engine.screener import run_screen
+
+SYMBOLS = [f"S{number:03d}" for number in range(500)]
+WINDOWS = {"1y": ("2024-01-01", "2025-01-01"), "3y": ("2022-01-01", "2025-01-01")}
+FILTER = "RSI_14 < 70 and close > SMA_200 or crossed_above(MACD, MACD_SIGNAL)"
+SORT = "close / SMA_200"
+
+
+class _Pipeline:
+    def __init__(self, values: dict[str, bytes]) -> None:
+        self.values = values
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.values[key] = value
+
+    def publish(self, channel: str, message: bytes) -> None:
+        return None
+
+    async def execute(self) -> None:
+        return None
+
+
+class _Redis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True) -> _Pipeline:
+        return _Pipeline(self.values)
+
+
+async def _fetch_daily_many(symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+    index = pd.bdate_range(start, end, inclusive="left", tz="UTC")
+    rng = np.random.default_rng(len(symbols))
+    bars = {}
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        volume = np.full(len(index), 1e6)
+        bars[symbol] = OhlcvArrays.from_columns(index, open=close, high=close * 1.01, low=close * 0.99, close=close, volume=volume)
+    return bars
+
+
+def _best_of(start: str, end: str, repeats: int = 3) -> tuple[float, float]:
+    loads, screens = [], []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        bars, missing = asyncio.run(series.load_universe_bars(SYMBOLS, start, end))
+        loaded = time.perf_counter()
+        run_screen(bars, FILTER, SORT, missing=missing)
+        loads.append(loaded - started)
+        screens.append(time.perf_counter() - loaded)
+    return min(loads), min(screens)
+
+
+def main() -> None:
+    cache.redis_client = _Redis()
+    series.bar_chunk_cache = BarChunkCache(closed_month_ttl=3600)
+    bar_cache.singleflight = SingleFlight(redis=None)
+    series.bar_provider.fetch_daily_many = _fetch_daily_many
+    print(f"symbols={len(SYMBOLS)}")
+    for label, (start, end) in WINDOWS.items():
+        asyncio.run(series.load_universe_bars(SYMBOLS, start, end))
+        load, screen = _best_of(start, end)
+        print(f"{label} warm load:  {load * 1000:8.1f} ms")
+        print(f"{label} screen:     {screen * 1000:8.1f} ms")
+        print(f"{label} total:      {(load + screen) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
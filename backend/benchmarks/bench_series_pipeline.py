@@ -0,0 +1,137 @@
+"""Compare the row-based series pipeline with the columnar one on a synthetic 10k-bar history.
+
+Run from ``backend/``: ``python -m benchmarks.bench_series_pipeline``.
+"""
+
+import time
+from collections.abc import Callable
+from datetime import UTC
+
+import numpy as np
+import pandas as pd
+
+from app.data.bars import OhlcvArrays
+from app.data.fetchers.yahoo import _history_to_bars
+from app.data.processors.normalize import normalize_yahoo_ohlcv
+from app.engine.indicators import compute_indicators
+from app.models.schemas import DataPoint, IndicatorPoint, OhlcvBar, UnifiedSeriesResponse
+
+BARS = 10_000
+INDICATORS = ["SMA_20", "EMA_20", "RSI_14", "MACD", "BBANDS_20"]
+
+
+def _history(bars: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    index = pd.date_range("1985-01-01", periods=bars, freq="B", tz="America/New_York", name="Date")
+    return pd.DataFrame(
+        {"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": rng.integers(1e5, 1e6, bars)},
+        index=index,
+    )
+
+
+def _legacy_fetch(history: pd.DataFrame) -> list[dict]:
+    history = history.reset_index()
+    rows: list[dict] = []
+    for _, row in history.iterrows():
+        rows.append(
+            {
+                "timestamp": row["Date"].to_pydatetime().astimezone(UTC),
+                "open": float(row["Open"]),
+                "high": float(row["High"]),
+                "low": float(row["Low"]),
+                "close": float(row["Close"]),
+                "volume": float(row["Volume"]),
+            }
+        )
+    return rows
+
+
+def _legacy_normalize(rows: list[dict]) -> UnifiedSeriesResponse:
+    points = [
+        DataPoint(timestamp=row["timestamp"], value=row["close"], metadata={k: v for k, v in row.items() if k != "close"})
+        for row in rows
+    ]
+    return UnifiedSeriesResponse(
+        ticker_or_series_id="BENCH",
+        source="Yahoo Finance",
+        frequency="daily",
+        unit="price",
+        last_updated=pd.Timestamp.now(tz=UTC).to_pydatetime(),
+        data=points,
+    )
+
+
+def _legacy_indicators(rows: list[dict]) -> tuple[list[OhlcvBar], list[list[IndicatorPoint]]]:
+    frame = pd.DataFrame(rows)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+    frame = frame.sort_values("timestamp").set_index("timestamp")
+    close = frame["close"]
+    delta = close.diff()
+    rsi = 100 - (100 / (1 + delta.clip(lower=0).rolling(14).mean() / (-delta.clip(upper=0)).rolling(14).mean()))
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    basis = close.rolling(20).mean()
+    std = close.rolling(20).std()
+    outputs = [
+        close.rolling(20).mean(),
+        close.ewm(span=20, adjust=False).mean(),
+        rsi,
+        macd,
+        signal,
+        macd - signal,
+        basis,
+        basis + 2 * std,
+        basis - 2 * std,
+    ]
+    series = [
+        [IndicatorPoint(timestamp=pd.Timestamp(ts).to_pydatetime(), value=float(value)) for ts, value in values.dropna().items()]
+        for values in outputs
+    ]
+    ohlcv = [
+        OhlcvBar(
+            timestamp=pd.Timestamp(index).to_pydatetime(),
+            open=float(item["open"]),
+            high=float(item["high"]),
+            low=float(item["low"]),
+            close=float(item["close"]),
+            volume=float(item["volume"]),
+        )
+        for index, item in frame.iterrows()
+    ]
+    return ohlcv, series
+
+
+def legacy_pipeline(history: pd.DataFrame) -> None:
+    rows = _legacy_fetch(history)
+    _legacy_normalize(rows).model_dump_json()
+    _legacy_indicators(rows)
+
+
+def columnar_pipeline(history: pd.DataFrame) -> None:
+    bars: OhlcvArrays = _history_to_bars(history)
+    normalize_yahoo_ohlcv("BENCH", bars).model_dump_json()
+    compute_indicators(bars, INDICATORS, symbol="BENCH")
+
+
+def _best_of(func: Callable[[pd.DataFrame], None], history: pd.DataFrame, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(history)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    history = _history(BARS)
+    legacy = _best_of(legacy_pipeline, history)
+    columnar = _best_of(columnar_pipeline, history)
+    print(f"bars={BARS}")
+    print(f"legacy row pipeline:  {legacy * 1000:8.1f} ms")
+    print(f"columnar pipeline:    {columnar * 1000:8.1f} ms")
+    print(f"speedup:              {legacy / columnar:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from typing import Self
+
+import pytest
+
+from app.core import cache
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.redis.values[key] = value
+
+    def publish(self, channel: str, message: bytes) -> None:
+        self.redis.published.append(message)
+
+    async def execute(self) -> None:
+        return None
+
+
+class FakeRedis:
+    """In-memory stand-in for the cache's Redis client: plain values, MGET sizes and published messages."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.published: list[bytes] = []
+        self.mgets: list[int] = []
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        self.mgets.append(len(keys))
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+    monkeypatch.setattr(cache, "redis_client", redis)
+    return redis
@@ -0,0 +1,98 @@
+import json
+from datetime import UTC, datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+from app.api import http_cache
+from app.api.arrow import ARROW_STREAM, backtest_table, risk_metrics_table
+from app.api.routes import data
+from app.data.bars import OhlcvArrays
+from app.data.processors.normalize import ohlcv_series_frame
+from app.engine.portfolio_risk import compute_risk_metrics_from_returns
+from app.main import app
+from app.models.schemas import BacktestResponse, EquityPoint, TearSheet
+
+
+def _bars(closes: list[float]) -> OhlcvArrays:
+    closes_array = np.asarray(closes, dtype=float)
+    return OhlcvArrays.from_columns(
+        pd.date_range("2024-01-01", periods=len(closes), freq="D", tz=UTC),
+        open=closes_array - 1,
+        high=closes_array + 1,
+        low=closes_array - 2,
+        close=closes_array,
+        volume=np.full(len(closes), 500.0),
+    )
+
+
+def test_yahoo_route_returns_arrow_stream_when_accepted(monkeypatch) -> None:
+    async def fake_get_series(source, series_id, start, end):
+        return ohlcv_series_frame(series_id, "Yahoo Finance", _bars([10.0, 11.0]))
+
+    async def no_cached_body(key, decode):
+        return None
+
+    async def skip_cache_set(key, payload, soft_ttl, value=None):
+        return None
+
+    monkeypatch.setattr(data, "get_series", fake_get_series)
+    monkeypatch.setattr(http_cache, "cache_get_decoded", no_cached_body)
+    monkeypatch.setattr(http_cache, "cache_set", skip_cache_set)
+    client = TestClient(app)
+    params = {"start": "2024-01-01", "end": "2024-01-03"}
+    arrow = client.get("/data/yahoo/SPY", params=params, headers={"Accept": ARROW_STREAM})
+    default = client.get("/data/yahoo/SPY", params=params)
+
+    assert arrow.headers["content-type"] == ARROW_STREAM
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.column_names == ["timestamp", "value", "open", "high", "low", "volume"]
+    assert table.column("value").to_pylist() == [10.0, 11.0]
+    assert table.column("timestamp").to_pylist()[1] == datetime(2024, 1, 2, tzinfo=UTC)
+    assert json.loads(table.schema.metadata[b"ticker_or_series_id"]) == "SPY"
+    assert default.json()["data"][0]["value"] == 10.0
+
+
+def test_risk_metrics_table_is_long_form_correlation_with_scalar_metadata() -> None:
+    returns = pd.DataFrame({"AAA": [0.01, -0.02, 0.015, 0.0], "BBB": [0.02, -0.01, 0.01, -0.005]})
+    result = compute_risk_metrics_from_returns(["aaa", "bbb"], returns, 0.95, 1, None)
+
+    table = risk_metrics_table(result)
+
+    assert table.num_rows == 4
+    assert table.column("row").to_pylist() == ["AAA", "AAA", "BBB", "BBB"]
+    assert json.loads(table.schema.metadata[b"historical_var"]) == result.historical_var
+    assert json.loads(table.schema.metadata[b"symbols"]) == ["AAA", "BBB"]
+
+
+def test_backtest_table_carries_equity_curve_and_trades() -> None:
+    curve = [
+        EquityPoint(timestamp=datetime(2024, 1, day, tzinfo=UTC), equity=100.0 + day) for day in range(1, 4)
+    ]
+    sheet = TearSheet(
+        total_return=0.03,
+        annualized_return=0.1,
+        annualized_volatility=0.2,
+        sharpe_ratio=0.5,
+        max_drawdown=0.0,
+        calmar_ratio=0.0,
+        win_rate=0.0,
+        trade_count=0,
+    )
+    result = BacktestResponse(
+        symbol="SPY",
+        strategy="sma_crossover",
+        initial_capital=100.0,
+        final_equity=103.0,
+        tear_sheet=sheet,
+        equity_curve=curve,
+        trades=[],
+    )
+
+    table = backtest_table(result)
+
+    assert table.column("equity").to_pylist() == [101.0, 102.0, 103.0]
+    assert json.loads(table.schema.metadata[b"trades"]) == []
+    assert json.loads(table.schema.metadata[b"tear_sheet"])["total_return"] == 0.03
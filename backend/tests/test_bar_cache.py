@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.core.singleflight import SingleFlight
+from app.data import bar_cache
+from app.data.bar_cache import BarChunkCache, months_between, rollup_periods
+from app.data.bars import OhlcvArrays
+
+
+def _daily_bars(start: str, end: str) -> OhlcvArrays:
+    index = pd.date_range(start, end, freq="D", inclusive="left", tz="UTC")
+    values = np.arange(len(index), dtype=np.float64)
+    return OhlcvArrays.from_columns(
+        index.as_unit("ns").asi8, open=values, high=values, low=values, close=values, volume=values
+    )
+
+
+def test_months_between_covers_partial_months() -> None:
+    assert months_between(date(2024, 1, 15), date(2024, 3, 1)) == [date(2024, 1, 1), date(2024, 2, 1)]
+    assert months_between(date(2024, 12, 31), date(2025, 1, 2)) == [date(2024, 12, 1), date(2025, 1, 1)]
+
+
+def test_overlapping_windows_only_load_uncovered_months(fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(bar_cache, "singleflight", SingleFlight(redis=None))
+    loads: list[tuple[str, str]] = []
+
+    async def load(start: str, end: str) -> OhlcvArrays:
+        loads.append((start, end))
+        return _daily_bars(start, end)
+
+    async def scenario() -> tuple[tuple[OhlcvArrays, bool], tuple[OhlcvArrays, bool], tuple[OhlcvArrays, bool]]:
+        chunks = BarChunkCache(closed_month_ttl=3600)
+        first = await chunks.get_range("yahoo", "spy", "2024-01-10", "2024-03-05", load, current_ttl=60)
+        panned = await chunks.get_range("yahoo", "SPY", "2024-01-11", "2024-03-06", load, current_ttl=60)
+        wider = await chunks.get_range("yahoo", "SPY", "2023-12-20", "2024-03-06", load, current_ttl=60)
+        return first, panned, wider
+
+    first, panned, wider = asyncio.run(scenario())
+
+    assert loads == [("2024-01-01", "2024-04-01"), ("2023-12-01", "2024-01-01")]
+    assert sorted(fake_redis.values) == [
+        "bars:yahoo:SPY:2023-12",
+        "bars:yahoo:SPY:2024-01",
+        "bars:yahoo:SPY:2024-02",
+        "bars:yahoo:SPY:2024-03",
+    ]
+    assert first[1] and not panned[1] and wider[1]
+    assert len(first[0]) == 55 and len(panned[0]) == 55 and len(wider[0]) == 77
+    assert pd.Timestamp(panned[0].timestamps[0], tz="UTC") == pd.Timestamp("2024-01-11", tz="UTC")
+    assert pd.Timestamp(panned[0].timestamps[-1], tz="UTC") == pd.Timestamp("2024-03-05", tz="UTC")
+
+
+def test_rollup_periods_are_closed_years_then_current_months() -> None:
+    periods = rollup_periods(date(2023, 6, 15), date(2025, 4, 1), today=date(2025, 3, 10))
+
+    assert periods == [
+        (date(2023, 1, 1), date(2024, 1, 1)),
+        (date(2024, 1, 1), date(2025, 1, 1)),
+        (date(2025, 1, 1), date(2025, 2, 1)),
+        (date(2025, 2, 1), date(2025, 3, 1)),
+        (date(2025, 3, 1), date(2025, 4, 1)),
+    ]
+
+
+def test_many_symbols_are_read_in_batches_and_loaded_together(fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(bar_cache, "singleflight", SingleFlight(redis=None))
+    monkeypatch.setattr(bar_cache.settings, "bar_chunk_mget_batch_size", 4)
+    monkeypatch.setattr(bar_cache.settings, "universe_fetch_batch_size", 2)
+    loads: list[tuple[list[str], str, str]] = []
+
+    async def load_many(symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        loads.append((symbols, start, end))
+        if "BAD" in symbols:
+            raise RuntimeError("upstream failed")
+        return {symbol: _daily_bars(start, end) for symbol in symbols}
+
+    async def scenario():
+        chunks = BarChunkCache(closed_month_ttl=3600)
+        first = await chunks.get_many("yahoo", ["AAA", "BBB", "CCC"], "2022-03-01", "2024-02-01", load_many, 60)
+        more = ["AAA", "BBB", "CCC", "DDD", "BAD"]
+        second = await chunks.get_many("yahoo", more, "2022-03-01", "2024-02-01", load_many, 60)
+        return first, second
+
+    (first, failed_first), (second, failed_second) = asyncio.run(scenario())
+
+    # Three closed years per symbol: 9 keys in 4-key round trips, then 15 keys.
+    assert fake_redis.mgets == [4, 4, 1, 4, 4, 4, 3]
+    assert loads == [
+        (["AAA", "BBB"], "2022-01-01", "2025-01-01"),
+        (["CCC"], "2022-01-01", "2025-01-01"),
+        (["DDD", "BAD"], "2022-01-01", "2025-01-01"),
+    ]
+    assert sorted(key for key in fake_redis.values if key.startswith("bars:yahoo:AAA")) == [
+        "bars:yahoo:AAA:2022",
+        "bars:yahoo:AAA:2023",
+        "bars:yahoo:AAA:2024",
+    ]
+    assert failed_first == [] and failed_second == ["DDD", "BAD"]
+    assert list(second) == ["AAA", "BBB", "CCC"]
+    for bars in (*first.values(), *second.values()):
+        assert len(bars) == 702
+        assert pd.Timestamp(bars.timestamps[0], tz="UTC") == pd.Timestamp("2022-03-01", tz="UTC")
+
+
+def test_concurrent_cold_screens_share_one_load(fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(bar_cache, "singleflight", SingleFlight(redis=None))
+    loads: list[list[str]] = []
+
+    async def load_many(symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        loads.append(symbols)
+        await asyncio.sleep(0.01)
+        return {symbol: _daily_bars(start, end) for symbol in symbols}
+
+    async def scenario():
+        chunks = BarChunkCache(closed_month_ttl=3600)
+        request = ("yahoo", ["AAA", "BBB"], "2022-03-01", "2024-02-01", load_many, 60)
+        return await asyncio.gather(chunks.get_many(*request), chunks.get_many(*request))
+
+    (first, _), (second, _) = asyncio.run(scenario())
+
+    assert loads == [["AAA", "BBB"]]
+    assert all(len(bars) == 702 for bars in (*first.values(), *second.values()))
@@ -0,0 +1,84 @@
+import asyncio
+import gc
+from datetime import UTC, date, datetime
+
+import pandas as pd
+import pytest
+
+from app.data.bars import OhlcvArrays
+from app.data.fred_store import FredSeriesStore
+from app.data.intraday import IntradayStore
+from app.data.series import upstream_error
+from app.data.store import BarStore, InvalidSymbolError, missing_ranges, storage_name
+
+
+def test_missing_ranges_returns_only_uncovered_gaps() -> None:
+    covered = [(date(2024, 1, 10), date(2024, 1, 20)), (date(2024, 2, 1), date(2024, 2, 10))]
+
+    gaps = missing_ranges(covered, date(2024, 1, 1), date(2024, 2, 5))
+
+    assert gaps == [(date(2024, 1, 1), date(2024, 1, 10)), (date(2024, 1, 20), date(2024, 2, 1))]
+    assert missing_ranges(covered, date(2024, 1, 12), date(2024, 1, 18)) == []
+
+
+def test_bar_store_fetches_only_missing_dates(tmp_path) -> None:
+    store = BarStore(tmp_path)
+    closes = [100.0 + day for day in range(26, 32)] + [200.0 + day for day in range(1, 11)]
+    history = OhlcvArrays.from_columns(
+        pd.date_range("2023-12-26", periods=len(closes), freq="D", tz=UTC),
+        open=closes,
+        high=closes,
+        low=closes,
+        close=closes,
+        volume=[1_000.0] * len(closes),
+    )
+    calls: list[tuple[str, str]] = []
+
+    async def fetch(start: str, end: str) -> OhlcvArrays:
+        calls.append((start, end))
+        return history.between(pd.Timestamp(start, tz=UTC).value, pd.Timestamp(end, tz=UTC).value)
+
+    first = asyncio.run(store.get_daily("yahoo", "spy", "2024-01-01", "2024-01-05", fetch))
+    second = asyncio.run(store.get_daily("yahoo", "SPY", "2023-12-28", "2024-01-08", fetch))
+
+    assert first.close.tolist() == [201.0, 202.0, 203.0, 204.0]
+    assert calls == [("2024-01-01", "2024-01-05"), ("2023-12-28", "2024-01-01"), ("2024-01-05", "2024-01-08")]
+    assert len(second) == 11
+    assert second.datetimes()[0] == datetime(2023, 12, 28, tzinfo=UTC)
+    assert sorted(path.name for path in (tmp_path / "yahoo" / "SPY").glob("*.parquet")) == ["2023.parquet", "2024.parquet"]
+
+
+def test_symbols_outside_the_store_layout_are_rejected(tmp_path) -> None:
+    assert [storage_name(symbol) for symbol in ("brk.b", "^GSPC", "EURUSD=X", "CPIAUCSL")] == [
+        "BRK.B",
+        "^GSPC",
+        "EURUSD=X",
+        "CPIAUCSL",
+    ]
+
+    async def fetch(*args) -> OhlcvArrays:
+        raise AssertionError("invalid symbols never reach upstream")
+
+    stores = [
+        lambda symbol: BarStore(tmp_path).get_daily("yahoo", symbol, "2024-01-01", "2024-01-05", fetch),
+        lambda symbol: IntradayStore(tmp_path).get_intraday("yahoo", symbol, 5, "2024-01-02", "2024-01-03", fetch),
+        lambda symbol: FredSeriesStore(tmp_path, 60, 30).get_observations(symbol, "2024-01-01", "2024-02-01", None),
+    ]
+    for read in stores:
+        for symbol in ("..", ".", "a/../b", "../etc", "SPY\\..", "", "X" * 33):
+            with pytest.raises(InvalidSymbolError) as caught:
+                asyncio.run(read(symbol))
+            assert upstream_error("Yahoo fetch", caught.value).status_code == 400
+    assert not any(tmp_path.iterdir())
+
+
+def test_symbol_locks_are_dropped_once_released(tmp_path) -> None:
+    store = BarStore(tmp_path)
+
+    async def hold() -> None:
+        async with store._lock("yahoo", "spy"):
+            assert store._lock("yahoo", "SPY") is store._lock("yahoo", "spy")
+
+    asyncio.run(hold())
+    gc.collect()
+    assert not store._locks
@@ -0,0 +1,65 @@
+from datetime import UTC, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.bars import OhlcvArrays
+from app.data.codec import (
+    BinaryCodec,
+    JsonCodec,
+    bars_to_frame,
+    decode_bars,
+    decode_series,
+    encode_bars,
+    encode_series,
+    frame_to_bars,
+)
+from app.data.processors.normalize import normalize_fred_series, normalize_yahoo_ohlcv
+from app.models.schemas import DataPoint, UnifiedSeriesResponse
+
+
+def _bars(count: int) -> OhlcvArrays:
+    index = pd.date_range("2020-01-01", periods=count, freq="D", tz="UTC")
+    close = np.linspace(100.0, 200.0, count)
+    return OhlcvArrays.from_columns(index, open=close, high=close + 1, low=close - 1, close=close, volume=close * 1000)
+
+
+@pytest.mark.parametrize("codec", [BinaryCodec(), BinaryCodec(compress_min_bytes=None), JsonCodec()])
+def test_codecs_round_trip_bar_columns(codec) -> None:
+    bars = _bars(500)
+    decoded = frame_to_bars(codec.decode(codec.encode(bars_to_frame(bars))))
+
+    for name in ("timestamps", "open", "high", "low", "close", "volume"):
+        np.testing.assert_array_equal(getattr(decoded, name), getattr(bars, name))
+
+
+def test_binary_frames_are_smaller_than_json() -> None:
+    frame = bars_to_frame(_bars(2_000))
+
+    assert len(BinaryCodec().encode(frame)) < len(BinaryCodec(compress_min_bytes=None).encode(frame))
+    assert len(BinaryCodec(compress_min_bytes=None).encode(frame)) < len(JsonCodec().encode(frame))
+    assert len(decode_bars(encode_bars(OhlcvArrays.empty()))) == 0
+
+
+def test_series_round_trip_keeps_ohlcv_metadata() -> None:
+    response = normalize_yahoo_ohlcv(symbol="SPY", bars=_bars(30))
+    decoded = decode_series(encode_series(response))
+
+    assert decoded == response
+    assert decoded.data[0].metadata["timestamp"] == decoded.data[0].timestamp
+
+
+def test_series_decoding_reads_plain_response_json() -> None:
+    response = normalize_fred_series("UNRATE", [{"date": "2024-01-01", "value": "3.7"}])
+    legacy = UnifiedSeriesResponse(
+        ticker_or_series_id="SPY",
+        source="Yahoo Finance",
+        frequency="daily",
+        unit="price",
+        last_updated=datetime(2024, 1, 1, tzinfo=UTC),
+        data=[DataPoint(timestamp=datetime(2024, 1, 2, tzinfo=UTC), value=1.0)],
+    )
+
+    assert decode_series(encode_series(response)) == response
+    assert decode_series(legacy.model_dump_json().encode()) == legacy
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from app.core import cache
+from app.core.cache import decode_entry, encode_entry, refresh_in_background
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    async def set(self, key: str, value: bytes, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+
+def test_entries_carry_a_soft_expiry() -> None:
+    fresh = decode_entry(encode_entry(b'{"a": 1}', soft_ttl=60))
+    stale = decode_entry(encode_entry(b"CF\x01\x00|binary", soft_ttl=-1))
+
+    assert fresh is not None and fresh.payload == b'{"a": 1}' and not fresh.is_stale
+    assert stale is not None and stale.payload == b"CF\x01\x00|binary"
+    assert stale.is_stale
+    assert fresh.soft_expires_at >= time.time() + 59
+
+
+def test_entries_without_soft_expiry_are_served_until_hard_expiry() -> None:
+    legacy = decode_entry(b'{"ticker_or_series_id": "SPY"}')
+
+    assert legacy is not None
+    assert legacy.payload == b'{"ticker_or_series_id": "SPY"}'
+    assert not legacy.is_stale
+    assert decode_entry(None) is None
+
+
+def test_background_refresh_runs_once_per_key(monkeypatch) -> None:
+    monkeypatch.setattr(cache, "redis_client", FakeRedis())
+    calls: list[str] = []
+
+    async def refresh() -> None:
+        calls.append("refresh")
+        await asyncio.sleep(0)
+
+    async def scenario() -> None:
+        for _ in range(5):
+            refresh_in_background("yahoo:SPY:2024-01-01:2024-02-01", refresh)
+        await asyncio.sleep(0.01)
+        refresh_in_background("yahoo:SPY:2024-01-01:2024-02-01", refresh)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert calls == ["refresh"]
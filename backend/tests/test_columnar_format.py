@@ -0,0 +1,66 @@
+from datetime import UTC
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.api import http_cache
+from app.api.routes import data
+from app.data.bars import OhlcvArrays
+from app.data.processors.normalize import fred_series_frame, ohlcv_series_frame
+from app.engine.indicators import technical_columns
+from app.main import app
+
+
+def _bars(closes: list[float]) -> OhlcvArrays:
+    closes_array = np.asarray(closes, dtype=float)
+    return OhlcvArrays.from_columns(
+        pd.date_range("2024-01-01", periods=len(closes), freq="D", tz=UTC),
+        open=closes_array - 1,
+        high=closes_array + 1,
+        low=closes_array - 2,
+        close=closes_array,
+        volume=np.full(len(closes), 500.0),
+    )
+
+
+def test_yahoo_route_returns_parallel_arrays_when_columnar(monkeypatch) -> None:
+    async def fake_get_series(source, series_id, start, end):
+        return ohlcv_series_frame(series_id, "Yahoo Finance", _bars([10.0, 11.0]))
+
+    async def no_cached_body(key, decode):
+        return None
+
+    async def skip_cache_set(key, payload, soft_ttl, value=None):
+        return None
+
+    monkeypatch.setattr(data, "get_series", fake_get_series)
+    monkeypatch.setattr(http_cache, "cache_get_decoded", no_cached_body)
+    monkeypatch.setattr(http_cache, "cache_set", skip_cache_set)
+    client = TestClient(app)
+    columnar = client.get("/data/yahoo/SPY", params={"start": "2024-01-01", "end": "2024-01-03", "format": "columnar"})
+    points = client.get("/data/yahoo/SPY", params={"start": "2024-01-01", "end": "2024-01-03"})
+
+    body = columnar.json()
+    assert body["timestamps"] == [1704067200000, 1704153600000]
+    assert body["values"] == [10.0, 11.0]
+    assert body["open"] == [9.0, 10.0] and body["high"] == [11.0, 12.0]
+    assert body["low"] == [8.0, 9.0] and body["volume"] == [500.0, 500.0]
+    assert "data" not in body
+    assert points.json()["data"][1]["metadata"]["open"] == 10.0
+
+
+def test_fred_columnar_frame_has_no_bar_fields() -> None:
+    frame = fred_series_frame("UNRATE", [{"date": "2024-01-01", "value": "3.7"}, {"date": "2024-02-01", "value": "."}])
+
+    assert frame.columns["value"].tolist() == [3.7]
+    assert set(frame.columns) == {"timestamp", "value"}
+
+
+def test_technical_columns_align_indicators_with_timestamps() -> None:
+    body = technical_columns(_bars([float(value) for value in range(1, 31)]), ["SMA_20", "MACD"], symbol="SPY")
+
+    assert len(body["timestamps"]) == len(body["close"]) == 30
+    assert list(body["indicators"]) == ["SMA_20", "MACD", "MACD_SIGNAL", "MACD_HIST"]
+    assert body["indicators"]["SMA_20"][:19] == [None] * 19
+    assert body["indicators"]["SMA_20"][19] == 10.5
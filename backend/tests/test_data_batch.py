@@ -0,0 +1,70 @@
+import asyncio
+import json
+from datetime import UTC, datetime
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.routes import data
+from app.core import cache
+from app.core.cache import encode_entry
+from app.data.codec import encode_series, series_to_frame
+from app.main import app
+from app.models.schemas import DataPoint, UnifiedSeriesResponse
+
+
+class FakeRedis:
+    def __init__(self, values: dict[str, bytes]) -> None:
+        self.values = values
+        self.mget_calls: list[list[str]] = []
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        self.mget_calls.append(keys)
+        return [self.values.get(key) for key in keys]
+
+
+def _series(series_id: str) -> UnifiedSeriesResponse:
+    return UnifiedSeriesResponse(
+        ticker_or_series_id=series_id,
+        source="Yahoo Finance",
+        frequency="daily",
+        unit="price",
+        last_updated=datetime(2024, 1, 1, tzinfo=UTC),
+        data=[DataPoint(timestamp=datetime(2024, 1, 2, tzinfo=UTC), value=1.0)],
+    )
+
+
+def test_batch_streams_cache_hits_then_fetched_series(monkeypatch) -> None:
+    redis = FakeRedis({"fred:CPIAUCSL:2024-01-01:2024-02-01": encode_entry(encode_series(_series("CPIAUCSL")), 60)})
+    loaded: list[str] = []
+
+    async def fake_load(source, series_id, start, end):
+        loaded.append(series_id)
+        await asyncio.sleep(0)
+        if series_id == "BAD":
+            raise HTTPException(status_code=502, detail="Yahoo fetch failed: boom")
+        return series_to_frame(_series(series_id))
+
+    monkeypatch.setattr(cache, "redis_client", redis)
+    monkeypatch.setattr(data, "load_series_coalesced", fake_load)
+
+    response = TestClient(app).post(
+        "/data/batch",
+        json={
+            "items": [
+                {"source": "fred", "id": "CPIAUCSL", "start": "2024-01-01", "end": "2024-02-01"},
+                {"source": "yahoo", "id": "QQQ", "start": "2024-01-01", "end": "2024-02-01"},
+                {"source": "yahoo", "id": "BAD", "start": "2024-01-01", "end": "2024-02-01"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["index"] == 0 and records[0]["series"]["ticker_or_series_id"] == "CPIAUCSL"
+    by_index = {record["index"]: record for record in records}
+    assert by_index[1]["series"]["ticker_or_series_id"] == "QQQ"
+    assert by_index[2] == {"index": 2, "status": 502, "error": "Yahoo fetch failed: boom"}
+    assert redis.mget_calls == [["fred:CPIAUCSL:2024-01-01:2024-02-01"]]
+    assert sorted(loaded) == ["BAD", "QQQ"]
@@ -0,0 +1,70 @@
+from datetime import UTC
+
+import numpy as np
+import pandas as pd
+
+from app.data.bars import OhlcvArrays
+from app.data.processors.downsample import downsample_bars, downsample_frame, lttb_indices
+from app.data.processors.normalize import fred_series_frame, ohlcv_series_frame
+from app.engine.indicators import compute_indicators, technical_columns
+
+
+def _bars(length: int) -> OhlcvArrays:
+    closes = 100 + np.sin(np.arange(length) / 10.0) * 10
+    return OhlcvArrays.from_columns(
+        pd.date_range("2000-01-01", periods=length, freq="D", tz=UTC),
+        open=closes - 0.5,
+        high=closes + 1,
+        low=closes - 1,
+        close=closes,
+        volume=np.arange(length, dtype=float),
+    )
+
+
+def test_lttb_keeps_endpoints_and_the_spike() -> None:
+    values = np.zeros(1000)
+    values[437] = 50.0
+
+    selected = lttb_indices(np.arange(1000), values, 20)
+
+    assert len(selected) == 20
+    assert selected[0] == 0 and selected[-1] == 999
+    assert 437 in selected
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_bars_merge_into_candles_preserving_extremes() -> None:
+    bars = _bars(1000)
+
+    candles = downsample_bars(bars, 100)
+
+    assert len(candles) == 100
+    assert candles.timestamps[0] == bars.timestamps[0]
+    assert candles.open[0] == bars.open[0] and candles.close[-1] == bars.close[-1]
+    assert candles.high.max() == bars.high.max() and candles.low.min() == bars.low.min()
+    assert candles.volume.sum() == bars.volume.sum()
+    assert downsample_bars(bars, 5000) is bars
+
+
+def test_frames_downsample_by_kind() -> None:
+    bar_frame = downsample_frame(ohlcv_series_frame("SPY", "Yahoo Finance", _bars(500)), 50)
+    observations = [{"date": str(day.date()), "value": str(index)} for index, day in enumerate(pd.date_range("2000-01-01", periods=300))]
+    line_frame = downsample_frame(fred_series_frame("GDP", observations), 30)
+
+    assert len(bar_frame.columns["timestamp"]) == 50
+    assert set(bar_frame.columns) == {"timestamp", "value", "metadata.open", "metadata.high", "metadata.low", "metadata.volume"}
+    assert len(line_frame.columns["value"]) == 30
+    assert line_frame.columns["value"][-1] == 299.0
+
+
+def test_technical_analysis_downsamples_bars_and_indicator_lines() -> None:
+    bars = _bars(2000)
+
+    response = compute_indicators(bars, ["SMA_20", "MACD"], symbol="SPY", max_points=200)
+    columns = technical_columns(bars, ["SMA_20"], symbol="SPY", max_points=200)
+
+    assert len(response.ohlcv) == 200
+    assert all(len(series.points) == 200 for series in response.indicators)
+    assert len(columns["timestamps"]) == len(columns["indicators"]["SMA_20"]) == 200
+    full = technical_columns(bars, ["SMA_20"], symbol="SPY")
+    assert columns["indicators"]["SMA_20"][-1] == full["indicators"]["SMA_20"][-1]
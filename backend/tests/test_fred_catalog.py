@@ -0,0 +1,113 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.api.routes import data
+from app.data import fred_catalog
+from app.data.fred_catalog import CatalogIndex, FredCatalog
+from app.main import app
+
+ROWS = [
+    {"id": "UNRATE", "title": "Unemployment Rate", "frequency": "Monthly", "units": "Percent", "popularity": 95},
+    {"id": "CPIAUCSL", "title": "Consumer Price Index for All Urban Consumers", "frequency": "Monthly", "units": "Index", "popularity": 93},
+    {"id": "DGS10", "title": "Market Yield on U.S. Treasury Securities at 10-Year Constant Maturity", "frequency": "Daily", "units": "Percent", "popularity": 90},
+    {"id": "UNRATENSA", "title": "Unemployment Rate (Not Seasonally Adjusted)", "frequency": "Monthly", "units": "Percent", "popularity": 60},
+]
+
+
+class FakeFredSearch:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.calls: list[dict] = []
+
+    async def search_series(self, query: str, limit: int = 20, offset: int = 0, order_by: str | None = None):
+        self.calls.append({"query": query, "offset": offset, "order_by": order_by})
+        return len(self.rows), self.rows[offset : offset + limit]
+
+
+def _catalog(tmp_path) -> FredCatalog:
+    catalog = FredCatalog(tmp_path / "catalog.parquet", refresh_interval_seconds=3600)
+    catalog.merge(ROWS)
+    return catalog
+
+
+def test_prefix_search_matches_every_word_and_ranks_ids_first(tmp_path) -> None:
+    catalog = _catalog(tmp_path)
+
+    total, rows = catalog.search("unemp rate")
+    assert total == 2 and [row["id"] for row in rows] == ["UNRATE", "UNRATENSA"]
+    assert catalog.search("unrate")[1][0]["id"] == "UNRATE"
+    assert [row["id"] for row in catalog.search("treasury 10")[1]] == ["DGS10"]
+
+
+def test_typos_fall_back_to_trigram_similarity(tmp_path) -> None:
+    catalog = _catalog(tmp_path)
+
+    total, rows = catalog.search("unemploymnet")
+
+    assert total >= 1 and rows[0]["id"] == "UNRATE"
+    assert catalog.search("zzzz") == (0, [])
+
+
+def test_ingest_pages_by_popularity_and_persists(tmp_path) -> None:
+    fetcher = FakeFredSearch(ROWS)
+    catalog = FredCatalog(tmp_path / "catalog.parquet", refresh_interval_seconds=3600)
+
+    ingested = asyncio.run(catalog.ingest(fetcher, ["rate", "index"], pages_per_query=3, page_size=3))
+    reloaded = FredCatalog(tmp_path / "catalog.parquet", refresh_interval_seconds=3600)
+    reloaded.load()
+
+    assert ingested == 8
+    assert [call["offset"] for call in fetcher.calls] == [0, 3, 0, 3]
+    assert all(call["order_by"] == "popularity" for call in fetcher.calls)
+    assert len(reloaded) == 4 and not reloaded.is_due()
+
+
+
+def test_search_misses_do_not_postpone_the_next_ingest(tmp_path) -> None:
+    catalog = FredCatalog(tmp_path / "catalog.parquet", refresh_interval_seconds=3600)
+    asyncio.run(catalog.ingest(FakeFredSearch(ROWS), ["rate"], pages_per_query=1))
+    catalog._record_ingest(0.0)
+
+    asyncio.run(catalog.add([{"id": "GDPC1", "title": "Real Gross Domestic Product", "popularity": 88}]))
+
+    assert catalog.is_due()
+
+
+def test_queued_search_rows_are_merged_in_one_rebuild(tmp_path, monkeypatch) -> None:
+    catalog = _catalog(tmp_path)
+    catalog._loaded = True
+    builds: list[int] = []
+    original = CatalogIndex.build
+
+    def build(frame):
+        builds.append(len(frame))
+        return original(frame)
+
+    monkeypatch.setattr(fred_catalog.CatalogIndex, "build", build)
+    misses = [[{"id": f"SERIES{number}", "title": f"Series {number}", "popularity": number}] for number in range(4)]
+
+    async def scenario() -> None:
+        await asyncio.gather(*(catalog.add(rows) for rows in misses))
+
+    asyncio.run(scenario())
+
+    # The first miss rebuilds alone; the three queued behind it share one rebuild.
+    assert builds == [5, 8]
+    assert catalog.search("series3")[1][0]["id"] == "SERIES3"
+
+def test_search_route_only_asks_fred_on_a_local_miss(tmp_path, monkeypatch) -> None:
+    catalog = _catalog(tmp_path)
+    catalog._loaded = True
+    upstream = FakeFredSearch([{"id": "GDPC1", "title": "Real Gross Domestic Product", "popularity": 88}])
+    monkeypatch.setattr(data, "fred_catalog", catalog)
+    monkeypatch.setattr(data, "FredFetcher", lambda: upstream)
+
+    client = TestClient(app)
+    local = client.get("/data/fred/search", params={"q": "consumer price"}).json()
+    miss = client.get("/data/fred/search", params={"q": "real gross"}).json()
+    again = client.get("/data/fred/search", params={"q": "real gross"}).json()
+
+    assert local["items"][0]["series_id"] == "CPIAUCSL"
+    assert miss["items"][0]["series_id"] == again["items"][0]["series_id"] == "GDPC1"
+    assert len(upstream.calls) == 1
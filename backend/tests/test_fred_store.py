@@ -0,0 +1,96 @@
+import asyncio
+from datetime import date
+
+import httpx
+import pandas as pd
+
+from app.core.scheduler import UpstreamQuotaError
+from app.data import fred_store
+from app.data.fred_store import FredSeriesStore
+
+
+class FakeFredFetcher:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+        self.vintage = "2024-03-01"
+        self.values = {"2024-01-01": "3.7", "2024-02-01": "3.9", "2024-03-01": "."}
+
+    async def fetch_series(self, series_id: str, start: str | None = None, end: str | None = None) -> list[dict]:
+        self.calls.append(("observations", start))
+        return [
+            {"date": day, "value": value, "realtime_start": self.vintage, "realtime_end": self.vintage}
+            for day, value in self.values.items()
+            if start is None or day >= start
+        ]
+
+    async def fetch_vintage_dates(self, series_id: str, since: str) -> list[str]:
+        self.calls.append(("vintages", since))
+        return [vintage for vintage in ["2024-02-01", self.vintage] if vintage >= since]
+
+
+def test_series_is_downloaded_once_and_refreshed_only_on_new_vintages(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(fred_store, "fred_today", lambda: date(2024, 3, 2))
+    fetcher = FakeFredFetcher()
+    store = FredSeriesStore(tmp_path, refresh_interval_seconds=3600, revision_lookback_days=40)
+
+    async def read() -> pd.DataFrame:
+        return await store.get_observations("UNRATE", "2024-01-01", "2024-12-31", fetcher)
+
+    first = asyncio.run(read())
+    asyncio.run(read())
+    assert fetcher.calls == [("observations", None)]
+    assert first["value"].tolist()[:2] == [3.7, 3.9] and pd.isna(first["value"].iloc[2])
+    assert first["realtime_start"].tolist() == ["2024-03-01"] * 3
+
+    store.refresh_interval_seconds = 0
+    asyncio.run(read())
+    assert fetcher.calls[1:] == [("vintages", "2024-03-01")]
+
+    monkeypatch.setattr(fred_store, "fred_today", lambda: date(2024, 4, 5))
+    fetcher.vintage = "2024-04-05"
+    fetcher.values = {**fetcher.values, "2024-02-01": "4.0", "2024-03-01": "4.1", "2024-04-01": "4.2"}
+    refreshed = asyncio.run(read())
+
+    assert fetcher.calls[2:] == [("vintages", "2024-03-01"), ("observations", "2024-01-21")]
+    assert refreshed["value"].tolist() == [3.7, 4.0, 4.1, 4.2]
+    assert refreshed["realtime_start"].tolist() == ["2024-03-01", "2024-04-05", "2024-04-05", "2024-04-05"]
+    assert store.manifest("UNRATE")["included_vintage"] == "2024-04-05"
+
+
+def test_release_on_the_day_of_a_fetch_is_picked_up(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(fred_store, "fred_today", lambda: date(2024, 4, 5))
+    fetcher = FakeFredFetcher()
+    store = FredSeriesStore(tmp_path, refresh_interval_seconds=0, revision_lookback_days=40)
+
+    async def read() -> pd.DataFrame:
+        return await store.get_observations("CPIAUCSL", "2024-01-01", "2024-12-31", fetcher)
+
+    # Downloaded in the morning, before the day's release.
+    asyncio.run(read())
+    asyncio.run(read())
+    assert fetcher.calls == [("observations", None), ("vintages", "2024-04-04")]
+
+    fetcher.vintage = "2024-04-05"
+    fetcher.values = {**fetcher.values, "2024-03-01": "4.1"}
+    released = asyncio.run(read())
+    asyncio.run(read())
+
+    assert released["value"].tolist() == [3.7, 3.9, 4.1]
+    assert fetcher.calls[2:] == [("vintages", "2024-04-04"), ("observations", "2024-01-21"), ("vintages", "2024-04-05")]
+
+
+def test_failed_refresh_serves_the_stored_copy(tmp_path, monkeypatch) -> None:
+    fetcher = FakeFredFetcher()
+    store = FredSeriesStore(tmp_path, refresh_interval_seconds=0, revision_lookback_days=40)
+    asyncio.run(store.get_observations("UNRATE", "2024-01-01", "2024-12-31", fetcher))
+    checked_at = store.manifest("UNRATE")["checked_at"]
+
+    for error in (UpstreamQuotaError("fred", 30), httpx.ConnectTimeout("timed out")):
+
+        async def failing(series_id: str, since: str, error=error) -> list[str]:
+            raise error
+
+        monkeypatch.setattr(fetcher, "fetch_vintage_dates", failing)
+        served = asyncio.run(store.get_observations("UNRATE", "2024-01-01", "2024-12-31", fetcher))
+        assert served["value"].tolist()[:2] == [3.7, 3.9]
+        assert store.manifest("UNRATE")["checked_at"] == checked_at
@@ -0,0 +1,118 @@
+import gzip
+from datetime import UTC
+
+import brotli
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.api import http_cache
+from app.api.routes import data
+from app.core.cache import CacheEntry
+from app.data.bars import OhlcvArrays
+from app.data.codec import decode_series_frame, encode_frame, frame_digest
+from app.data.processors.normalize import ohlcv_series_frame
+from app.main import app
+
+
+class FakeBodyCache:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.sets = 0
+
+    async def get(self, key, decode):
+        return CacheEntry(payload=decode(self.values[key]), soft_expires_at=float("inf")) if key in self.values else None
+
+    async def set(self, key, payload, soft_ttl, value=None):
+        self.sets += 1
+        self.values[key] = payload
+
+
+def _frame(length: int):
+    closes = np.linspace(100.0, 200.0, length)
+    bars = OhlcvArrays.from_columns(
+        pd.date_range("2000-01-01", periods=length, freq="D", tz=UTC),
+        open=closes - 1,
+        high=closes + 1,
+        low=closes - 2,
+        close=closes,
+        volume=np.full(length, 1000.0),
+    )
+    return ohlcv_series_frame("SPY", "Yahoo Finance", bars)
+
+
+def _client(monkeypatch, body_cache: FakeBodyCache, frame) -> TestClient:
+    async def fake_get_series(source, series_id, start, end):
+        return frame
+
+    monkeypatch.setattr(data, "get_series", fake_get_series)
+    monkeypatch.setattr(http_cache, "cache_get_decoded", body_cache.get)
+    monkeypatch.setattr(http_cache, "cache_set", body_cache.set)
+    monkeypatch.setattr(data, "cache_get_decoded", body_cache.get)
+    monkeypatch.setattr(data, "cache_set", body_cache.set)
+    return TestClient(app)
+
+
+def test_digest_ignores_last_updated_and_survives_the_cache_codec() -> None:
+    first, second = _frame(50), _frame(50)
+    second.header["last_updated"] = "2030-01-01T00:00:00+00:00"
+
+    assert frame_digest(first) == frame_digest(second)
+    assert frame_digest(first) != frame_digest(_frame(51))
+    assert decode_series_frame(encode_frame(first)).header["digest"] == frame_digest(first)
+
+
+def test_matching_if_none_match_returns_304(monkeypatch) -> None:
+    client = _client(monkeypatch, FakeBodyCache(), _frame(3))
+    params = {"start": "2000-01-01", "end": "2000-01-04"}
+    first = client.get("/data/yahoo/SPY", params=params)
+    repeat = client.get("/data/yahoo/SPY", params=params, headers={"If-None-Match": first.headers["etag"]})
+    columnar = client.get(
+        "/data/yahoo/SPY", params={**params, "format": "columnar"}, headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert first.status_code == 200 and first.headers["etag"].startswith('W/"')
+    assert repeat.status_code == 304 and repeat.content == b""
+    assert columnar.status_code == 200 and columnar.headers["etag"] != first.headers["etag"]
+
+
+def test_compressed_bodies_are_stored_once_per_encoding(monkeypatch) -> None:
+    body_cache = FakeBodyCache()
+    client = _client(monkeypatch, body_cache, _frame(500))
+    params = {"start": "2000-01-01", "end": "2001-06-01"}
+    responses = [client.get("/data/yahoo/SPY", params=params, headers={"Accept-Encoding": "br"}) for _ in range(3)]
+    gzipped = client.get("/data/yahoo/SPY", params=params, headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/data/yahoo/SPY", params=params, headers={"Accept-Encoding": "identity"})
+
+    assert all(response.headers["content-encoding"] == "br" for response in responses)
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert body_cache.sets == 2
+    (br_key,) = [key for key in body_cache.values if key.endswith(":br")]
+    (gzip_key,) = [key for key in body_cache.values if key.endswith(":gzip")]
+    assert brotli.decompress(body_cache.values[br_key]) == gzip.decompress(body_cache.values[gzip_key]) == plain.content
+    assert responses[0].json()["data"][0]["value"] == 100.0
+
+
+def test_downsampled_frames_are_cached_per_resolution(monkeypatch) -> None:
+    body_cache = FakeBodyCache()
+    client = _client(monkeypatch, body_cache, _frame(500))
+    reductions: list[int] = []
+    downsample_frame = data.downsample_frame
+
+    def counting_downsample(frame, max_points):
+        reductions.append(max_points)
+        return downsample_frame(frame, max_points)
+
+    monkeypatch.setattr(data, "downsample_frame", counting_downsample)
+    params = {"start": "2000-01-01", "end": "2001-06-01", "max_points": 20}
+    # Small, uncompressed bodies never reach the body cache; the reduced frame is still computed once.
+    identity = {"Accept-Encoding": "identity"}
+    plain = [client.get("/data/yahoo/SPY", params=params, headers=identity) for _ in range(2)]
+    columnar = client.get("/data/yahoo/SPY", params={**params, "format": "columnar"}, headers=identity)
+    finer = client.get("/data/yahoo/SPY", params={**params, "max_points": 50}, headers=identity)
+
+    assert reductions == [20, 50]
+    assert plain[0].content == plain[1].content and len(plain[0].json()["data"]) == 20
+    assert len(columnar.json()["timestamps"]) == 20 and len(finer.json()["data"]) == 50
+    assert sorted(key.rsplit(":", 1)[1] for key in body_cache.values if key.startswith("downsampled:")) == ["20", "50"]
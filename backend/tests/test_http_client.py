@@ -0,0 +1,30 @@
+import asyncio
+
+from app.core.http import UPSTREAM_HOSTS, close_http_client, get_http_client, open_http_client
+from app.data.fetchers.alpha_vantage import AlphaVantageFetcher
+from app.data.fetchers.fred import FredFetcher
+
+
+def test_fetchers_share_the_pooled_client() -> None:
+    async def scenario() -> None:
+        client = await open_http_client()
+        assert FredFetcher().client is client
+        assert AlphaVantageFetcher().client is client
+        assert get_http_client() is client
+        for host in UPSTREAM_HOSTS:
+            assert client._transport_for_url(client.build_request("GET", f"{host}/x").url) is not client._transport
+        await close_http_client()
+        assert client.is_closed
+
+    asyncio.run(scenario())
+
+
+def test_market_data_mode_transport_is_installed_by_the_data_layer(monkeypatch) -> None:
+    from app.core import http
+    from app.data import providers
+
+    assert http._upstream_transport is providers.upstream_transport
+    monkeypatch.setattr(providers.settings, "market_data_mode", "synthetic")
+    client = http.create_http_client()
+    url = client.build_request("GET", f"{UPSTREAM_HOSTS[0]}/x").url
+    assert isinstance(client._transport_for_url(url), providers.SyntheticTransport)
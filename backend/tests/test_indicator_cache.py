@@ -0,0 +1,81 @@
+import asyncio
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import http_cache, indicator_cache
+from app.api.routes import analysis
+from app.core.cache import CacheEntry
+from app.data.synthetic import synthetic_bars
+from app.engine.indicator_registry import plan_indicators
+from app.engine.indicators import technical_columns
+from app.main import app
+
+
+class FakeCache:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+
+    async def mget(self, keys, decode):
+        return [CacheEntry(decode(self.values[key]), float("inf")) if key in self.values else None for key in keys]
+
+    async def set_many(self, items, values=None):
+        self.values.update((key, payload) for key, payload, _ in items)
+
+    async def get(self, key, decode):
+        return None
+
+    async def set(self, key, payload, soft_ttl, value=None):
+        pass
+
+
+def _patch(monkeypatch) -> tuple[FakeCache, list[list[str]]]:
+    cache, planned = FakeCache(), []
+
+    def recording_plan(requests):
+        planned.append(list(requests))
+        return plan_indicators(requests)
+
+    monkeypatch.setattr(indicator_cache, "cache_mget_decoded", cache.mget)
+    monkeypatch.setattr(indicator_cache, "cache_set_many", cache.set_many)
+    monkeypatch.setattr(indicator_cache, "plan_indicators", recording_plan)
+    return cache, planned
+
+
+def test_only_missing_indicators_are_computed(monkeypatch) -> None:
+    cache, planned = _patch(monkeypatch)
+    bars = synthetic_bars("SPY", "2018-01-01", "2020-01-01")
+
+    async def outputs(requests: list[str]) -> list[tuple[str, np.ndarray]]:
+        return await indicator_cache.cached_indicator_outputs("SPY", "1d", "abc", bars, plan_indicators(requests))
+
+    asyncio.run(outputs(["SMA_20", "EMA_20"]))
+    combined = asyncio.run(outputs(["sma_20", "MACD", "RSI_14"]))
+
+    assert planned == [["SMA_20", "EMA_20"], ["MACD", "RSI_14"]]
+    assert len(cache.values) == 4
+    assert [name for name, _ in combined] == ["SMA_20", "MACD", "MACD_SIGNAL", "MACD_HIST", "RSI_14"]
+    expected = dict(plan_indicators(["SMA_20", "MACD", "RSI_14"]).evaluate(bars))
+    for name, values in combined:
+        np.testing.assert_array_equal(values, expected[name])
+
+
+def test_technical_route_assembles_cached_parts(monkeypatch) -> None:
+    cache, planned = _patch(monkeypatch)
+    bars = synthetic_bars("SPY", "2018-01-01", "2020-01-01")
+
+    async def fake_load_bars(source, symbol, start, end):
+        return bars, None
+
+    monkeypatch.setattr(analysis, "load_bars", fake_load_bars)
+    monkeypatch.setattr(http_cache, "cache_get_decoded", cache.get)
+    monkeypatch.setattr(http_cache, "cache_set", cache.set)
+    client = TestClient(app)
+    params = {"start": "2018-01-01", "end": "2020-01-01", "format": "columnar"}
+
+    client.get("/analysis/technical/SPY", params={**params, "indicators": "SMA_20,EMA_20"})
+    body = client.get("/analysis/technical/SPY", params={**params, "indicators": "EMA_20,BBANDS_20"}).json()
+
+    assert planned == [["SMA_20", "EMA_20"], ["BBANDS_20_2"]]
+    assert body["indicators"] == technical_columns(bars, ["EMA_20", "BBANDS_20"], "SPY")["indicators"]
+    assert client.get("/analysis/technical/SPY", params={**params, "indicators": "SMA_0"}).status_code == 400
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.bars import OhlcvArrays
+from app.data.synthetic import synthetic_bars, synthetic_intraday_bars
+from app.engine.indicator_registry import parse_indicator, plan_indicators
+
+
+def test_plan_outputs_match_pandas() -> None:
+    bars = synthetic_bars("SPY", "2015-01-01", "2020-01-01")
+    close = pd.Series(bars.close)
+    delta = close.diff()
+    rs = delta.clip(lower=0).rolling(7).mean() / (-delta.clip(upper=0)).rolling(7).mean()
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    expected = {
+        "SMA_50": close.rolling(50).mean(),
+        "EMA_200": close.ewm(span=200, adjust=False).mean(),
+        "RSI_7": 100 - 100 / (1 + rs),
+        "MACD_SIGNAL": macd.ewm(span=9, adjust=False).mean(),
+        "BBANDS_LOWER": close.rolling(20).mean() - 2 * close.rolling(20).std(),
+    }
+
+    outputs = dict(plan_indicators(["SMA_50", "EMA_200", "RSI_7", "MACD", "BBANDS_20"]).evaluate(bars))
+
+    for name, values in expected.items():
+        np.testing.assert_allclose(outputs[name], values.to_numpy(), rtol=1e-9, err_msg=name)
+    assert list(outputs)[3:] == ["MACD", "MACD_SIGNAL", "MACD_HIST", "BBANDS_MID", "BBANDS_UPPER", "BBANDS_LOWER"]
+
+
+
+def test_bands_collapse_on_a_flat_window_at_a_high_price() -> None:
+    rng = np.random.default_rng(7)
+    close = np.r_[25_000 * np.exp(np.cumsum(rng.normal(0, 0.01, 2_000))), np.full(20, 25_123.25)]
+    index = pd.date_range("2015-01-01", periods=len(close), freq="D", tz="UTC")
+    bars = OhlcvArrays.from_columns(index, open=close, high=close, low=close, close=close, volume=np.ones(len(close)))
+
+    outputs = dict(plan_indicators(["BBANDS_20"]).evaluate(bars))
+
+    # The spread is exactly zero; the mid line is only as close as its running-sum mean.
+    assert outputs["BBANDS_UPPER"][-1] == outputs["BBANDS_MID"][-1] == outputs["BBANDS_LOWER"][-1]
+    assert outputs["BBANDS_MID"][-1] == pytest.approx(25_123.25, rel=1e-12)
+    series = pd.Series(close)
+    expected = (series.rolling(20).mean() + 2 * series.rolling(20).std()).to_numpy()
+    np.testing.assert_allclose(outputs["BBANDS_UPPER"], expected, rtol=1e-9)
+
+def test_shared_intermediates_are_planned_once() -> None:
+    plan = plan_indicators(["SMA_20", "BBANDS_20", "EMA_12", "MACD", "RSI_14", "RSI_7", "SMA_20"])
+    operations = [key[0] for key in plan.steps]
+
+    assert operations.count("diff") == 1
+    assert operations.count("ewm") == 3  # EMA 12 shared by EMA_12 and MACD, EMA 26 and the signal line
+    assert sum(1 for key in plan.steps if key[:2] == ("rolling_mean", 20)) == 1
+    assert [name for name, _ in plan.outputs].count("SMA_20") == 1
+
+
+def test_parameters_are_parsed_with_defaults_and_validated() -> None:
+    assert parse_indicator("sma") == ("SMA", "SMA_20", (20,))
+    assert parse_indicator("BBANDS_50_2.5") == ("BBANDS", "BBANDS_50_2.5", (50, 2.5))
+    assert parse_indicator("MACD_12_26_9")[1] == "MACD"
+    assert parse_indicator("MACD_5_35")[1] == "MACD_5_35_9"
+    for invalid in ("SMA_0", "SMA_2.5", "SMA_X", "RSI_14_3", "FOO_10", "BBANDS_1"):
+        with pytest.raises(ValueError):
+            plan_indicators([invalid])
+
+
+def test_atr_and_session_vwap() -> None:
+    bars = synthetic_intraday_bars("SPY", "2024-03-04", "2024-03-06", 5)
+    outputs = dict(plan_indicators(["ATR_14", "VWAP"]).evaluate(bars))
+
+    prior = np.r_[np.nan, bars.close[:-1]]
+    ranges = np.fmax(bars.high - bars.low, np.fmax(np.abs(bars.high - prior), np.abs(bars.low - prior)))
+    atr = pd.Series(ranges).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean().to_numpy()
+    np.testing.assert_allclose(outputs["ATR_14"], atr)
+    typical = (bars.high + bars.low + bars.close) / 3
+    # The second session starts over from its own first bar.
+    assert outputs["VWAP"][78] == pytest.approx(typical[78])
+    assert outputs["VWAP"][100] == pytest.approx(np.average(typical[78:101], weights=bars.volume[78:101]))
@@ -0,0 +1,111 @@
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.api.routes import analysis
+from app.core.cache import CacheEntry
+from app.data.synthetic import synthetic_bars, synthetic_intraday_bars
+from app.engine.indicator_registry import plan_indicators
+from app.engine.indicator_stream import IndicatorStream
+from app.main import app
+
+INDICATORS = ["SMA_20", "EMA_20", "RSI_14", "MACD", "BBANDS_20", "ATR_14", "VWAP"]
+
+
+class FakeStateCache:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.sets = 0
+
+    async def get(self, key, decode):
+        return CacheEntry(payload=decode(self.values[key]), soft_expires_at=float("inf")) if key in self.values else None
+
+    async def set(self, key, payload, soft_ttl, value=None):
+        self.sets += 1
+        self.values[key] = payload
+
+
+def test_streamed_bars_match_a_full_recompute() -> None:
+    daily = synthetic_bars("SPY", "2010-01-01", "2020-01-01")
+    for bars in (daily, synthetic_intraday_bars("SPY", "2024-03-04", "2024-03-08", 5)):
+        plan = plan_indicators(INDICATORS)
+        cut = len(bars) - 150
+        stream, _ = IndicatorStream.seed(plan, bars, cut)
+        # Advance a checkpoint round-tripped through JSON, as the route does.
+        stream = IndicatorStream.from_dict(plan, json.loads(json.dumps(stream.to_dict())))
+        rows = [stream.step(bars, index) for index in range(cut, len(bars))]
+
+        expected = plan.evaluate_nodes(bars)
+        for name, node in plan.outputs:
+            streamed = np.array([row[node] for row in rows])
+            np.testing.assert_allclose(streamed, expected[node][cut:], rtol=1e-10, atol=1e-10, err_msg=name)
+        assert stream.resumes(bars) and stream.count == len(bars)
+
+
+def test_updates_route_folds_in_only_new_bars(monkeypatch) -> None:
+    history = synthetic_bars("SPY", "2015-01-01", "2020-01-01")
+    state = FakeStateCache()
+    served = {"bars": history.take(slice(0, len(history) - 5))}
+    seeds: list[int] = []
+    seed = IndicatorStream.seed
+
+    def counting_seed(plan, bars, upto):
+        seeds.append(upto)
+        return seed(plan, bars, upto)
+
+    async def fake_load_bars(source, symbol, start, end):
+        return served["bars"], None
+
+    monkeypatch.setattr(analysis, "load_bars", fake_load_bars)
+    monkeypatch.setattr(analysis, "cache_get_decoded", state.get)
+    monkeypatch.setattr(analysis, "cache_set", state.set)
+    monkeypatch.setattr(analysis.IndicatorStream, "seed", counting_seed)
+    client = TestClient(app)
+    params = {"start": "2015-01-01", "end": "2020-01-01", "indicators": "RSI_14,MACD"}
+
+    first = client.get("/analysis/technical/SPY/updates", params={**params, "since": "2019-12-01"}).json()
+    served["bars"] = history
+    since = str(history.index()[-6])
+    second = client.get("/analysis/technical/SPY/updates", params={**params, "since": since}).json()
+    checkpoint = json.loads(next(iter(state.values.values())))
+
+    full = analysis.technical_columns(history, ["RSI_14", "MACD"], "SPY")
+    assert second["timestamps"] == full["timestamps"][-6:]
+    for name in ("RSI_14", "MACD", "MACD_SIGNAL", "MACD_HIST"):
+        np.testing.assert_allclose(second["indicators"][name], full["indicators"][name][-6:], rtol=1e-10)
+    assert first["timestamps"][-1] == full["timestamps"][-6]
+    assert seeds == [len(history) - 6]
+    assert state.sets == 2
+    assert checkpoint["count"] == len(history) - 1
+    assert client.get("/analysis/technical/SPY/updates", params={**params, "since": "nope"}).status_code == 400
+
+
+def test_updates_route_keeps_one_checkpoint_per_window_end(monkeypatch) -> None:
+    history = synthetic_bars("SPY", "2015-01-01", "2020-01-01")
+    state = FakeStateCache()
+    seeds: list[int] = []
+    seed = IndicatorStream.seed
+
+    def counting_seed(plan, bars, upto):
+        seeds.append(upto)
+        return seed(plan, bars, upto)
+
+    async def fake_load_bars(source, symbol, start, end):
+        return history.take(slice(0, int(np.searchsorted(history.timestamps, pd.Timestamp(end, tz="UTC").value)))), None
+
+    monkeypatch.setattr(analysis, "load_bars", fake_load_bars)
+    monkeypatch.setattr(analysis, "cache_get_decoded", state.get)
+    monkeypatch.setattr(analysis, "cache_set", state.set)
+    monkeypatch.setattr(analysis.IndicatorStream, "seed", counting_seed)
+    client = TestClient(app)
+    params = {"start": "2015-01-01", "indicators": "RSI_14"}
+
+    for _ in range(2):
+        for end in ("2019-01-01", "2020-01-01"):
+            response = client.get("/analysis/technical/SPY/updates", params={**params, "end": end, "since": end})
+            assert response.status_code == 200
+
+    assert len(seeds) == 2
+    assert len(state.values) == 2
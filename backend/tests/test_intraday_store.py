@@ -0,0 +1,128 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.bars import OhlcvArrays
+from app.data.intraday import IntradayStore, interval_minutes, native_interval, resample_bars
+from app.data.synthetic import synthetic_intraday_bars
+from app.engine.backtester.runner import run_backtest
+from app.engine.indicators import technical_columns
+from app.models.schemas import BacktestRequest
+
+
+def _ns(value: str) -> int:
+    return pd.Timestamp(value, tz="UTC").value
+
+
+def test_appends_in_place_and_reads_single_days_zero_copy(tmp_path) -> None:
+    store = IntradayStore(tmp_path)
+    bars = synthetic_intraday_bars("SPY", "2024-03-04", "2024-03-06", 1)
+    first_half, second_half = bars.take(slice(0, 200)), bars.take(slice(200, None))
+
+    store.append("yahoo", "SPY", 1, first_half, [])
+    path = tmp_path / "yahoo" / "SPY" / "1m" / "2024-03-04.bars"
+    inode = path.stat().st_ino
+    store.append("yahoo", "SPY", 1, second_half, [])
+
+    assert path.stat().st_ino == inode
+    assert path.stat().st_size == 390 * 48
+    window = store.read("yahoo", "SPY", 1, _ns("2024-03-04 15:00"), _ns("2024-03-04 16:00"))
+    assert len(window) == 60
+    assert isinstance(window.close, np.memmap)
+    assert not window.close.flags.owndata and window.close.strides == (48,)
+    both = store.read("yahoo", "SPY", 1, _ns("2024-03-04"), _ns("2024-03-06"))
+    np.testing.assert_array_equal(both.close, bars.close)
+    np.testing.assert_array_equal(both.timestamps, bars.timestamps)
+
+
+def test_out_of_order_bars_rewrite_the_day_with_corrections(tmp_path) -> None:
+    store = IntradayStore(tmp_path)
+    bars = synthetic_intraday_bars("SPY", "2024-03-04", "2024-03-05", 5)
+    store.append("yahoo", "SPY", 5, bars, [])
+    fix = bars.take(slice(10, 12))
+    corrected = OhlcvArrays(fix.timestamps, fix.open, fix.high, fix.low, fix.close + 1, fix.volume)
+
+    store.append("yahoo", "SPY", 5, corrected, [])
+
+    stored = store.read("yahoo", "SPY", 5, _ns("2024-03-04"), _ns("2024-03-05"))
+    assert len(stored) == len(bars)
+    np.testing.assert_array_equal(stored.close[10:12], bars.close[10:12] + 1)
+
+
+def test_resampling_anchors_buckets_at_the_session_open() -> None:
+    bars = synthetic_intraday_bars("SPY", "2024-03-04", "2024-03-06", 5)
+
+    hourly = resample_bars(bars, 60)
+
+    assert len(hourly) == 14
+    assert hourly.index()[0] == pd.Timestamp("2024-03-04 14:30", tz="UTC")
+    assert hourly.index()[1] == pd.Timestamp("2024-03-04 15:30", tz="UTC")
+    assert hourly.open[0] == bars.open[0]
+    assert hourly.close[0] == bars.close[11]
+    assert hourly.high[0] == bars.high[:12].max()
+    assert hourly.volume[6] == bars.volume[72:78].sum()
+
+
+def test_intervals_map_to_native_upstream_sizes() -> None:
+    assert interval_minutes("1h") == 60
+    assert native_interval("yahoo", interval_minutes("10m")) == 5
+    assert native_interval("alpha-vantage", interval_minutes("4h")) == 60
+    with pytest.raises(ValueError):
+        interval_minutes("1d")
+    assert native_interval("alpha-vantage", interval_minutes("2m")) == 1
+
+
+def test_only_days_missing_from_the_store_are_fetched(tmp_path) -> None:
+    store = IntradayStore(tmp_path, fetch_window_days=2)
+    calls: list[tuple[str, str]] = []
+
+    async def fetch(start: str, end: str) -> OhlcvArrays:
+        calls.append((start, end))
+        return synthetic_intraday_bars("SPY", start, end, 5)
+
+    async def scenario() -> tuple[OhlcvArrays, OhlcvArrays]:
+        first = await store.get_intraday("yahoo", "SPY", 5, "2024-03-04", "2024-03-07", fetch)
+        second = await store.get_intraday("yahoo", "SPY", 5, "2024-03-05", "2024-03-08", fetch)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert calls == [("2024-03-04", "2024-03-06"), ("2024-03-06", "2024-03-07"), ("2024-03-07", "2024-03-08")]
+    assert len(first) == len(second) == 3 * 78
+    np.testing.assert_array_equal(second.close, synthetic_intraday_bars("SPY", "2024-03-05", "2024-03-08", 5).close)
+
+
+
+def test_monthly_sources_fetch_each_month_once(tmp_path) -> None:
+    store = IntradayStore(tmp_path, fetch_window_days=7)
+    calls: list[tuple[str, str]] = []
+
+    async def fetch(start: str, end: str) -> OhlcvArrays:
+        calls.append((start, end))
+        return synthetic_intraday_bars("IBM", start, end, 5)
+
+    async def scenario() -> None:
+        await store.get_intraday("alpha_vantage", "IBM", 5, "2024-01-10", "2024-01-12", fetch)
+        await store.get_intraday("alpha_vantage", "IBM", 5, "2024-01-01", "2024-03-01", fetch)
+
+    asyncio.run(scenario())
+
+    # The second request has two gaps in January around the stored days, still fetched as one window.
+    assert calls == [("2024-01-10", "2024-01-12"), ("2024-01-01", "2024-02-01"), ("2024-02-01", "2024-03-01")]
+
+def test_mapped_bars_feed_indicators_and_backtests(tmp_path) -> None:
+    store = IntradayStore(tmp_path)
+    store.append("yahoo", "SPY", 1, synthetic_intraday_bars("SPY", "2024-03-04", "2024-03-09", 1), [])
+    bars = store.read("yahoo", "SPY", 1, _ns("2024-03-04"), _ns("2024-03-09"))
+
+    columns = technical_columns(bars, ["SMA_20", "RSI_14"], "SPY", frequency="1m")
+    payload = BacktestRequest(symbol="SPY", start="2024-03-04", end="2024-03-09", interval="1m")
+    result = run_backtest(payload, bars)
+
+    assert columns["frequency"] == "1m"
+    assert len(columns["indicators"]["SMA_20"]) == len(bars) == 5 * 390
+    assert len(result.equity_curve) == len(bars)
+    realized = sum(trade.pnl for trade in result.trades)
+    assert result.final_equity == pytest.approx(payload.initial_capital + realized)
@@ -0,0 +1,60 @@
+import asyncio
+
+from app.core import cache
+from app.core.cache import cache_get_decoded, cache_set, encode_entry
+from app.core.local_cache import LocalCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_local_cache_evicts_least_recently_used_and_expired_entries() -> None:
+    clock = FakeClock()
+    local = LocalCache(max_entries=2, ttl_seconds=10, clock=clock)
+    local.active = True
+
+    local.put("a", 1)
+    local.put("b", 2)
+    assert local.get("a") == 1
+    local.put("c", 3)
+    assert local.get("b") is None and local.get("a") == 1 and local.get("c") == 3
+
+    clock.now = 10
+    assert local.get("a") is None and len(local) == 1
+
+
+def test_local_cache_holds_nothing_until_active() -> None:
+    local = LocalCache(max_entries=2, ttl_seconds=10)
+    local.put("a", 1)
+    assert local.get("a") is None and len(local) == 0
+
+
+def test_decoded_hits_skip_redis_until_the_key_is_rewritten(fake_redis, monkeypatch) -> None:
+    fake_redis.values["fred:GDP"] = encode_entry(b"v1", soft_ttl=60)
+    local = LocalCache(max_entries=8, ttl_seconds=30)
+    local.active = True
+    monkeypatch.setattr(cache, "local_cache", local)
+    decoded: list[bytes] = []
+
+    def decode(payload: bytes) -> str:
+        decoded.append(payload)
+        return payload.decode()
+
+    async def scenario() -> list[str]:
+        first = await cache_get_decoded("fred:GDP", decode)
+        second = await cache_get_decoded("fred:GDP", decode)
+        await cache_set("fred:GDP", b"v2", soft_ttl=60, value="v2")
+        third = await cache_get_decoded("fred:GDP", decode)
+        local.invalidate("fred:GDP")
+        fourth = await cache_get_decoded("fred:GDP", decode)
+        return [first.payload, second.payload, third.payload, fourth.payload]
+
+    assert asyncio.run(scenario()) == ["v1", "v1", "v2", "v2"]
+    assert decoded == [b"v1", b"v2"]
+    assert len(fake_redis.mgets) == 2
+    assert fake_redis.published == [cache._worker_id + b"|fred:GDP"]
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+from app.data.bars import OhlcvArrays
+from app.data.fetchers.alpha_vantage import AlphaVantageFetcher
+from app.data.fetchers.fred import FredFetcher
+from app.data.intraday import IntradayStore
+from app.data.providers import (
+    RecordingBarProvider,
+    RecordingNotFoundError,
+    RecordingTransport,
+    ReplayBarProvider,
+    ReplayTransport,
+)
+from app.data.store import BarStore
+from app.data.synthetic import SyntheticTransport, synthetic_bars
+from app.engine.backtester.runner import run_backtest
+from app.models.schemas import BacktestRequest
+
+
+class FakeYahoo:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str, str]] = []
+
+    async def fetch_daily(self, symbol: str, start: str, end: str) -> OhlcvArrays:
+        self.calls.append((symbol, start, end))
+        return synthetic_bars(symbol, start, end, seed=3)
+
+    async def fetch_daily_many(self, symbols: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        return {symbol: await self.fetch_daily(symbol, start, end) for symbol in symbols}
+
+
+def test_synthetic_windows_agree_and_bars_are_consistent() -> None:
+    long = synthetic_bars("SPY", "2019-01-01", "2021-01-01", seed=1)
+    window = synthetic_bars("SPY", "2020-01-01", "2020-06-01", seed=1)
+    lower = np.searchsorted(long.timestamps, window.timestamps[0])
+
+    for name in ("open", "high", "low", "close", "volume"):
+        np.testing.assert_array_equal(getattr(window, name), getattr(long, name)[lower : lower + len(window)])
+    assert len(long) == 523
+    assert np.all(long.high >= np.maximum(long.open, long.close))
+    assert np.all(long.low <= np.minimum(long.open, long.close))
+    assert not np.array_equal(window.close, synthetic_bars("QQQ", "2020-01-01", "2020-06-01", seed=1).close)
+    assert not np.array_equal(window.close, synthetic_bars("SPY", "2020-01-01", "2020-06-01", seed=2).close)
+
+
+def test_recorded_bars_replay_offline(tmp_path) -> None:
+    upstream = FakeYahoo()
+    store, intraday = BarStore(tmp_path / "bars"), IntradayStore(tmp_path / "intraday")
+
+    async def scenario() -> tuple[OhlcvArrays, OhlcvArrays]:
+        recording = RecordingBarProvider(upstream, store, intraday)
+        recorded = await recording.fetch_daily_many(["AAPL"], "2023-01-01", "2023-07-01")
+        replayed = await ReplayBarProvider(store, intraday).fetch_daily("AAPL", "2023-02-01", "2023-03-01")
+        with pytest.raises(RecordingNotFoundError):
+            await ReplayBarProvider(store, intraday).fetch_daily("AAPL", "2022-12-01", "2023-03-01")
+        return recorded["AAPL"], replayed
+
+    recorded, replayed = asyncio.run(scenario())
+
+    assert upstream.calls == [("AAPL", "2023-01-01", "2023-07-01")]
+    np.testing.assert_array_equal(replayed.close, synthetic_bars("AAPL", "2023-02-01", "2023-03-01", seed=3).close)
+    assert len(recorded) > len(replayed) > 0
+
+
+def test_http_recordings_drop_credentials_and_replay_other_windows(tmp_path) -> None:
+    seen: list[httpx.URL] = []
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url)
+        return httpx.Response(200, json={"observations": [{"date": "2024-01-01", "value": "1.5"}]})
+
+    async def scenario() -> tuple[list[dict], list[dict]]:
+        recorder = httpx.AsyncClient(transport=RecordingTransport(httpx.MockTransport(upstream), tmp_path))
+        recorded = await FredFetcher(client=recorder).fetch_series("GDP", "2024-01-01", "2024-02-01")
+        replayer = httpx.AsyncClient(transport=ReplayTransport(tmp_path))
+        replayed = await FredFetcher(client=replayer).fetch_series("GDP", "2020-01-01", "2024-06-01")
+        with pytest.raises(RecordingNotFoundError):
+            await FredFetcher(client=replayer).fetch_series("CPI")
+        return recorded, replayed
+
+    recorded, replayed = asyncio.run(scenario())
+
+    assert len(seen) == 1
+    assert recorded == replayed == [{"date": "2024-01-01", "value": "1.5"}]
+    files = list(tmp_path.rglob("*.json"))
+    assert len(files) == 1
+    assert "api_key" not in files[0].read_text()
+    assert json.loads(files[0].read_text())["status"] == 200
+
+
+def test_synthetic_transport_answers_the_fetchers() -> None:
+    async def scenario() -> tuple[OhlcvArrays, list[dict]]:
+        client = httpx.AsyncClient(transport=SyntheticTransport(seed=5))
+        bars = await AlphaVantageFetcher(client=client).fetch_daily("IBM")
+        observations = await FredFetcher(client=client).fetch_series("UNRATE", "2010-01-01", "2011-01-01")
+        return bars, observations
+
+    bars, observations = asyncio.run(scenario())
+
+    assert len(bars) == 100
+    assert np.all(bars.close > 0)
+    assert [row["date"] for row in observations][:2] == ["2010-01-01", "2010-02-01"]
+    assert len(observations) == 13
+
+
+def test_backtest_runs_on_synthetic_bars() -> None:
+    payload = BacktestRequest(symbol="SPY", start="2018-01-01", end="2022-01-01")
+    bars = synthetic_bars(payload.symbol, payload.start, payload.end)
+
+    result = run_backtest(payload, bars)
+
+    assert len(result.equity_curve) == len(bars)
+    assert result.equity_curve[0].timestamp == bars.datetimes()[0]
+    assert result.trades
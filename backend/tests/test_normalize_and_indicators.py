@@ -0,0 +1,58 @@
+from datetime import UTC, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.bars import OhlcvArrays
+from app.data.processors.normalize import normalize_fred_series, normalize_yahoo_ohlcv
+from app.engine.indicators import compute_indicators
+
+
+def _bars(closes: list[float]) -> OhlcvArrays:
+    closes_array = np.asarray(closes, dtype=float)
+    return OhlcvArrays.from_columns(
+        pd.date_range("2024-01-01", periods=len(closes), freq="D", tz=UTC),
+        open=closes_array - 1,
+        high=closes_array + 1,
+        low=closes_array - 2,
+        close=closes_array,
+        volume=np.full(len(closes), 500.0),
+    )
+
+
+def test_normalize_yahoo_keeps_bar_fields_in_metadata() -> None:
+    response = normalize_yahoo_ohlcv("SPY", _bars([10.0, 11.0]))
+    payload = response.model_dump(mode="json")
+
+    assert [point["value"] for point in payload["data"]] == [10.0, 11.0]
+    assert payload["data"][1]["metadata"] == {
+        "timestamp": "2024-01-02T00:00:00Z",
+        "open": 10.0,
+        "high": 12.0,
+        "low": 9.0,
+        "volume": 500.0,
+    }
+
+
+def test_normalize_fred_skips_missing_observations() -> None:
+    response = normalize_fred_series(
+        "UNRATE",
+        [{"date": "2024-01-01", "value": "3.7"}, {"date": "2024-02-01", "value": "."}, {"date": "2024-03-01", "value": "3.9"}],
+    )
+
+    assert [point.value for point in response.data] == [3.7, 3.9]
+    assert response.data[1].timestamp == datetime(2024, 3, 1, tzinfo=UTC)
+
+
+def test_compute_indicators_matches_pandas_rolling_mean() -> None:
+    closes = [float(value) for value in range(1, 31)]
+    response = compute_indicators(_bars(closes), ["SMA_20"], symbol="SPY")
+
+    sma = response.indicators[0]
+    assert sma.name == "SMA_20"
+    assert len(sma.points) == 11
+    assert sma.points[0].value == pytest.approx(10.5)
+    assert sma.points[0].timestamp == datetime(2024, 1, 20, tzinfo=UTC)
+    assert len(response.ohlcv) == 30
+    assert response.ohlcv[-1].close == 30.0
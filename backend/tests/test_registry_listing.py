@@ -0,0 +1,100 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes import data
+from app.core.cache import CacheEntry
+from app.data import registry
+from app.data.registry import decode_cursor, encode_cursor
+from app.main import app
+from app.models.db_models import DataRegistryEntry
+
+
+class FakeResult:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def scalars(self) -> "FakeResult":
+        return self
+
+    def all(self) -> list:
+        return self.rows
+
+
+class FakeRegistryDb:
+    def __init__(self, rows: list[DataRegistryEntry]) -> None:
+        self.rows = rows
+        self.counts = 0
+        self.statements: list = []
+
+    async def scalar(self, statement) -> int:
+        self.counts += 1
+        return len(self.rows)
+
+    async def execute(self, statement) -> FakeResult:
+        # The first page sees every row; the page after the cursor only the last one.
+        self.statements.append(statement)
+        return FakeResult(self.rows if len(self.statements) == 1 else self.rows[2:])
+
+
+def _rows(count: int) -> list[DataRegistryEntry]:
+    now = datetime(2024, 6, 1, tzinfo=UTC)
+    return [
+        DataRegistryEntry(
+            id=count - index,
+            ticker_or_series_id=f"SYM{index}",
+            source="Yahoo Finance",
+            frequency="daily",
+            unit="price",
+            last_updated=now - timedelta(minutes=index),
+            latest_value=1.0,
+            metadata_json={},
+        )
+        for index in range(count)
+    ]
+
+
+def test_cursor_round_trips_and_rejects_garbage() -> None:
+    stamp = datetime(2024, 6, 1, 12, 30, tzinfo=UTC)
+
+    assert decode_cursor(encode_cursor(stamp, 42)) == (stamp, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_registry_pages_by_keyset_and_caches_the_total(monkeypatch) -> None:
+    db = FakeRegistryDb(_rows(3))
+    counts: dict[str, int] = {}
+
+    async def fake_get(key, decode):
+        return CacheEntry(payload=counts[key], soft_expires_at=float("inf")) if key in counts else None
+
+    async def fake_set(key, payload, soft_ttl, value=None):
+        counts[key] = value
+
+    async def fake_db():
+        yield db
+
+    monkeypatch.setattr(registry, "cache_get_decoded", fake_get)
+    monkeypatch.setattr(registry, "cache_set", fake_set)
+    app.dependency_overrides[data.get_db_session] = fake_db
+    try:
+        client = TestClient(app)
+        first = client.get("/data/registry", params={"q": "sym", "limit": 2}).json()
+        second = client.get("/data/registry", params={"q": "sym", "limit": 2, "cursor": first["next_cursor"]})
+        invalid = client.get("/data/registry", params={"cursor": "%%%"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first["total"] == 3 and len(first["items"]) == 2
+    assert decode_cursor(first["next_cursor"]) == (db.rows[1].last_updated, db.rows[1].id)
+    assert second.status_code == 200 and second.json()["next_cursor"] is None
+    assert [item["ticker_or_series_id"] for item in second.json()["items"]] == ["SYM2"]
+    # The second page reuses the cached total for "sym"; only the unfiltered request counts again.
+    assert db.counts == 2
+    sql = str(db.statements[1].compile(dialect=postgresql.dialect()))
+    assert "(data_registry_entries.last_updated, data_registry_entries.id) <" in sql
+    assert "OFFSET" in sql and "ORDER BY data_registry_entries.last_updated DESC, data_registry_entries.id DESC" in sql
+    assert invalid.status_code == 400
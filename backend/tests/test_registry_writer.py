@@ -0,0 +1,201 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects import postgresql
+
+from app.data.bars import OhlcvArrays
+from app.data.processors.normalize import ohlcv_series_frame
+from app.data.registry import RegistryWriter
+
+
+def _series(symbol: str, closes: list[float]):
+    closes_array = np.asarray(closes, dtype=float)
+    bars = OhlcvArrays.from_columns(
+        pd.date_range("2024-01-01", periods=len(closes), freq="D", tz=UTC),
+        open=closes_array,
+        high=closes_array,
+        low=closes_array,
+        close=closes_array,
+        volume=np.ones(len(closes)),
+    )
+    return ohlcv_series_frame(symbol, "Yahoo Finance", bars)
+
+
+class FakeSession:
+    def __init__(self, log: list, error: Exception | None = None) -> None:
+        self.log = log
+        self.error = error
+
+    async def execute(self, statement) -> None:
+        if self.error is not None:
+            raise self.error
+        self.log.append(statement)
+
+    async def commit(self) -> None:
+        return None
+
+
+def _factory(log: list, failures: list[Exception]):
+    @asynccontextmanager
+    async def session():
+        yield FakeSession(log, error=failures.pop(0) if failures else None)
+
+    return session
+
+
+def test_submissions_coalesce_per_series_and_flush_in_batches() -> None:
+    statements: list = []
+    writer = RegistryWriter(flush_interval_seconds=60, batch_size=2, session_factory=_factory(statements, []))
+    writer.submit(_series("SPY", [1.0]), "2024-01-01", "2024-02-01")
+    writer.submit(_series("SPY", [1.0, 2.0]), "2024-01-01", "2024-03-01")
+    writer.submit(_series("QQQ", [3.0]))
+    writer.submit(_series("IWM", [4.0]))
+
+    assert len(writer) == 3
+    assert asyncio.run(writer.flush()) == 3
+    assert len(writer) == 0 and len(statements) == 2
+
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (ticker_or_series_id, source) DO UPDATE" in sql
+    params = statements[0].compile(dialect=postgresql.dialect()).params
+    # Rows are written in key order, and SPY's later submission replaced its first one.
+    assert (params["ticker_or_series_id_m0"], params["latest_value_m0"]) == ("QQQ", 3.0)
+    assert (params["ticker_or_series_id_m1"], params["latest_value_m1"]) == ("SPY", 2.0)
+
+
+
+def test_background_refreshes_keep_the_stored_request_time() -> None:
+    statements: list = []
+    writer = RegistryWriter(flush_interval_seconds=60, batch_size=10, session_factory=_factory(statements, []))
+    writer.submit(_series("SPY", [1.0]), requested=False)
+    asyncio.run(writer.flush())
+
+    compiled = statements[0].compile(dialect=postgresql.dialect())
+    assert compiled.params["last_requested_m0"] is None
+    assert "last_requested = coalesce(excluded.last_requested, data_registry_entries.last_requested)" in str(compiled)
+
+def test_failed_flush_keeps_rows_without_overwriting_newer_ones() -> None:
+    statements: list = []
+    writer = RegistryWriter(flush_interval_seconds=60, batch_size=10, session_factory=_factory(statements, [ConnectionError("database unavailable")]))
+    writer.submit(_series("SPY", [1.0]))
+
+    try:
+        asyncio.run(writer.flush())
+    except ConnectionError:
+        pass
+    writer.submit(_series("QQQ", [2.0]))
+
+    assert len(writer) == 2
+    assert asyncio.run(writer.flush()) == 2
+    assert len(statements) == 1
+
+
+def test_full_batch_wakes_the_flush_loop() -> None:
+    statements: list = []
+    writer = RegistryWriter(flush_interval_seconds=60, batch_size=2, session_factory=_factory(statements, []))
+
+    async def scenario() -> None:
+        task = asyncio.create_task(writer.run())
+        await asyncio.sleep(0)
+        writer.submit(_series("SPY", [1.0]))
+        writer.submit(_series("QQQ", [2.0]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert len(statements) == 1 and len(writer) == 0
+
+
+
+def test_cancelled_flush_keeps_its_batch() -> None:
+    started = asyncio.Event()
+
+    class HangingSession(FakeSession):
+        async def execute(self, statement) -> None:
+            started.set()
+            await asyncio.Event().wait()
+
+    @asynccontextmanager
+    async def session():
+        yield HangingSession([])
+
+    writer = RegistryWriter(flush_interval_seconds=60, batch_size=10, session_factory=session)
+    writer.submit(_series("SPY", [1.0]))
+
+    async def scenario() -> None:
+        task = asyncio.create_task(writer.flush())
+        await started.wait()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert len(writer) == 1
+
+
+def test_flush_loop_survives_unexpected_errors() -> None:
+    statements: list = []
+    writer = RegistryWriter(
+        flush_interval_seconds=0.01, batch_size=10, session_factory=_factory(statements, [RuntimeError("bad row")])
+    )
+    writer.submit(_series("SPY", [1.0]))
+
+    async def scenario() -> None:
+        task = asyncio.create_task(writer.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert len(statements) == 1 and len(writer) == 0
+
+def test_shutdown_closes_resources_when_the_final_flush_fails(monkeypatch) -> None:
+    from app import main
+
+    closed: list[str] = []
+    writer = RegistryWriter(flush_interval_seconds=60, batch_size=10, session_factory=_factory([], [ConnectionError("database unavailable")] * 2))
+    writer.submit(_series("SPY", [1.0]))
+
+    class FakeConnection:
+        async def run_sync(self, function) -> None:
+            return None
+
+    class FakeEngine:
+        @asynccontextmanager
+        async def begin(self):
+            yield FakeConnection()
+
+        async def dispose(self) -> None:
+            closed.append("engine")
+
+    class FakeRedis:
+        async def aclose(self) -> None:
+            closed.append("redis")
+
+    async def noop(*args) -> None:
+        return None
+
+    async def close_http_client() -> None:
+        closed.append("http")
+
+    monkeypatch.setattr(main, "engine", FakeEngine())
+    monkeypatch.setattr(main, "redis_client", FakeRedis())
+    monkeypatch.setattr(main, "registry_writer", writer)
+    monkeypatch.setattr(main, "ensure_registry_index", noop)
+    monkeypatch.setattr(main, "ensure_registry_request_column", noop)
+    monkeypatch.setattr(main, "ensure_registry_search_indexes", noop)
+    monkeypatch.setattr(main, "open_http_client", noop)
+    monkeypatch.setattr(main, "close_http_client", close_http_client)
+    monkeypatch.setattr(main, "shutdown_yahoo_executor", lambda: closed.append("yahoo"))
+    monkeypatch.setattr(main.settings, "cache_warm_interval_seconds", 0)
+    monkeypatch.setattr(main.settings, "fred_catalog_seed_queries", [])
+    monkeypatch.setattr(main.settings, "l1_cache_enabled", False)
+
+    async def scenario() -> None:
+        async with main.lifespan(main.app):
+            pass
+
+    asyncio.run(scenario())
+    assert closed == ["http", "yahoo", "redis", "engine"]
+    assert len(writer) == 1
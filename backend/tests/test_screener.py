@@ -0,0 +1,151 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import analysis
+from app.core.singleflight import SingleFlight
+from app.data import bar_cache, series
+from app.data.bar_cache import BarChunkCache
+from app.data.bars import OhlcvArrays
+from app.data.synthetic import synthetic_bars
+from app.engine.indicator_registry import plan_indicators
+from app.engine.screener import bar_matrix, plan_screen, run_screen
+from app.main import app
+
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+
+
+def _universe() -> dict:
+    bars = {symbol: synthetic_bars(symbol, "2018-01-01", "2021-01-01") for symbol in SYMBOLS}
+    # A late listing: its rows before the first bar stay empty in the matrix.
+    bars["NEW"] = synthetic_bars("NEW", "2018-01-01", "2021-01-01", origin="2020-06-01")
+    return bars
+
+
+def test_expressions_are_validated() -> None:
+    for invalid in (
+        "__import__('os').system('true')",
+        "close.real > 0",
+        "SMA_20[0] > 1",
+        "open(1) > 0",
+        "'a' < close",
+        "lambda: 1",
+        "BBANDS_20 > close",
+        "SMA_20_UPPER > close",
+        "RSI_14_SIGNAL > 1",
+        "FOO_10 > 1",
+        "RSI_14 >",
+    ):
+        with pytest.raises(ValueError):
+            plan_screen([invalid])
+
+    _, _, nodes = plan_screen(["RSI_14 < 30 and close > sma_200", "MACD_HIST + BBANDS_50_3_UPPER"])
+    assert list(nodes) == ["RSI_14", "CLOSE", "SMA_200", "MACD_HIST", "BBANDS_50_3_UPPER"]
+
+
+def test_bar_matrix_aligns_and_fills_gaps() -> None:
+    bars = _universe()
+    gappy = bars["AAA"].take(np.r_[0:100, 105 : len(bars["AAA"])])
+    columns = bar_matrix({"AAA": gappy, "NEW": bars["NEW"], "BBB": bars["BBB"]})
+
+    assert np.array_equal(columns["timestamps"], bars["AAA"].timestamps)
+    assert np.all(columns["close"][100:105, 0] == gappy.close[99])
+    assert np.all(columns["volume"][100:105, 0] == 0)
+    listed = int(np.searchsorted(columns["timestamps"], bars["NEW"].timestamps[0]))
+    assert np.isnan(columns["close"][:listed, 1]).all()
+    assert np.array_equal(columns["close"][listed:, 1], bars["NEW"].close)
+
+
+def test_screen_matches_per_symbol_indicators() -> None:
+    bars = _universe()
+    result = run_screen(bars, "close > SMA_50 or crossed_above(MACD, MACD_SIGNAL)", "RSI_14 - prev(RSI_14)", limit=3)
+
+    expected = {}
+    for symbol, symbol_bars in bars.items():
+        outputs = dict(plan_indicators(["SMA_50", "MACD", "RSI_14"]).evaluate(symbol_bars))
+        macd, signal = outputs["MACD"], outputs["MACD_SIGNAL"]
+        crossed = macd[-1] > signal[-1] and macd[-2] <= signal[-2]
+        if symbol_bars.close[-1] > outputs["SMA_50"][-1] or crossed:
+            expected[symbol] = outputs["RSI_14"][-1] - outputs["RSI_14"][-2]
+
+    ranked = sorted(expected, key=lambda symbol: -expected[symbol])
+    assert result.universe == len(bars) and result.matched == len(expected)
+    assert [match.symbol for match in result.results] == ranked[:3]
+    for match in result.results:
+        assert match.score == pytest.approx(expected[match.symbol], rel=1e-9)
+        assert set(match.values) == {"CLOSE", "SMA_50", "MACD", "MACD_SIGNAL", "RSI_14"}
+    assert result.as_of.date().isoformat() == "2020-12-31"
+
+
+
+def test_symbols_without_a_latest_bar_are_reported_not_screened() -> None:
+    bars = _universe()
+    bars["OLD"] = synthetic_bars("OLD", "2018-01-01", "2020-06-01")
+
+    result = run_screen(bars, None, "RSI_14", limit=50)
+
+    assert result.stale == ["OLD"] and result.universe == len(bars) - 1
+    assert "OLD" not in {match.symbol for match in result.results}
+
+def test_screen_route(monkeypatch) -> None:
+    bars = _universe()
+    requested: list[list[str]] = []
+
+    async def fake_load_universe_bars(symbols, start, end):
+        requested.append(symbols)
+        return {symbol: bars[symbol] for symbol in symbols if symbol in bars}, [s for s in symbols if s not in bars]
+
+    monkeypatch.setattr(analysis, "load_universe_bars", fake_load_universe_bars)
+    client = TestClient(app)
+    payload = {"symbols": [*SYMBOLS, "NEW", "GONE"], "start": "2018-01-01", "end": "2021-01-01"}
+
+    response = client.post("/analysis/screen", json={**payload, "sort": "SMA_200", "descending": False, "limit": 10})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["missing"] == ["GONE"] and body["stale"] == [] and body["matched"] == 7
+    # NEW has not traded 200 days yet, so its score is missing and it ranks last.
+    assert body["results"][-1]["symbol"] == "NEW" and body["results"][-1]["score"] is None
+    scores = [match["score"] for match in body["results"][:-1]]
+    assert scores == sorted(scores)
+
+    response = client.post("/analysis/screen", json={**payload, "filter": "close.__class__"})
+    assert response.status_code == 400
+    response = client.post("/analysis/screen", json={**payload, "filter": "SMA_20_UPPER > close"})
+    assert response.status_code == 400 and "no UPPER output" in response.json()["detail"]
+    assert len(requested) == 1
+
+
+def test_sp500_screen_downloads_in_batches_and_then_reads_the_cache(fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(series, "bar_chunk_cache", BarChunkCache(closed_month_ttl=3600))
+    monkeypatch.setattr(bar_cache, "singleflight", SingleFlight(redis=None))
+    symbols = [f"S{number:03d}" for number in range(500)]
+    downloads: list[int] = []
+
+    async def fetch_daily_many(batch: list[str], start: str, end: str) -> dict[str, OhlcvArrays]:
+        downloads.append(len(batch))
+        index = pd.bdate_range(start, end, inclusive="left", tz="UTC")
+        rng = np.random.default_rng(len(downloads))
+        bars = {}
+        for symbol in batch:
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+            bars[symbol] = OhlcvArrays.from_columns(
+                index, open=close, high=close * 1.01, low=close * 0.99, close=close, volume=np.full(len(index), 1e6)
+            )
+        return bars
+
+    monkeypatch.setattr(series.bar_provider, "fetch_daily_many", fetch_daily_many)
+
+    async def screen():
+        bars, _ = await series.load_universe_bars(symbols, "2022-01-01", "2025-01-01")
+        return run_screen(bars, "RSI_14 < 70 and close > SMA_200 or crossed_above(MACD, MACD_SIGNAL)", "close / SMA_200")
+
+    asyncio.run(screen())
+    assert downloads == [100] * 5  # every cold symbol went upstream in batches
+
+    result = asyncio.run(screen())
+
+    # The warm screen is served from the chunks; benchmarks/bench_screen_universe.py times it.
+    assert downloads == [100] * 5 and result.universe == 500
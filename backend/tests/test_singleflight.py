@@ -0,0 +1,61 @@
+import asyncio
+
+from app.core.singleflight import SingleFlight
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def set(self, key: str, value: str, nx: bool = False, px: int | None = None) -> bool:
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        if self.values.get(key) == token:
+            del self.values[key]
+            return 1
+        return 0
+
+
+def test_concurrent_callers_share_one_computation() -> None:
+    calls = 0
+
+    async def compute() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "payload"
+
+    async def scenario() -> list[str]:
+        flight = SingleFlight(redis=None)
+        return await asyncio.gather(*(flight.do("yahoo:SPY:2024-01-01:2024-02-01", compute) for _ in range(20)))
+
+    assert asyncio.run(scenario()) == ["payload"] * 20
+    assert calls == 1
+
+
+def test_other_workers_wait_for_the_lock_owner_result() -> None:
+    redis = FakeRedis()
+    calls = 0
+    key = "fred:CPIAUCSL:2000-01-01:2024-01-01"
+
+    async def compute() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        await redis.set(key, "cached")
+        return "fresh"
+
+    async def scenario() -> list[str]:
+        workers = [SingleFlight(redis=redis, poll_interval_seconds=0.01) for _ in range(3)]
+        return await asyncio.gather(*(worker.do(key, compute, lambda: redis.get(key)) for worker in workers))
+
+    assert sorted(asyncio.run(scenario())) == ["cached", "cached", "fresh"]
+    assert calls == 1
+    assert f"singleflight:{key}" not in redis.values
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from app.core.scheduler import Priority, UpstreamQuotaError, UpstreamScheduler
+
+
+def test_interactive_requests_jump_ahead_of_background_refreshes() -> None:
+    order: list[str] = []
+
+    async def call(scheduler: UpstreamScheduler, name: str, priority: Priority) -> None:
+        await scheduler.acquire("fred", priority)
+        order.append(name)
+
+    async def scenario() -> dict[str, dict[str, float]]:
+        scheduler = UpstreamScheduler(limits={"fred": [(1, 0.05)]}, max_wait_seconds=5.0)
+        await scheduler.acquire("fred")
+        background = [asyncio.create_task(call(scheduler, f"bg{i}", Priority.BACKGROUND)) for i in range(2)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call(scheduler, "ui", Priority.INTERACTIVE))
+        await asyncio.gather(*background, interactive)
+        return scheduler.snapshot()
+
+    stats = asyncio.run(scenario())
+
+    assert order == ["ui", "bg0", "bg1"]
+    assert stats["fred"]["granted"] == 4
+    assert stats["fred"]["queue_depth"] == 0
+    assert stats["fred"]["max_wait_seconds"] > 0
+
+
+def test_requests_beyond_the_wait_budget_are_rejected() -> None:
+    async def scenario() -> None:
+        scheduler = UpstreamScheduler(limits={"alpha_vantage": [(2, 60.0)]}, max_wait_seconds=1.0)
+        await scheduler.acquire("alpha_vantage")
+        await scheduler.acquire("alpha_vantage")
+        await scheduler.acquire("alpha_vantage")
+
+    with pytest.raises(UpstreamQuotaError) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.retry_after > 1.0
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+from datetime import UTC, datetime
+
+import pandas as pd
+
+from app.data.fetchers import yahoo
+from app.data.fetchers.yahoo import YahooFetcher
+
+
+def _history(closes: list[float]) -> pd.DataFrame:
+    index = pd.DatetimeIndex(pd.date_range("2024-01-02", periods=len(closes), freq="D"), name="Date")
+    return pd.DataFrame(
+        {"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": [10.0] * len(closes)},
+        index=index,
+    )
+
+
+def test_fetch_daily_many_splits_one_download_per_symbol(monkeypatch) -> None:
+    calls: list[tuple[list[str], str]] = []
+
+    def fake_download(symbols, **kwargs):
+        calls.append((symbols, threading.current_thread().name))
+        return pd.concat({"AAPL": _history([1.0, 2.0]), "MSFT": _history([3.0, float("nan")])}, axis=1)
+
+    monkeypatch.setattr(yahoo.yf, "download", fake_download)
+
+    result = asyncio.run(YahooFetcher().fetch_daily_many(["AAPL", "MSFT", "NOPE"], "2024-01-01", "2024-01-10"))
+
+    assert len(calls) == 1
+    assert calls[0][1].startswith("yahoo")
+    assert result["AAPL"].close.tolist() == [1.0, 2.0]
+    assert result["AAPL"].datetimes()[0] == datetime(2024, 1, 2, tzinfo=UTC)
+    assert result["MSFT"].close.tolist() == [3.0]
+    assert len(result["NOPE"]) == 0
+
+
+def test_fetches_after_a_shutdown_run_on_a_fresh_executor(monkeypatch) -> None:
+    monkeypatch.setattr(yahoo.yf, "download", lambda symbols, **kwargs: pd.concat({"AAPL": _history([1.0])}, axis=1))
+
+    async def fetch() -> list[float]:
+        return (await YahooFetcher().fetch_daily_many(["AAPL"], "2024-01-01", "2024-01-10"))["AAPL"].close.tolist()
+
+    assert asyncio.run(fetch()) == [1.0]
+    yahoo.shutdown_yahoo_executor()
+    yahoo.shutdown_yahoo_executor()
+    assert asyncio.run(fetch()) == [1.0]
@@ -20,7 +20,7 @@ import {
 } from "@/lib/api";
 import { useAuthStore } from "@/store/auth";
 
-const AVAILABLE_INDICATORS = ["SMA_20", "EMA_20", "RSI_14", "MACD", "BBANDS_20"];
+const AVAILABLE_INDICATORS = ["SMA_20", "SMA_50", "EMA_20", "EMA_200", "RSI_14", "MACD", "BBANDS_20", "ATR_14", "VWAP"];
 
 const defaultLayouts: Layouts = {
   lg: [
@@ -28,6 +28,7 @@ export type DataRegistryEntry = {
 export type DataRegistryListResponse = {
   total: number;
   items: DataRegistryEntry[];
+  next_cursor: string | null;
 };
 
 export type FredSearchResponse = {
@@ -305,12 +306,14 @@ export async function fetchRegistry(params?: {
   source?: string;
   limit?: number;
   offset?: number;
+  cursor?: string;
 }): Promise<DataRegistryListResponse> {
   const query = new URLSearchParams();
   if (params?.q) query.set("q", params.q);
   if (params?.source) query.set("source", params.source);
   if (typeof params?.limit === "number") query.set("limit", String(params.limit));
   if (typeof params?.offset === "number") query.set("offset", String(params.offset));
+  if (params?.cursor) query.set("cursor", params.cursor);
   const suffix = query.toString() ? `?${query.toString()}` : "";
   return request<DataRegistryListResponse>(`/data/registry${suffix}`);
 }